@@ -0,0 +1,70 @@
+"""
+Сравнение маршрутизации callback-кнопок: прежняя цепочка regex-обработчиков
+против CallbackRouter со словарем действий.
+
+Запуск: python -m benchmarks.callback_routing
+"""
+import random
+import re
+import sys
+import os
+from timeit import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import callbacks
+
+# Шаблоны в порядке регистрации в main.main() до введения маршрутизатора
+LEGACY_CHAIN = [
+    (re.compile(r'^admin_panel$'), 'admin_panel'),
+    (re.compile(r'^edit_vacancies$'), 'edit_vacancies'),
+    (re.compile(r'^back_to_main$'), 'back_to_main'),
+    (re.compile(r'^edit_vacancy_\d+$'), 'edit_vacancy'),
+    (re.compile(r'^toggle_status_\d+$'), 'toggle_status'),
+    (re.compile(r'^delete_vacancy_\d+$'), 'delete_vacancy'),
+    (re.compile(r'^application_(accept|reject)_\d+$'), 'application'),
+    (re.compile(r'^vacancy_\d+$'), 'vacancy'),
+    (re.compile(r'^back_to_vacancies$'), 'back_to_vacancies'),
+]
+
+
+def legacy_dispatch(data: str):
+    """Перебор шаблонов и повторный разбор data внутри обработчика"""
+    for pattern, name in LEGACY_CHAIN:
+        if pattern.match(data):
+            parts = data.split('_')
+            return name, parts[-1] if parts[-1].isdigit() else None
+    return None
+
+
+ROUTES = {action: action for action in callbacks.ACTION_CODES}
+
+
+def router_dispatch(data: str):
+    """Разбор по префиксу и поиск обработчика в словаре"""
+    parsed = callbacks.decode(data)
+    return ROUTES.get(parsed.action), parsed.args
+
+
+def main():
+    random.seed(1)
+    ids = [random.randint(1, 5000) for _ in range(1000)]
+    legacy_data = [f"vacancy_{i}" for i in ids] + ['back_to_vacancies'] * 200 + [f"application_accept_{i}" for i in ids[:200]]
+    new_data = (
+        [callbacks.encode(callbacks.VACANCY, i) for i in ids]
+        + [callbacks.encode(callbacks.BACK_TO_VACANCIES)] * 200
+        + [callbacks.encode(callbacks.APPLICATION_ACCEPT, i) for i in ids[:200]]
+    )
+    rounds = 200
+
+    legacy_time = timeit(lambda: [legacy_dispatch(d) for d in legacy_data], number=rounds)
+    router_time = timeit(lambda: [router_dispatch(d) for d in new_data], number=rounds)
+    total = len(legacy_data) * rounds
+
+    print(f"regex-цепочка:   {legacy_time / total * 1e9:8.0f} нс/нажатие")
+    print(f"маршрутизатор:   {router_time / total * 1e9:8.0f} нс/нажатие")
+    print(f"ускорение:       {legacy_time / router_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
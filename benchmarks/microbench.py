@@ -0,0 +1,226 @@
+"""
+Микробенчмарки горячих путей: методы Database на синтетических базах
+разного размера, RateLimiter.can_send_message, построители клавиатур
+и utils.logger.log_message.
+
+Результаты можно сохранить в JSON и сравнить с прогоном предыдущей версии.
+
+Запуск: python -m benchmarks.microbench --sizes 10,10000,1000000 --json bench.json
+        python -m benchmarks.microbench --compare bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from itertools import count
+from timeit import Timer
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Замедление относительно сохраненного прогона, о котором сообщается
+REGRESSION_THRESHOLD = 1.1
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    """Время одного вызова: медиана и минимум по repeat сериям длительностью не меньше min_time"""
+    timer = Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = [time / number for time in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'ns_per_op': statistics.median(rounds) * 1e9,
+        'min_ns_per_op': min(rounds) * 1e9,
+        'calls_per_round': number,
+        'rounds': repeat
+    }
+
+
+def database_cases(rows: int, data_dir: str) -> Dict[str, Callable[[], object]]:
+    """Методы Database на базе с rows откликами"""
+    from benchmarks.synthetic import FIRST_USER_ID, generate_database, user_count, vacancy_count
+    from database import Database
+
+    path = os.path.join(data_dir, f'synthetic_{rows}.db')
+    if not os.path.exists(path):
+        print(f"Генерация базы на {rows} откликов...", flush=True)
+        generate_database(path, rows)
+    db = Database(path)
+
+    rng = random.Random(rows)
+    vacancies = vacancy_count(rows)
+    users = user_count(rows)
+    # Новые кандидаты для add_application, чтобы каждый вызов был вставкой
+    new_users = count(FIRST_USER_ID + users + 1)
+
+    def random_user() -> int:
+        return FIRST_USER_ID + rng.randrange(users)
+
+    return {
+        'get_active_vacancies': db.get_active_vacancies,
+        'get_vacancy': lambda: db.get_vacancy(rng.randint(1, vacancies)),
+        'can_apply_to_vacancy': lambda: db.can_apply_to_vacancy(random_user(), rng.randint(1, vacancies)),
+        'add_application': lambda: db.add_application(next(new_users), rng.randint(1, vacancies), "Сопроводительное письмо", "bench"),
+        'get_user_applications': lambda: db.get_user_applications(random_user())
+    }
+
+
+def rate_limiter_cases() -> Dict[str, Callable[[], object]]:
+    """Проверка RateLimiter для потока сообщений от многих пользователей"""
+    from utils.rate_limiter import RateLimiter
+
+    rng = random.Random(1)
+    # Лимиты не срабатывают: измеряется основной путь пропуска сообщения
+    limiter = RateLimiter(messages_per_minute=10 ** 9, max_similar_messages=10 ** 9)
+    messages = [(rng.randrange(10_000), rng.choice(("📋 Вакансии", "📝 Мои заявки", "привет"))) for _ in range(4096)]
+    position = count()
+
+    def can_send_message():
+        user_id, text = messages[next(position) % len(messages)]
+        return limiter.can_send_message(user_id, text)
+
+    return {'RateLimiter.can_send_message': can_send_message}
+
+
+def keyboard_cases() -> Dict[str, Callable[[], object]]:
+    """Построители клавиатур с типичными данными"""
+    import keyboards
+    from database import PendingApplication, Vacancy
+
+    vacancies = [Vacancy(number, f"Вакансия {number}", "Описание") for number in range(1, 21)]
+    applications = [
+        PendingApplication(number, 100_000 + number, f"user{number}", "Сопроводительное письмо", "2024-01-01 00:00:00")
+        for number in range(1, 11)
+    ]
+    pending_counts = [(number, f"Вакансия {number}", number * 3) for number in range(1, 11)]
+    return {
+        'get_main_keyboard': keyboards.get_main_keyboard,
+        'get_vacancies_keyboard(20)': lambda: keyboards.get_vacancies_keyboard(vacancies),
+        'get_vacancy_actions_keyboard': lambda: keyboards.get_vacancy_actions_keyboard(7),
+        'get_admin_panel_keyboard': keyboards.get_admin_panel_keyboard,
+        'get_moderation_queue_keyboard(10)': lambda: keyboards.get_moderation_queue_keyboard(pending_counts),
+        'get_moderation_page_keyboard(10)': lambda: keyboards.get_moderation_page_keyboard(7, 0, applications, {1, 2, 3}, 10)
+    }
+
+
+def logger_cases() -> Dict[str, Callable[[], object]]:
+    """log_message со всеми обработчиками журнала; консольный вывод уходит в /dev/null"""
+    from utils.logger import log_message, logger
+
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    for handler in logger.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(devnull)
+    return {
+        'log_message': lambda: log_message(5535130491, "user", "view", "Просмотрел вакансию", "Вакансия: Backend-разработчик")
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Сведения о среде прогона для сравнения результатов"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine()
+    }
+
+
+def run(sizes: List[int], data_dir: str, repeat: int, min_time: float, only: Optional[str]) -> List[dict]:
+    from benchmarks.synthetic import remove_added_applications
+
+    groups = [('rate_limiter', None, rate_limiter_cases), ('keyboards', None, keyboard_cases), ('logger', None, logger_cases)]
+    groups += [('database', rows, lambda rows=rows: database_cases(rows, data_dir)) for rows in sizes]
+
+    results = []
+    for group, rows, make_cases in groups:
+        for name, func in make_cases().items():
+            if only and only not in name:
+                continue
+            result = {'group': group, 'name': name, 'rows': rows, **measure(func, repeat, min_time)}
+            results.append(result)
+            print(f"{group:<13}{name:<36}{rows if rows is not None else '':>9}{format_time(result['ns_per_op']):>12}", flush=True)
+        if group == 'database':
+            # Отклики, вставленные замером add_application, не должны менять базу следующего прогона
+            remove_added_applications(os.path.join(data_dir, f'synthetic_{rows}.db'), rows)
+    return results
+
+
+def format_time(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} мс"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} мкс"
+    return f"{ns:.0f} нс"
+
+
+def compare(results: List[dict], baseline_path: str):
+    """Сравнивает результаты с сохраненным прогоном"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(item['group'], item['name'], item['rows']): item['ns_per_op'] for item in baseline['results']}
+    print(f"\nСравнение с {baseline_path} (коммит {baseline['environment'].get('commit') or '?'}):")
+    regressions = 0
+    for item in results:
+        before = previous.get((item['group'], item['name'], item['rows']))
+        if before is None:
+            continue
+        ratio = item['ns_per_op'] / before
+        marker = " ⚠️" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += bool(marker)
+        rows = item['rows'] if item['rows'] is not None else ''
+        print(f"{item['name']:<36}{rows:>9}{format_time(before):>12} -> {format_time(item['ns_per_op']):>10}  x{ratio:.2f}{marker}")
+    print(f"Замедлений более чем в {REGRESSION_THRESHOLD}x: {regressions}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Микробенчмарки горячих путей бота")
+    parser.add_argument('--sizes', default='10,10000,1000000', help='размеры синтетических баз (число откликов) через запятую')
+    parser.add_argument('--data-dir', help='каталог для синтетических баз (сохраняются между прогонами)')
+    parser.add_argument('--repeat', type=int, default=5, help='серий замера')
+    parser.add_argument('--min-time', type=float, default=0.2, help='минимальная длительность серии, сек')
+    parser.add_argument('--only', help='замерять только случаи, в имени которых есть подстрока')
+    parser.add_argument('--json', help='файл для результатов в формате JSON')
+    parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    paths = {name: os.path.abspath(path) for name, path in (('json', args.json), ('compare', args.compare), ('data_dir', args.data_dir)) if path}
+
+    # Журнал бота и базы без --data-dir создаются во временном каталоге
+    with tempfile.TemporaryDirectory() as workdir:
+        data_dir = paths.get('data_dir', workdir)
+        os.makedirs(data_dir, exist_ok=True)
+        os.chdir(workdir)
+        try:
+            results = run(sizes, data_dir, args.repeat, args.min_time, args.only)
+        finally:
+            os.chdir(ROOT)
+
+    report = {'environment': environment(), 'results': results}
+    if 'json' in paths:
+        with open(paths['json'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if 'compare' in paths:
+        compare(results, paths['compare'])
+
+
+if __name__ == '__main__':
+    main()
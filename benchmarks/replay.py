@@ -0,0 +1,474 @@
+"""
+Нагрузочный прогон бота без обращения к Telegram.
+
+Приложение собирается функцией main.build_application() и работает против
+локального поддельного Bot API. Поток обновлений (сценарии просмотра,
+отклика и модерации или записанный файл) подается заданным числом
+одновременно активных пользователей. Обновления проходят через обработчик
+очереди приложения с тем же CONCURRENT_UPDATES, что и в рабочем боте,
+поэтому время обновления включает ожидание очереди; в отчете - пропускная способность, p50/p99 по обработчикам,
+обращения к БД и вызовы Bot API на обновление.
+
+Запуск: python -m benchmarks.replay --users 500 --concurrency 50
+        python -m benchmarks.replay --updates updates.jsonl.gz --json result.json
+        python -m benchmarks.replay --updates logs/updates/updates_20240601.jsonl.gz --speed 2
+"""
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import warnings
+from collections import Counter, defaultdict
+from time import perf_counter, time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import callbacks
+
+ADMIN_ID = 1
+FEEDBACK_CHAT_ID = -1000
+TOKEN = '123456:BENCHMARK'
+
+# Методы Bot API, возвращающие сообщение
+MESSAGE_METHODS = {
+    'sendMessage', 'sendPhoto', 'sendDocument', 'editMessageText',
+    'editMessageCaption', 'editMessageMedia', 'editMessageReplyMarkup'
+}
+PHOTO_METHODS = {'sendPhoto', 'editMessageMedia'}
+
+
+class FakeBotApi:
+    """Локальный HTTP-сервер, отвечающий на запросы Bot API правдоподобными данными"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._message_ids = itertools.count(1_000_000)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}/bot'
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _result(self, method: str, params: Dict[str, str]):
+        """Ответ на вызов метода"""
+        if method == 'getMe':
+            return {'id': 42, 'is_bot': True, 'first_name': 'Benchmark', 'username': 'benchmark_bot'}
+        if method not in MESSAGE_METHODS:
+            return True
+        chat_id = int(params.get('chat_id') or 0)
+        message_id = int(params.get('message_id') or next(self._message_ids))
+        message = {
+            'message_id': message_id,
+            'date': int(time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': params.get('text') or params.get('caption') or ''
+        }
+        if method in PHOTO_METHODS:
+            message['photo'] = [{'file_id': 'photo', 'file_unique_id': 'photo', 'width': 1, 'height': 1}]
+        return message
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обслуживает соединение клиента (с keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                method = request_line.split()[1].decode().split('?')[0].rsplit('/', 1)[-1]
+                self.calls[method] += 1
+                params = {}
+                if headers.get('content-type', '').startswith('application/x-www-form-urlencoded'):
+                    params = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                payload = json.dumps({'ok': True, 'result': self._result(method, params)}).encode()
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: %d\r\n\r\n' % len(payload) + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class UpdateFactory:
+    """Формирует обновления Telegram в виде словарей Bot API"""
+
+    def __init__(self):
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {'id': user_id, 'is_bot': False, 'first_name': f'User{user_id}', 'username': f'user{user_id}'}
+
+    def _message(self, user_id: int, text: str) -> dict:
+        message = {
+            'message_id': next(self._message_ids),
+            'date': int(time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': self._user(user_id),
+            'text': text
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return message
+
+    def message(self, user_id: int, text: str) -> dict:
+        return {'update_id': next(self._update_ids), 'message': self._message(user_id, text)}
+
+    def callback(self, user_id: int, action: str, *args: int) -> dict:
+        # Кнопка находится под сообщением бота в чате с пользователем
+        message = self._message(user_id, 'screen')
+        message['from'] = {'id': 42, 'is_bot': True, 'first_name': 'Benchmark'}
+        return {
+            'update_id': next(self._update_ids),
+            'callback_query': {
+                'id': str(next(self._update_ids)),
+                'from': self._user(user_id),
+                'chat_instance': str(user_id),
+                'data': callbacks.encode(action, *args),
+                'message': message
+            }
+        }
+
+
+def browse_scenario(factory: UpdateFactory, user_id: int, vacancy_ids: List[int]) -> List[dict]:
+    """Пользователь открывает список и просматривает несколько вакансий"""
+    updates = [factory.message(user_id, '/start'), factory.message(user_id, '📋 Вакансии')]
+    for vacancy_id in vacancy_ids[:3]:
+        updates.append(factory.callback(user_id, callbacks.VACANCY, vacancy_id))
+        updates.append(factory.callback(user_id, callbacks.BACK_TO_VACANCIES))
+    updates.append(factory.callback(user_id, callbacks.SUBSCRIBE))
+    return updates
+
+
+def apply_scenario(factory: UpdateFactory, user_id: int, vacancy_id: int) -> List[dict]:
+    """Пользователь откликается на вакансию и проверяет свои заявки"""
+    return [
+        factory.message(user_id, '/start'),
+        factory.callback(user_id, callbacks.VACANCY, vacancy_id),
+        factory.callback(user_id, callbacks.APPLY, vacancy_id),
+        factory.message(user_id, f'Здравствуйте! Меня зовут User{user_id}, опыт работы 5 лет, Python и SQL.'),
+        factory.message(user_id, '📝 Мои заявки')
+    ]
+
+
+def moderate_scenario(factory: UpdateFactory, admin_id: int, vacancy_ids: List[int], pages: int) -> List[dict]:
+    """Администратор принимает отклики постранично"""
+    updates = [factory.message(admin_id, '/start'), factory.callback(admin_id, callbacks.MODERATION_QUEUE)]
+    for vacancy_id in vacancy_ids:
+        for _ in range(pages):
+            updates.append(factory.callback(admin_id, callbacks.MODERATION_PAGE, vacancy_id, 0))
+            updates.append(factory.callback(admin_id, callbacks.MODERATION_SELECT_PAGE, vacancy_id, 0))
+            updates.append(factory.callback(admin_id, callbacks.MODERATION_ACCEPT, vacancy_id, 0))
+    return updates
+
+
+def _read_lines(path: str) -> Iterable[str]:
+    """Строки файла записи; обрывается на недописанном хвосте gzip после аварийной остановки"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        try:
+            yield from f
+        except EOFError:
+            print(f"{path}: файл оборван, прочитано до места обрыва")
+
+
+def load_updates(paths: List[str]) -> Dict[int, List[Tuple[Optional[float], dict]]]:
+    """
+    Читает записанные обновления и группирует их по пользователям.
+
+    Поддерживаются файлы utils.update_recorder ({"t": ..., "update": ...})
+    и строки с обновлением без времени; время переводится в смещение
+    от первого обновления записи.
+    """
+    records = []
+    for path in sorted(paths):
+        for line in _read_lines(path):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'update' in record:
+                records.append((record.get('t'), record['update']))
+            else:
+                records.append((None, record))
+
+    timestamps = [arrived for arrived, _ in records if arrived is not None]
+    first = min(timestamps) if timestamps else 0.0
+    streams: Dict[int, List[Tuple[Optional[float], dict]]] = defaultdict(list)
+    for arrived, update in sorted(records, key=lambda record: record[0] or 0.0):
+        for kind in ('message', 'edited_message', 'callback_query'):
+            if kind in update:
+                offset = arrived - first if arrived is not None else None
+                streams[update[kind]['from']['id']].append((offset, update))
+                break
+    return streams
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Процентиль отсортированной выборки"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def seed_database(vacancies: int, admins: Iterable[int] = ()) -> List[int]:
+    """Создает администраторов и вакансии в базе рабочего каталога"""
+    from database import Database
+    db = Database()
+    for admin_id in (ADMIN_ID, *admins):
+        db.add_admin(admin_id, 'admin')
+    return [
+        db.add_vacancy(f'Вакансия {number}', f'Описание вакансии {number}. Python, SQL, asyncio.')
+        for number in range(1, vacancies + 1)
+    ]
+
+
+async def replay(application, streams: List[List[dict]], concurrency: int) -> List[float]:
+    """Проигрывает потоки обновлений максимально быстро: обновления одного пользователя идут по порядку"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for stream in streams:
+        queue.put_nowait(stream)
+    durations: List[float] = []
+
+    async def worker():
+        while not queue.empty():
+            stream = queue.get_nowait()
+            for data in stream:
+                durations.append(await process(application, data))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return durations
+
+
+async def replay_timed(application, streams: List[List[Tuple[float, dict]]], speed: float) -> List[float]:
+    """Проигрывает записанные потоки с исходными интервалами, ускоренными в speed раз"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    durations: List[float] = []
+    late: List[float] = []
+
+    async def user(stream):
+        for offset, data in stream:
+            delay = started + offset / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Бот не успевает за записью: обновление приходит позже, чем в оригинале
+                late.append(-delay)
+            durations.append(await process(application, data))
+
+    await asyncio.gather(*(user(stream) for stream in streams))
+    if late:
+        print(f"Отставание от записи: {len(late)} обновлений, максимум {max(late):.2f} с")
+    return durations
+
+
+async def process(application, data: dict) -> float:
+    """Передает обновление приложению так же, как цикл получения обновлений, и возвращает время до ответа"""
+    from telegram import Update
+
+    update = Update.de_json(data, application.bot)
+    started = perf_counter()
+    # Ограничение одновременной обработки (CONCURRENT_UPDATES) действует как в рабочем боте
+    await application.update_processor.process_update(update, application.process_update(update))
+    return perf_counter() - started
+
+
+async def run(args) -> dict:
+    from config import Config
+    from main import build_application
+    from utils.metrics import metrics
+    from utils.logger import logger
+    from telegram.warnings import PTBUserWarning
+
+    # Предупреждения о настройке диалогов и JobQueue не относятся к замеру
+    warnings.filterwarnings('ignore', category=PTBUserWarning)
+
+    # Вывод действий пользователей в консоль заглушает отчет; в файл журнал пишется как обычно
+    for handler in logger.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+
+    vacancy_ids = seed_database(args.vacancies, args.admin)
+    factory = UpdateFactory()
+    if args.updates:
+        streams = list(load_updates(args.updates).values())
+        if args.speed and any(offset is None for stream in streams for offset, _ in stream):
+            # Для строк без времени получения исходные интервалы неизвестны
+            raise SystemExit("--speed требует записи со временем получения (формат UpdateRecorder); без --speed обновления проигрываются без пауз")
+        if args.speed:
+            phases = [('запись', streams)]
+        else:
+            phases = [('запись', [[data for _, data in stream] for stream in streams])]
+    else:
+        users = [
+            browse_scenario(factory, 1000 + n, vacancy_ids[n % len(vacancy_ids):] + vacancy_ids)
+            if n % 2 else apply_scenario(factory, 1000 + n, vacancy_ids[n % len(vacancy_ids)])
+            for n in range(args.users)
+        ]
+        pages = args.users // 2 // len(vacancy_ids) // 10 + 1
+        phases = [
+            ('просмотр и отклики', users),
+            ('модерация', [moderate_scenario(factory, ADMIN_ID, vacancy_ids, pages)])
+        ]
+
+    # Время, обращения к БД и вызовы Bot API каждого обработчика
+    samples: Dict[str, List[float]] = defaultdict(list)
+    db_queries: Counter = Counter()
+    api_calls: Counter = Counter()
+    observe = metrics.observe
+
+    def recording_observe(route, seconds, queries, stats, failed):
+        samples[route].append(seconds)
+        db_queries[route] += queries
+        api_calls[route] += stats.api_calls
+        observe(route, seconds, queries, stats, failed)
+
+    metrics.observe = recording_observe
+
+    api = FakeBotApi(latency=args.api_latency / 1000)
+    await api.start()
+    config = Config(
+        token=TOKEN,
+        feedback_chat_id=FEEDBACK_CHAT_ID,
+        loop_monitor=False,
+        concurrent_updates=args.concurrent_updates
+    )
+    application = build_application(config, base_url=api.base_url)
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+
+    durations: List[float] = []
+    started = perf_counter()
+    for name, streams in phases:
+        phase_started = perf_counter()
+        if args.updates and args.speed:
+            phase_durations = await replay_timed(application, streams, args.speed)
+        else:
+            phase_durations = await replay(application, streams, args.concurrency)
+        durations.extend(phase_durations)
+        print(f"{name}: {len(phase_durations)} обновлений за {perf_counter() - phase_started:.2f} с")
+    elapsed = perf_counter() - started
+
+    await application.stop()
+    if application.post_stop:
+        await application.post_stop(application)
+    await application.shutdown()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+    await api.stop()
+    metrics.observe = observe
+
+    durations.sort()
+    handlers = {}
+    for route, values in sorted(samples.items()):
+        values.sort()
+        handlers[route] = {
+            'count': len(values),
+            'p50_ms': percentile(values, 0.5) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'db_queries_per_update': db_queries[route] / len(values),
+            'api_calls_per_update': api_calls[route] / len(values)
+        }
+    return {
+        'updates': len(durations),
+        'seconds': elapsed,
+        'throughput': len(durations) / elapsed if elapsed else 0.0,
+        'concurrency': args.concurrency,
+        'concurrent_updates': args.concurrent_updates,
+        'speed': args.speed if args.updates else None,
+        'api_latency_ms': args.api_latency,
+        'p50_ms': percentile(durations, 0.5) * 1000,
+        'p99_ms': percentile(durations, 0.99) * 1000,
+        'api_calls_per_update': sum(api.calls.values()) / len(durations) if durations else 0.0,
+        'api_calls': dict(api.calls.most_common()),
+        'handlers': handlers
+    }
+
+
+def print_report(result: dict):
+    mode = f"скорость записи x{result['speed']:g}" if result['speed'] else f"пользователей {result['concurrency']}"
+    mode += f", одновременно обрабатывается {result['concurrent_updates']}"
+    print(f"\nОбновлений: {result['updates']} за {result['seconds']:.2f} с "
+          f"({result['throughput']:.0f} обн/с, {mode})")
+    print(f"Обновление: p50 {result['p50_ms']:.1f} мс, p99 {result['p99_ms']:.1f} мс, "
+          f"вызовов Bot API {result['api_calls_per_update']:.2f}")
+    print(f"\n{'обработчик':<32}{'кол-во':>8}{'p50 мс':>9}{'p99 мс':>9}{'БД/обн':>9}{'API/обн':>9}")
+    for route, stats in result['handlers'].items():
+        print(
+            f"{route:<32}{stats['count']:>8}{stats['p50_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+            f"{stats['db_queries_per_update']:>9.2f}{stats['api_calls_per_update']:>9.2f}"
+        )
+    print("\nВызовы Bot API: " + ", ".join(f"{method} {count}" for method, count in result['api_calls'].items()))
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=200, help='виртуальных пользователей')
+    parser.add_argument('--vacancies', type=int, default=5, help='вакансий в базе')
+    parser.add_argument('--concurrency', type=int, default=20, help='одновременно активных пользователей')
+    parser.add_argument('--concurrent-updates', type=int, default=Config.concurrent_updates,
+                        help='обновлений, обрабатываемых одновременно (CONCURRENT_UPDATES рабочего бота)')
+    parser.add_argument('--api-latency', type=float, default=0, help='задержка ответа поддельного Bot API, мс')
+    parser.add_argument('--updates', nargs='+', help='файлы записанных обновлений (JSON lines, можно .gz) вместо сценариев')
+    parser.add_argument('--speed', type=float, help='проигрывать запись с исходными интервалами, ускоренными в N раз (1 - как в оригинале)')
+    parser.add_argument('--admin', type=int, action='append', default=[], help='id (псевдоним) администратора из записи')
+    parser.add_argument('--json', help='файл для результатов в формате JSON')
+    args = parser.parse_args()
+    if args.updates:
+        args.updates = [os.path.abspath(path) for path in args.updates]
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    # База, состояния диалогов и журналы создаются во временном каталоге
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            result = asyncio.run(run(args))
+        finally:
+            os.chdir(ROOT)
+
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
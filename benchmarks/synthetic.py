@@ -0,0 +1,132 @@
+"""
+Генератор синтетических баз данных для бенчмарков.
+
+Размер базы задается числом откликов; вакансий - по одной на тысячу
+откликов (не меньше пяти), каждый кандидат откликается на несколько
+вакансий. Отклики распределены по последним 90 дням, часть из них
+попадает в окно повторного отклика.
+
+Запуск: python -m benchmarks.synthetic bench.db --rows 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+# Первый id синтетических кандидатов
+FIRST_USER_ID = 100_000
+
+# Откликов на одного кандидата
+APPLICATIONS_PER_USER = 5
+
+# Откликов в одной транзакции вставки
+CHUNK_SIZE = 50_000
+
+WORDS = (
+    "опыт", "работы", "Python", "SQL", "asyncio", "лет", "команда", "проект",
+    "разработка", "поддержка", "Node", "JS", "игровой", "сервер", "backend"
+)
+
+
+def vacancy_count(rows: int) -> int:
+    """Число вакансий в базе с rows откликами"""
+    return max(5, rows // 1000)
+
+
+def user_count(rows: int) -> int:
+    """Число кандидатов в базе с rows откликами"""
+    return max(1, -(-rows // min(APPLICATIONS_PER_USER, vacancy_count(rows))))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _applications(rows: int, rng: random.Random) -> Iterator[Tuple]:
+    """Отклики с уникальными парами (кандидат, вакансия)"""
+    vacancies = vacancy_count(rows)
+    per_user = min(APPLICATIONS_PER_USER, vacancies)
+    now = datetime.utcnow()
+    for i in range(rows):
+        user_index = i // per_user
+        user_id = FIRST_USER_ID + user_index
+        # Подряд идущие отклики кандидата приходятся на разные вакансии
+        vacancy_id = (user_index * 7 + i % per_user) % vacancies + 1
+        status = rng.choices(('pending', 'accepted', 'rejected'), weights=(6, 1, 3))[0]
+        applied_at = now - timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+        yield (
+            user_id,
+            vacancy_id,
+            status,
+            applied_at.strftime('%Y-%m-%d %H:%M:%S'),
+            _text(rng, rng.randint(10, 40)),
+            f"user{user_id}"
+        )
+
+
+def generate_database(path: str, rows: int, seed: int = 1) -> str:
+    """Создает базу со схемой бота и rows откликами; существующий файл перезаписывается"""
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+    # Схему создает сам Database, чтобы она совпадала с рабочей
+    Database(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executemany(
+            "INSERT INTO vacancies (title, description, is_active) VALUES (?, ?, ?)",
+            (
+                (f"Вакансия {number}", _text(rng, 80), rng.random() < 0.8)
+                for number in range(1, vacancy_count(rows) + 1)
+            )
+        )
+        applications = _applications(rows, rng)
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK_SIZE), applications)]
+            if not chunk:
+                break
+            conn.executemany(
+                "INSERT INTO applications (user_id, vacancy_id, status, applied_at, message, username) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                chunk
+            )
+        conn.execute(
+            "INSERT INTO subscriptions (user_id) SELECT DISTINCT user_id FROM applications WHERE user_id % 3 = 0"
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return path
+
+
+def remove_added_applications(path: str, rows: int):
+    """Удаляет отклики, добавленные в синтетическую базу после генерации"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("DELETE FROM applications WHERE user_id >= ?", (FIRST_USER_ID + user_count(rows),))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор синтетической базы данных бота")
+    parser.add_argument('path', help='файл базы данных')
+    parser.add_argument('--rows', type=int, default=10_000, help='число откликов')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    generate_database(args.path, args.rows, args.seed)
+    print(f"{args.path}: {args.rows} откликов, {vacancy_count(args.rows)} вакансий, {user_count(args.rows)} кандидатов")
+
+
+if __name__ == '__main__':
+    main()
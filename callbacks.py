@@ -0,0 +1,207 @@
+"""Компактное кодирование callback_data и маршрутизация нажатий inline-кнопок"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import ContextTypes
+
+# Версия формата callback_data: первый символ строки
+CALLBACK_VERSION = '1'
+
+# Действия и их короткие коды
+VACANCY = 'vacancy'
+APPLY = 'apply'
+BACK_TO_VACANCIES = 'back_to_vacancies'
+NO_VACANCIES = 'no_vacancies'
+ADMIN_PANEL = 'admin_panel'
+ADD_VACANCY = 'add_vacancy'
+SKIP_IMAGE = 'skip_image'
+EDIT_VACANCIES = 'edit_vacancies'
+BACK_TO_MAIN = 'back_to_main'
+EDIT_VACANCY = 'edit_vacancy'
+EDIT_TITLE = 'edit_title'
+EDIT_DESCRIPTION = 'edit_description'
+CANCEL_EDIT = 'cancel_edit'
+TOGGLE_STATUS = 'toggle_status'
+DELETE_VACANCY = 'delete_vacancy'
+APPLICATION_ACCEPT = 'application_accept'
+APPLICATION_REJECT = 'application_reject'
+MODERATION_QUEUE = 'moderation_queue'
+MODERATION_PAGE = 'moderation_page'
+MODERATION_TOGGLE = 'moderation_toggle'
+MODERATION_SELECT_PAGE = 'moderation_select_page'
+MODERATION_ACCEPT = 'moderation_accept'
+MODERATION_REJECT = 'moderation_reject'
+DIGEST_ACCEPT = 'digest_accept'
+DIGEST_REJECT = 'digest_reject'
+DIGEST_DONE = 'digest_done'
+SUBSCRIBE = 'subscribe'
+UNSUBSCRIBE = 'unsubscribe'
+KEYWORDS_CLEAR = 'keywords_clear'
+QUICK_APPLY = 'quick_apply'
+EDIT_PROFILE = 'edit_profile'
+SAVE_PROFILE = 'save_profile'
+
+ACTION_CODES = {
+    VACANCY: 'v',
+    APPLY: 'a',
+    BACK_TO_VACANCIES: 'b',
+    NO_VACANCIES: 'n',
+    ADMIN_PANEL: 'p',
+    ADD_VACANCY: 'av',
+    SKIP_IMAGE: 'si',
+    EDIT_VACANCIES: 'el',
+    BACK_TO_MAIN: 'm',
+    EDIT_VACANCY: 'ev',
+    EDIT_TITLE: 'et',
+    EDIT_DESCRIPTION: 'ed',
+    CANCEL_EDIT: 'ce',
+    TOGGLE_STATUS: 'ts',
+    DELETE_VACANCY: 'dv',
+    APPLICATION_ACCEPT: 'aa',
+    APPLICATION_REJECT: 'ar',
+    MODERATION_QUEUE: 'mq',
+    MODERATION_PAGE: 'mp',
+    MODERATION_TOGGLE: 'mt',
+    MODERATION_SELECT_PAGE: 'ms',
+    MODERATION_ACCEPT: 'ma',
+    MODERATION_REJECT: 'mr',
+    DIGEST_ACCEPT: 'da',
+    DIGEST_REJECT: 'dr',
+    DIGEST_DONE: 'dd',
+    SUBSCRIBE: 'sb',
+    UNSUBSCRIBE: 'us',
+    KEYWORDS_CLEAR: 'kc',
+    QUICK_APPLY: 'qa',
+    EDIT_PROFILE: 'ep',
+    SAVE_PROFILE: 'sp'
+}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+
+# Число идентификаторов в данных кнопки; действия, которых нет в списке, идентификаторов не принимают
+ACTION_ARGS = {
+    VACANCY: 1,
+    APPLY: 1,
+    EDIT_VACANCY: 1,
+    EDIT_TITLE: 1,
+    EDIT_DESCRIPTION: 1,
+    CANCEL_EDIT: 1,
+    TOGGLE_STATUS: 1,
+    DELETE_VACANCY: 1,
+    APPLICATION_ACCEPT: 1,
+    APPLICATION_REJECT: 1,
+    MODERATION_PAGE: 2,
+    MODERATION_TOGGLE: 3,
+    MODERATION_SELECT_PAGE: 2,
+    MODERATION_ACCEPT: 2,
+    MODERATION_REJECT: 2,
+    DIGEST_ACCEPT: 1,
+    DIGEST_REJECT: 1,
+    DIGEST_DONE: 1,
+    QUICK_APPLY: 1
+}
+
+# Формат кнопок, отправленных до введения версий (вида vacancy_12)
+_LEGACY_RE = re.compile(r'^([a-z_]+?)(?:_(\d+))?$')
+
+
+@dataclass(frozen=True)
+class CallbackData:
+    """Разобранные данные нажатия кнопки"""
+    action: str
+    args: Tuple[int, ...] = ()
+
+    @property
+    def id(self) -> Optional[int]:
+        """Первый идентификатор из данных кнопки (None, если его нет)"""
+        return self.args[0] if self.args else None
+
+
+def _to_base36(value: int) -> str:
+    """Записывает неотрицательное число в системе счисления по основанию 36"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    if value == 0:
+        return '0'
+    result = []
+    while value:
+        value, remainder = divmod(value, 36)
+        result.append(digits[remainder])
+    return ''.join(reversed(result))
+
+
+def encode(action: str, *args: int) -> str:
+    """Кодирует действие и идентификаторы в callback_data, например '1v:c'"""
+    data = CALLBACK_VERSION + ACTION_CODES[action]
+    if args:
+        data += ':' + ':'.join(_to_base36(arg) for arg in args)
+    return data
+
+
+def _checked(parsed: CallbackData) -> Optional[CallbackData]:
+    """Отклоняет данные, в которых число идентификаторов не совпадает с ожидаемым для действия"""
+    if len(parsed.args) != ACTION_ARGS.get(parsed.action, 0):
+        return None
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def decode(data: str) -> Optional[CallbackData]:
+    """Разбирает callback_data текущего или устаревшего формата; None - данные не распознаны"""
+    if not data:
+        return None
+    try:
+        if data[0] == CALLBACK_VERSION:
+            head, *args = data[1:].split(':')
+            action = CODE_ACTIONS.get(head)
+            if action is None:
+                return None
+            return _checked(CallbackData(action, tuple(int(arg, 36) for arg in args)))
+
+        # Кнопки в старых сообщениях продолжают работать
+        match = _LEGACY_RE.match(data)
+        if match and match.group(1) in ACTION_CODES:
+            action, arg = match.groups()
+            return _checked(CallbackData(action, (int(arg),) if arg else ()))
+    except ValueError:
+        return None
+    return None
+
+
+def action_filter(*actions: str) -> Callable[[object], bool]:
+    """Возвращает фильтр для параметра pattern у CallbackQueryHandler"""
+    def check(data: object) -> bool:
+        parsed = decode(data) if isinstance(data, str) else None
+        return parsed is not None and parsed.action in actions
+    return check
+
+
+def callback_args(update: 'Update') -> Optional[CallbackData]:
+    """Возвращает разобранные данные нажатой кнопки"""
+    return decode(update.callback_query.data)
+
+
+Handler = Callable[['Update', 'ContextTypes.DEFAULT_TYPE'], Awaitable[object]]
+
+
+class CallbackRouter:
+    """Маршрутизатор нажатий inline-кнопок по коду действия"""
+
+    def __init__(self):
+        self.routes: Dict[str, Handler] = {}
+
+    def add(self, action: str, handler: Handler):
+        """Регистрирует обработчик действия"""
+        self.routes[action] = handler
+
+    async def dispatch(self, update: 'Update', context: 'ContextTypes.DEFAULT_TYPE'):
+        """Вызывает обработчик, соответствующий нажатой кнопке"""
+        data = callback_args(update)
+        handler = self.routes.get(data.action) if data else None
+        if handler is None:
+            # Неизвестная или информационная кнопка - просто убираем индикатор загрузки
+            await update.callback_query.answer()
+            return
+        return await handler(update, context)
@@ -6,6 +6,35 @@ class Config:
     """Конфигурация бота"""
     token: str
     feedback_chat_id: int
+    persistence_flush_interval: float = 60  # Интервал сохранения состояний диалогов, сек
+    conversation_timeout: int = 1800  # Таймаут незавершенного диалога, сек
+    session_idle_ttl: int = 3600  # Время хранения данных неактивного пользователя, сек
+    session_sweep_interval: int = 300  # Интервал очистки неактивных сессий, сек
+    max_sessions: int = 10000  # Максимальное число хранимых сессий
+    outbox_rate: float = 25  # Максимум исходящих сообщений в секунду для очереди отправки
+    feedback_digest_interval: float = 0  # Интервал сводки откликов, сек (0 - отправлять сразу)
+    feedback_digest_max_items: int = 8  # Максимум откликов в одной сводке
+    feedback_digest_threshold: int = 3  # Сколько откликов за интервал отправлять сразу
+    broadcast_batch_size: int = 100  # Подписчиков в одной пачке рассылки
+    max_attachment_size_mb: int = 20  # Максимальный размер файла, приложенного к отклику, МБ
+    metrics_port: int = 0  # Порт локального HTTP-сервера метрик (0 - отключен)
+    api_call_budget: int = 0  # Бюджет вызовов Bot API на обновление (0 - без проверки)
+    query_profiling: bool = False  # Замер времени запросов к БД
+    slow_query_ms: float = 50  # Порог медленного запроса, мс
+    loop_monitor: bool = True  # Измерение задержки событийного цикла
+    loop_lag_threshold_ms: float = 100  # Порог блокировки событийного цикла, мс
+    asyncio_debug: bool = False  # Отладочный режим asyncio с журналом медленных обратных вызовов
+    update_recording: bool = False  # Запись входящих обновлений для нагрузочных прогонов
+    update_record_dir: str = 'logs/updates'  # Каталог записей обновлений
+    update_record_salt: str = ''  # Соль псевдонимов пользователей (пусто - случайная на каждый запуск)
+    memory_report_interval: int = 0  # Интервал отчетов о памяти, сек (0 - отключены)
+    tracemalloc_frames: int = 0  # Глубина стека tracemalloc (0 - трассировка выключена)
+    log_max_size_mb: float = 5  # Размер файла журнала, после которого начинается новая часть, МБ
+    log_retention_days: float = 30  # Срок хранения ротированных журналов, дней (0 - без ограничения)
+    log_max_total_mb: float = 500  # Суммарный размер журналов, МБ (0 - без ограничения)
+    log_compression: str = 'gzip'  # Сжатие ротированных журналов: gzip, zstd или none
+    log_format: str = 'text'  # Формат файла журнала: text или json (JSON Lines)
+    concurrent_updates: int = 1  # Обновлений, обрабатываемых одновременно (1 - по очереди)
 
 # Загрузка конфигурации из .env
 def load_config() -> Config:
@@ -14,5 +43,34 @@ def load_config() -> Config:
     
     return Config(
         token=env.str('BOT_TOKEN'),
-        feedback_chat_id=env.int('FEEDBACK_CHAT_ID')
+        feedback_chat_id=env.int('FEEDBACK_CHAT_ID'),
+        persistence_flush_interval=env.float('PERSISTENCE_FLUSH_INTERVAL', 60),
+        conversation_timeout=env.int('CONVERSATION_TIMEOUT', 1800),
+        session_idle_ttl=env.int('SESSION_IDLE_TTL', 3600),
+        session_sweep_interval=env.int('SESSION_SWEEP_INTERVAL', 300),
+        max_sessions=env.int('MAX_SESSIONS', 10000),
+        outbox_rate=env.float('OUTBOX_RATE', 25),
+        feedback_digest_interval=env.float('FEEDBACK_DIGEST_INTERVAL', 0),
+        feedback_digest_max_items=env.int('FEEDBACK_DIGEST_MAX_ITEMS', 8),
+        feedback_digest_threshold=env.int('FEEDBACK_DIGEST_THRESHOLD', 3),
+        broadcast_batch_size=env.int('BROADCAST_BATCH_SIZE', 100),
+        max_attachment_size_mb=env.int('MAX_ATTACHMENT_SIZE_MB', 20),
+        metrics_port=env.int('METRICS_PORT', 0),
+        api_call_budget=env.int('API_CALL_BUDGET', 0),
+        query_profiling=env.bool('QUERY_PROFILING', False),
+        slow_query_ms=env.float('SLOW_QUERY_MS', 50),
+        loop_monitor=env.bool('LOOP_MONITOR', True),
+        loop_lag_threshold_ms=env.float('LOOP_LAG_THRESHOLD_MS', 100),
+        asyncio_debug=env.bool('ASYNCIO_DEBUG', False),
+        update_recording=env.bool('UPDATE_RECORDING', False),
+        update_record_dir=env.str('UPDATE_RECORD_DIR', 'logs/updates'),
+        update_record_salt=env.str('UPDATE_RECORD_SALT', ''),
+        memory_report_interval=env.int('MEMORY_REPORT_INTERVAL', 0),
+        tracemalloc_frames=env.int('TRACEMALLOC_FRAMES', 0),
+        log_max_size_mb=env.float('LOG_MAX_SIZE_MB', 5),
+        log_retention_days=env.float('LOG_RETENTION_DAYS', 30),
+        log_max_total_mb=env.float('LOG_MAX_TOTAL_MB', 500),
+        log_compression=env.str('LOG_COMPRESSION', 'gzip'),
+        log_format=env.str('LOG_FORMAT', 'text'),
+        concurrent_updates=env.int('CONCURRENT_UPDATES', 1)
     )
@@ -1,8 +1,38 @@
 import sqlite3
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from dataclasses import dataclass
 import re
 from contextlib import contextmanager
+from utils.application_index import ApplicationIndex
+from utils.query_profiler import ProfilingConnection, QueryProfiler
+from templates import sanitize_markdown, template_cache
+
+# Период, в течение которого нельзя повторно откликнуться на вакансию
+APPLICATION_COOLDOWN_HOURS = 24
+
+# Поля откликов, добавленные после первой версии схемы
+APPLICATION_EXTRA_COLUMNS = (
+    ('moderator_id', 'INTEGER'),
+    ('decided_at', 'TIMESTAMP'),
+    ('username', 'TEXT'),
+    ('message', 'TEXT'),
+    ('attachments', 'TEXT')  # JSON со списком file_id вложений
+)
+
+# Индексы недавних откликов, общие для всех экземпляров Database с одним файлом БД
+_application_indexes: Dict[str, ApplicationIndex] = {}
+
+# Файлы БД, для которых уже созданы таблицы
+_initialized_paths: Set[str] = set()
+
+# Профилировщик запросов, включается через enable_query_profiling()
+query_profiler: Optional[QueryProfiler] = None
+
+def enable_query_profiling(slow_query_ms: float = 50) -> QueryProfiler:
+    """Включает замер времени всех запросов и журнал медленных запросов"""
+    global query_profiler
+    query_profiler = QueryProfiler(slow_query_ms)
+    return query_profiler
 
 @dataclass
 class Vacancy:
@@ -21,15 +51,51 @@ class Application:
     applied_at: str
     feedback: Optional[str] = None
 
+@dataclass
+class ApplicationDecision:
+    """Результат решения по отклику"""
+    application_id: int
+    user_id: int
+    vacancy_title: str
+    status: str
+
+@dataclass
+class Broadcast:
+    """Рассылка о новой вакансии и ее прогресс"""
+    id: int
+    vacancy_id: int
+    cursor: int  # user_id последнего обработанного подписчика
+    sent: int
+    failed: int
+    status: str  # running, done, cancelled
+
+@dataclass
+class PendingApplication:
+    """Отклик в очереди модерации"""
+    id: int
+    user_id: int
+    username: Optional[str]
+    message: Optional[str]
+    applied_at: str
+
 class Database:
     def __init__(self, db_path: str = "bot_database.db"):
         self.db_path = db_path
-        self._create_tables()
+        # Таблицы создаются один раз за время работы процесса
+        if db_path not in _initialized_paths:
+            self._create_tables()
+            _initialized_paths.add(db_path)
+        self.application_index = self._get_application_index()
     
     @contextmanager
-    def get_connection(self):
-        """Безопасное получение соединения с базой данных"""
-        conn = sqlite3.connect(self.db_path)
+    def get_connection(self, method: str = 'unknown'):
+        """Безопасное получение соединения с базой данных; method - имя метода Database для статистики запросов"""
+        if query_profiler is None:
+            conn = sqlite3.connect(self.db_path)
+        else:
+            conn = sqlite3.connect(self.db_path, factory=ProfilingConnection)
+            conn.profiler = query_profiler
+            conn.method = method
         try:
             yield conn
         finally:
@@ -45,7 +111,7 @@ class Database:
     
     def _create_tables(self):
         """Создание необходимых таблиц"""
-        with self.get_connection() as conn:
+        with self.get_connection('_create_tables') as conn:
             cursor = conn.cursor()
             # Таблица администраторов
             cursor.execute("""
@@ -79,12 +145,80 @@ class Database:
                     UNIQUE(user_id, vacancy_id)
                 )
             """)
+            # Добавляем новые поля откликов в существующие базы
+            cursor.execute("PRAGMA table_info(applications)")
+            columns = {row[1] for row in cursor.fetchall()}
+            for column, column_type in APPLICATION_EXTRA_COLUMNS:
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE applications ADD COLUMN {column} {column_type}")
+            # Индекс для очереди модерации
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_applications_status_vacancy
+                ON applications (status, vacancy_id, id)
+            """)
+            # Подписчики на уведомления о новых вакансиях
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    user_id INTEGER PRIMARY KEY,
+                    subscribed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Анкеты кандидатов для отклика в одно нажатие
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS candidate_profiles (
+                    user_id INTEGER PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Подписки на ключевые слова в вакансиях
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS keyword_alerts (
+                    user_id INTEGER NOT NULL,
+                    term TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, term)
+                )
+            """)
+            # Рассылки с сохраненным прогрессом для продолжения после перезапуска
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS broadcasts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    vacancy_id INTEGER NOT NULL,
+                    cursor INTEGER NOT NULL DEFAULT 0,
+                    sent INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            """)
             conn.commit()
 
+    def _get_application_index(self) -> ApplicationIndex:
+        """Возвращает индекс откликов, загружая его из БД при первом обращении"""
+        index = _application_indexes.get(self.db_path)
+        if index is None:
+            index = ApplicationIndex(cooldown_seconds=APPLICATION_COOLDOWN_HOURS * 60 * 60)
+            _application_indexes[self.db_path] = index
+        if not index.loaded:
+            try:
+                with self.get_connection('_get_application_index') as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        SELECT user_id, vacancy_id, CAST(strftime('%s', applied_at) AS INTEGER)
+                        FROM applications
+                        WHERE datetime(applied_at, ?) > datetime('now')
+                    """, (f'+{APPLICATION_COOLDOWN_HOURS} hours',))
+                    index.load(cursor.fetchall())
+            except sqlite3.Error:
+                pass
+        return index
+
     def add_admin(self, user_id: int, username: str) -> bool:
         """Добавляет администратора"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('add_admin') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "INSERT OR IGNORE INTO admins (user_id, username) VALUES (?, ?)",
@@ -98,11 +232,11 @@ class Database:
     def add_vacancy(self, title: str, description: str, image_id: str = None) -> Optional[int]:
         """Добавляет вакансию"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('add_vacancy') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "INSERT INTO vacancies (title, description, image_id) VALUES (?, ?, ?)",
-                    (title, description, image_id)
+                    (self._sanitize_input(title), sanitize_markdown(description), image_id)
                 )
                 conn.commit()
                 return cursor.lastrowid
@@ -112,7 +246,7 @@ class Database:
     def update_vacancy(self, vacancy_id: int, title: str = None, description: str = None, is_active: bool = None, image_id: str = None) -> bool:
         """Обновляет информацию о вакансии"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('update_vacancy') as conn:
                 cursor = conn.cursor()
                 
                 # Собираем параметры для обновления
@@ -125,7 +259,8 @@ class Database:
                 
                 if description is not None:
                     updates.append("description = ?")
-                    values.append(self._sanitize_input(description))
+                    # Разметка описания сохраняется, непарные символы экранируются - как при добавлении
+                    values.append(sanitize_markdown(description))
                 
                 if is_active is not None:
                     updates.append("is_active = ?")
@@ -145,6 +280,7 @@ class Database:
                 query = f"UPDATE vacancies SET {', '.join(updates)} WHERE id = ?"
                 cursor.execute(query, values)
                 conn.commit()
+                template_cache.invalidate_vacancy(vacancy_id)
                 
                 return cursor.rowcount > 0
         except sqlite3.Error:
@@ -153,7 +289,7 @@ class Database:
     def get_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
         """Получает информацию о вакансии"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('get_vacancy') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "SELECT id, title, description, is_active, image_id FROM vacancies WHERE id = ?",
@@ -170,7 +306,7 @@ class Database:
     def get_active_vacancies(self) -> List[Vacancy]:
         """Получает список активных вакансий"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('get_active_vacancies') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "SELECT id, title, description, is_active, image_id FROM vacancies WHERE is_active = 1"
@@ -182,7 +318,7 @@ class Database:
     def get_all_vacancies(self) -> List[Vacancy]:
         """Получает список всех вакансий для администратора"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('get_all_vacancies') as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, title, description, is_active, image_id 
@@ -196,7 +332,7 @@ class Database:
     def toggle_vacancy_status(self, vacancy_id: int) -> bool:
         """Переключает статус активности вакансии"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('toggle_vacancy_status') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "UPDATE vacancies SET is_active = NOT is_active WHERE id = ?",
@@ -210,7 +346,7 @@ class Database:
     def update_vacancy_status(self, vacancy_id: int, is_active: bool) -> bool:
         """Обновляет статус вакансии"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('update_vacancy_status') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "UPDATE vacancies SET is_active = ? WHERE id = ?",
@@ -224,27 +360,30 @@ class Database:
     def delete_vacancy(self, vacancy_id: int) -> bool:
         """Удаляет вакансию"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('delete_vacancy') as conn:
                 cursor = conn.cursor()
                 # Сначала удаляем все отклики на эту вакансию
                 cursor.execute("DELETE FROM applications WHERE vacancy_id = ?", (vacancy_id,))
                 # Затем удаляем саму вакансию
                 cursor.execute("DELETE FROM vacancies WHERE id = ?", (vacancy_id,))
                 conn.commit()
+                self.application_index.discard_vacancy(vacancy_id)
+                template_cache.invalidate_vacancy(vacancy_id)
                 return cursor.rowcount > 0
         except sqlite3.Error:
             return False
 
-    def add_application(self, user_id: int, vacancy_id: int) -> Optional[int]:
+    def add_application(self, user_id: int, vacancy_id: int, message: str = None, username: str = None, attachments: str = None) -> Optional[int]:
         """Добавляет отклик на вакансию"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('add_application') as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    "INSERT INTO applications (user_id, vacancy_id) VALUES (?, ?)",
-                    (user_id, vacancy_id)
+                    "INSERT INTO applications (user_id, vacancy_id, message, username, attachments) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, vacancy_id, message, username, attachments)
                 )
                 conn.commit()
+                self.application_index.add(user_id, vacancy_id)
                 return cursor.lastrowid
         except sqlite3.IntegrityError:
             return None
@@ -252,7 +391,7 @@ class Database:
     def update_application_status(self, application_id: int, status: str, feedback: str = None) -> bool:
         """Обновляет статус отклика"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('update_application_status') as conn:
                 cursor = conn.cursor()
                 if feedback:
                     cursor.execute(
@@ -269,10 +408,114 @@ class Database:
         except sqlite3.Error:
             return False
 
+    def decide_application(self, application_id: int, status: str, moderator_id: int, feedback: str = None) -> Optional[ApplicationDecision]:
+        """
+        Принимает решение по отклику, если оно еще не принято.
+
+        Обновление выполняется только для откликов в статусе pending, поэтому
+        при одновременных решениях нескольких модераторов выигрывает первое.
+        Возвращает None, если отклик не найден или решение по нему уже принято.
+        """
+        try:
+            with self.get_connection('decide_application') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE applications
+                    SET status = ?, feedback = ?, moderator_id = ?, decided_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND status = 'pending'
+                    RETURNING user_id, vacancy_id
+                """, (status, self._sanitize_input(feedback) if feedback else None, moderator_id, application_id))
+                result = cursor.fetchone()
+                if not result:
+                    conn.rollback()
+                    return None
+                
+                user_id, vacancy_id = result
+                cursor.execute("SELECT title FROM vacancies WHERE id = ?", (vacancy_id,))
+                vacancy = cursor.fetchone()
+                if not vacancy:
+                    conn.rollback()
+                    return None
+                
+                conn.commit()
+                return ApplicationDecision(application_id, user_id, vacancy[0], status)
+        except sqlite3.Error:
+            return None
+
+    def get_pending_counts(self) -> List[Tuple[int, str, int]]:
+        """Возвращает число откликов на рассмотрении по вакансиям: (id, название, количество)"""
+        try:
+            with self.get_connection('get_pending_counts') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT v.id, v.title, COUNT(*)
+                    FROM applications a
+                    JOIN vacancies v ON v.id = a.vacancy_id
+                    WHERE a.status = 'pending'
+                    GROUP BY v.id
+                    ORDER BY v.id
+                """)
+                return cursor.fetchall()
+        except sqlite3.Error:
+            return []
+
+    def get_pending_applications(self, vacancy_id: int, after_id: int = 0, limit: int = 10) -> List[PendingApplication]:
+        """Возвращает страницу откликов на рассмотрении (пагинация по ID отклика)"""
+        try:
+            with self.get_connection('get_pending_applications') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, user_id, username, message, applied_at
+                    FROM applications
+                    WHERE status = 'pending' AND vacancy_id = ? AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (vacancy_id, after_id, limit))
+                return [PendingApplication(*row) for row in cursor.fetchall()]
+        except sqlite3.Error:
+            return []
+
+    def decide_applications(self, application_ids: Iterable[int], status: str, moderator_id: int, feedback: str = None) -> List[ApplicationDecision]:
+        """
+        Принимает решение сразу по нескольким откликам одной транзакцией.
+
+        Возвращает решения только по тем откликам, которые были на рассмотрении.
+        """
+        ids = list(application_ids)
+        if not ids:
+            return []
+        try:
+            with self.get_connection('decide_applications') as conn:
+                cursor = conn.cursor()
+                # Блокируем запись, чтобы между выборкой и обновлением никто не принял решение
+                cursor.execute("BEGIN IMMEDIATE")
+                placeholders = ', '.join('?' * len(ids))
+                cursor.execute(f"""
+                    SELECT a.id, a.user_id, v.title
+                    FROM applications a
+                    JOIN vacancies v ON v.id = a.vacancy_id
+                    WHERE a.id IN ({placeholders}) AND a.status = 'pending'
+                """, ids)
+                pending = cursor.fetchall()
+                
+                feedback = self._sanitize_input(feedback) if feedback else None
+                cursor.executemany("""
+                    UPDATE applications
+                    SET status = ?, feedback = ?, moderator_id = ?, decided_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND status = 'pending'
+                """, [(status, feedback, moderator_id, application_id) for application_id, _, _ in pending])
+                conn.commit()
+                return [
+                    ApplicationDecision(application_id, user_id, title, status)
+                    for application_id, user_id, title in pending
+                ]
+        except sqlite3.Error:
+            return []
+
     def get_application(self, application_id: int) -> Optional[Application]:
         """Получает информацию об отклике"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('get_application') as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT id, user_id, vacancy_id, status, applied_at, feedback
@@ -286,7 +529,7 @@ class Database:
     def get_user_applications(self, user_id: int) -> List[tuple]:
         """Получает список откликов пользователя"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('get_user_applications') as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT 
@@ -307,21 +550,24 @@ class Database:
 
     def can_apply_to_vacancy(self, user_id: int, vacancy_id: int) -> bool:
         """Проверяет, может ли пользователь откликнуться на вакансию"""
+        # Недавние отклики проверяем по индексу в памяти, без запроса к БД
+        if self.application_index.loaded:
+            if self.application_index.applied_recently(user_id, vacancy_id):
+                return False
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('can_apply_to_vacancy') as conn:
                 cursor = conn.cursor()
-                # Проверяем, не отправлял ли пользователь отклик в последние 24 часа
-                cursor.execute("""
-                    SELECT applied_at 
-                    FROM applications 
-                    WHERE user_id = ? AND vacancy_id = ? 
-                    AND datetime(applied_at, '+24 hours') > datetime('now')
-                """, (user_id, vacancy_id))
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    return False  # Уже отправлял отклик недавно
+                if not self.application_index.loaded:
+                    # Индекс не загрузился - проверяем отклики в последние 24 часа через БД
+                    cursor.execute("""
+                        SELECT applied_at 
+                        FROM applications 
+                        WHERE user_id = ? AND vacancy_id = ? 
+                        AND datetime(applied_at, ?) > datetime('now')
+                    """, (user_id, vacancy_id, f'+{APPLICATION_COOLDOWN_HOURS} hours'))
+                    
+                    if cursor.fetchone():
+                        return False  # Уже отправлял отклик недавно
                 
                 # Проверяем, активна ли вакансия
                 cursor.execute(
@@ -337,9 +583,178 @@ class Database:
     def is_admin(self, user_id: int) -> bool:
         """Проверяет, является ли пользователь администратором"""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection('is_admin') as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
                 return cursor.fetchone() is not None
         except sqlite3.Error:
             return False
+
+    def subscribe(self, user_id: int) -> bool:
+        """Подписывает пользователя на уведомления о новых вакансиях"""
+        try:
+            with self.get_connection('subscribe') as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT OR IGNORE INTO subscriptions (user_id) VALUES (?)", (user_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error:
+            return False
+
+    def unsubscribe(self, user_id: int) -> bool:
+        """Отписывает пользователя от уведомлений"""
+        try:
+            with self.get_connection('unsubscribe') as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error:
+            return False
+
+    def is_subscribed(self, user_id: int) -> bool:
+        """Проверяет, подписан ли пользователь на уведомления"""
+        try:
+            with self.get_connection('is_subscribed') as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM subscriptions WHERE user_id = ?", (user_id,))
+                return cursor.fetchone() is not None
+        except sqlite3.Error:
+            return False
+
+    def get_subscribers(self, after_user_id: int = 0, limit: int = 100) -> List[int]:
+        """Возвращает следующую пачку подписчиков после указанного user_id"""
+        try:
+            with self.get_connection('get_subscribers') as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT user_id FROM subscriptions WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                    (after_user_id, limit)
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error:
+            return []
+
+    def create_broadcast(self, vacancy_id: int) -> Optional[Broadcast]:
+        """Создает рассылку о вакансии"""
+        try:
+            with self.get_connection('create_broadcast') as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO broadcasts (vacancy_id) VALUES (?)", (vacancy_id,))
+                conn.commit()
+                return Broadcast(cursor.lastrowid, vacancy_id, 0, 0, 0, 'running')
+        except sqlite3.Error:
+            return None
+
+    def get_running_broadcasts(self) -> List[Broadcast]:
+        """Возвращает незавершенные рассылки"""
+        try:
+            with self.get_connection('get_running_broadcasts') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, vacancy_id, cursor, sent, failed, status
+                    FROM broadcasts WHERE status = 'running'
+                    ORDER BY id
+                """)
+                return [Broadcast(*row) for row in cursor.fetchall()]
+        except sqlite3.Error:
+            return []
+
+    def save_broadcast(self, broadcast: Broadcast) -> bool:
+        """Сохраняет прогресс рассылки"""
+        try:
+            with self.get_connection('save_broadcast') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE broadcasts
+                    SET cursor = ?, sent = ?, failed = ?, status = ?,
+                        finished_at = CASE WHEN ? = 'running' THEN NULL ELSE CURRENT_TIMESTAMP END
+                    WHERE id = ?
+                """, (broadcast.cursor, broadcast.sent, broadcast.failed, broadcast.status, broadcast.status, broadcast.id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error:
+            return False
+
+    def get_unsubscribed(self, user_ids: Iterable[int]) -> List[int]:
+        """Возвращает пользователей из списка, не подписанных на все новые вакансии"""
+        user_ids = list(user_ids)
+        subscribed = set()
+        try:
+            with self.get_connection('get_unsubscribed') as conn:
+                cursor = conn.cursor()
+                # Ограничение SQLite на число параметров запроса
+                for start in range(0, len(user_ids), 500):
+                    chunk = user_ids[start:start + 500]
+                    cursor.execute(
+                        f"SELECT user_id FROM subscriptions WHERE user_id IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    subscribed.update(row[0] for row in cursor.fetchall())
+        except sqlite3.Error:
+            pass
+        return [user_id for user_id in user_ids if user_id not in subscribed]
+
+    def set_keyword_alerts(self, user_id: int, terms: Iterable[str]) -> bool:
+        """Заменяет ключевые слова пользователя"""
+        try:
+            with self.get_connection('set_keyword_alerts') as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM keyword_alerts WHERE user_id = ?", (user_id,))
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO keyword_alerts (user_id, term) VALUES (?, ?)",
+                    [(user_id, term) for term in terms]
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error:
+            return False
+
+    def get_keyword_alerts(self, user_id: int) -> List[str]:
+        """Возвращает ключевые слова пользователя"""
+        try:
+            with self.get_connection('get_keyword_alerts') as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT term FROM keyword_alerts WHERE user_id = ? ORDER BY created_at, term",
+                    (user_id,)
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error:
+            return []
+
+    def get_all_keyword_alerts(self) -> List[Tuple[int, str]]:
+        """Возвращает все подписки на ключевые слова для построения индекса"""
+        try:
+            with self.get_connection('get_all_keyword_alerts') as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT user_id, term FROM keyword_alerts")
+                return cursor.fetchall()
+        except sqlite3.Error:
+            return []
+
+    def get_profile(self, user_id: int) -> Optional[str]:
+        """Возвращает анкету кандидата"""
+        try:
+            with self.get_connection('get_profile') as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT text FROM candidate_profiles WHERE user_id = ?", (user_id,))
+                result = cursor.fetchone()
+                return result[0] if result else None
+        except sqlite3.Error:
+            return None
+
+    def save_profile(self, user_id: int, text: str) -> bool:
+        """Сохраняет анкету кандидата"""
+        try:
+            with self.get_connection('save_profile') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO candidate_profiles (user_id, text) VALUES (?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET text = excluded.text, updated_at = CURRENT_TIMESTAMP
+                """, (user_id, text))
+                conn.commit()
+                template_cache.invalidate_profile(user_id)
+                return True
+        except sqlite3.Error:
+            return False
@@ -1,14 +1,19 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
-from database import Database
+from telegram.error import BadRequest
 from keyboards import (
     get_admin_keyboard, get_admin_panel_keyboard,
     get_back_to_edit_keyboard, get_edit_vacancy_keyboard,
-    get_cancel_edit_keyboard, get_main_keyboard
+    get_cancel_edit_keyboard, get_main_keyboard,
+    mark_digest_item
 )
 from utils.decorators import admin_only
 import messages
-from utils.logger import log_message
+import callbacks
+from utils.logger import log_message, logger
+from templates import escape_markdown
+from utils.presenter import present, render_cache
+import database
 from datetime import datetime
 
 # Состояния для редактирования вакансий
@@ -20,6 +25,9 @@ AWAITING_TITLE = 1
 AWAITING_DESCRIPTION = 2
 AWAITING_IMAGE = 3
 
+# Сколько символов отчета о памяти помещается в сообщение вместе с оформлением
+MEMORY_REPORT_LIMIT = 3900
+
 def get_vacancy_edit_keyboard(vacancy_id: int, is_active: bool) -> InlineKeyboardMarkup:
     """Создает клавиатуру для редактирования вакансии"""
     status_emoji = "✅" if is_active else "❌"
@@ -28,29 +36,29 @@ def get_vacancy_edit_keyboard(vacancy_id: int, is_active: bool) -> InlineKeyboar
         [
             InlineKeyboardButton(
                 text="📝 Изменить название",
-                callback_data=f"edit_title_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.EDIT_TITLE, vacancy_id)
             ),
             InlineKeyboardButton(
                 text="📄 Изменить описание",
-                callback_data=f"edit_description_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.EDIT_DESCRIPTION, vacancy_id)
             )
         ],
         # Вторая строка: статус и удаление
         [
             InlineKeyboardButton(
                 text=f"Статус: {status_emoji}",
-                callback_data=f"toggle_status_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.TOGGLE_STATUS, vacancy_id)
             ),
             InlineKeyboardButton(
                 text="🗑 Удалить",
-                callback_data=f"delete_vacancy_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.DELETE_VACANCY, vacancy_id)
             )
         ],
         # Третья строка: кнопка назад
         [
             InlineKeyboardButton(
                 text="↩️ Назад",
-                callback_data="edit_vacancies"
+                callback_data=callbacks.encode(callbacks.EDIT_VACANCIES)
             )
         ]
     ]
@@ -62,8 +70,7 @@ async def admin_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "admin", "Открыл панель администратора")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями по 2 в строку
     keyboard = []
@@ -73,7 +80,7 @@ async def admin_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 f"{status} {vacancy.title}",
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -86,7 +93,7 @@ async def admin_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append([
         InlineKeyboardButton(
             "⚙️ Управление",
-            callback_data="admin_panel"
+            callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
         )
     ])
     
@@ -119,7 +126,9 @@ async def show_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "admin", "Открыл панель управления")
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         messages.ADMIN_PANEL,
         reply_markup=get_admin_panel_keyboard(),
         parse_mode='Markdown'
@@ -134,11 +143,13 @@ async def show_vacancies_for_edit(update: Update, context: ContextTypes.DEFAULT_
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "admin", "Открыл список вакансий для редактирования")
     
-    db = Database()
+    db = context.request.db
     vacancies = db.get_all_vacancies()
     
     if not vacancies:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ *Нет доступных вакансий*\n\nСоздайте новую вакансию, нажав кнопку ниже.",
             reply_markup=get_admin_panel_keyboard(),
             parse_mode='Markdown'
@@ -153,7 +164,7 @@ async def show_vacancies_for_edit(update: Update, context: ContextTypes.DEFAULT_
         row.append(
             InlineKeyboardButton(
                 f"{status} {vacancy.title}",
-                callback_data=f"edit_vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.EDIT_VACANCY, vacancy.id)
             )
         )
         
@@ -166,11 +177,13 @@ async def show_vacancies_for_edit(update: Update, context: ContextTypes.DEFAULT_
     keyboard.append([
         InlineKeyboardButton(
             "« Назад в панель управления",
-            callback_data="admin_panel"
+            callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
         )
     ])
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         "*Управление вакансиями*\n\n"
         "Выберите вакансию для редактирования:\n"
         "🟢 - активная вакансия\n"
@@ -186,13 +199,14 @@ async def edit_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    vacancy_id = int(query.data.split('_')[2])
+    vacancy_id = callbacks.callback_args(update).id
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    vacancy = context.request.get_vacancy(vacancy_id)
     
     if not vacancy:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Вакансия не найдена.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
@@ -208,11 +222,11 @@ async def edit_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append([
         InlineKeyboardButton(
             "✏️ Изменить название",
-            callback_data=f"edit_title_{vacancy_id}"
+            callback_data=callbacks.encode(callbacks.EDIT_TITLE, vacancy_id)
         ),
         InlineKeyboardButton(
             "📝 Изменить описание",
-            callback_data=f"edit_description_{vacancy_id}"
+            callback_data=callbacks.encode(callbacks.EDIT_DESCRIPTION, vacancy_id)
         )
     ])
     
@@ -220,11 +234,11 @@ async def edit_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append([
         InlineKeyboardButton(
             "🔄 Изменить статус" if vacancy.is_active else "🔄 Активировать",
-            callback_data=f"toggle_status_{vacancy_id}"
+            callback_data=callbacks.encode(callbacks.TOGGLE_STATUS, vacancy_id)
         ),
         InlineKeyboardButton(
             "❌ Удалить",
-            callback_data=f"delete_vacancy_{vacancy_id}"
+            callback_data=callbacks.encode(callbacks.DELETE_VACANCY, vacancy_id)
         )
     ])
     
@@ -232,13 +246,15 @@ async def edit_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append([
         InlineKeyboardButton(
             "« Назад к списку",
-            callback_data="edit_vacancies"
+            callback_data=callbacks.encode(callbacks.EDIT_VACANCIES)
         )
     ])
     
     status = "🟢 Активна" if vacancy.is_active else "🔴 Не активна"
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         f"*Редактирование вакансии*\n\n"
         f"*Название:* {vacancy.title}\n"
         f"*Статус:* {status}\n\n"
@@ -254,13 +270,15 @@ async def toggle_vacancy_status(update: Update, context: ContextTypes.DEFAULT_TY
     await query.answer()
     
     user = update.effective_user
-    vacancy_id = int(query.data.split('_')[2])
+    vacancy_id = callbacks.callback_args(update).id
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    db = context.request.db
+    vacancy = context.request.get_vacancy(vacancy_id)
     
     if not vacancy:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Вакансия не найдена.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
@@ -270,6 +288,11 @@ async def toggle_vacancy_status(update: Update, context: ContextTypes.DEFAULT_TY
     # Меняем статус на противоположный
     new_status = not vacancy.is_active
     if db.update_vacancy_status(vacancy_id, new_status):
+        # Обновляем загруженную вакансию, чтобы edit_vacancy не читал ее повторно
+        vacancy.is_active = new_status
+        if new_status:
+            # Открытая заново вакансия может совпасть с ключевыми словами кандидатов
+            context.bot_data['keyword_alerts'].notify(vacancy)
         status_text = "активирована" if new_status else "деактивирована"
         log_message(
             user.id,
@@ -282,7 +305,9 @@ async def toggle_vacancy_status(update: Update, context: ContextTypes.DEFAULT_TY
         # Возвращаемся к редактированию вакансии
         await edit_vacancy(update, context)
     else:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Не удалось изменить статус вакансии.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
@@ -294,10 +319,12 @@ async def start_add_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         "Введите название новой вакансии:",
         reply_markup=InlineKeyboardMarkup([[
-            InlineKeyboardButton("Отмена", callback_data="admin_panel")
+            InlineKeyboardButton("Отмена", callback_data=callbacks.encode(callbacks.ADMIN_PANEL))
         ]]),
         parse_mode='Markdown'
     )
@@ -312,7 +339,7 @@ async def process_vacancy_title(update: Update, context: ContextTypes.DEFAULT_TY
     await update.message.reply_text(
         "Введите описание вакансии:",
         reply_markup=InlineKeyboardMarkup([[
-            InlineKeyboardButton("Отмена", callback_data="admin_panel")
+            InlineKeyboardButton("Отмена", callback_data=callbacks.encode(callbacks.ADMIN_PANEL))
         ]]),
         parse_mode='Markdown'
     )
@@ -327,8 +354,8 @@ async def process_vacancy_description(update: Update, context: ContextTypes.DEFA
     await update.message.reply_text(
         "Отправьте изображение для вакансии или нажмите 'Пропустить':",
         reply_markup=InlineKeyboardMarkup([[
-            InlineKeyboardButton("Пропустить", callback_data="skip_image"),
-            InlineKeyboardButton("Отмена", callback_data="admin_panel")
+            InlineKeyboardButton("Пропустить", callback_data=callbacks.encode(callbacks.SKIP_IMAGE)),
+            InlineKeyboardButton("Отмена", callback_data=callbacks.encode(callbacks.ADMIN_PANEL))
         ]]),
         parse_mode='Markdown'
     )
@@ -354,8 +381,12 @@ async def process_vacancy_image(update: Update, context: ContextTypes.DEFAULT_TY
         # Берем последнее фото (самое большое разрешение)
         image_id = update.message.photo[-1].file_id
     
-    db = Database()
-    if db.add_vacancy(title, description, image_id):
+    db = context.request.db
+    vacancy_id = db.add_vacancy(title, description, image_id)
+    if vacancy_id:
+        # Оповещаем подписчиков о новой вакансии в фоне
+        context.bot_data['broadcaster'].announce(vacancy_id)
+        context.bot_data['keyword_alerts'].notify(db.get_vacancy(vacancy_id), skip_subscribers=True)
         log_message(user.id, user.username or "Unknown", "admin", "Создал новую вакансию", f"Название: {title}")
         await update.message.reply_text(
             "✅ Вакансия успешно создана!",
@@ -382,23 +413,33 @@ async def skip_image(update: Update, context: ContextTypes.DEFAULT_TYPE):
     description = context.user_data.get('new_vacancy_description')
     
     if not title or not description:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "Произошла ошибка. Попробуйте создать вакансию заново.",
             reply_markup=get_admin_panel_keyboard(),
             parse_mode='Markdown'
         )
         return ConversationHandler.END
     
-    db = Database()
-    if db.add_vacancy(title, description):
+    db = context.request.db
+    vacancy_id = db.add_vacancy(title, description)
+    if vacancy_id:
+        # Оповещаем подписчиков о новой вакансии в фоне
+        context.bot_data['broadcaster'].announce(vacancy_id)
+        context.bot_data['keyword_alerts'].notify(db.get_vacancy(vacancy_id), skip_subscribers=True)
         log_message(user.id, user.username or "Unknown", "admin", "Создал новую вакансию", f"Название: {title}")
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "✅ Вакансия успешно создана!",
             reply_markup=get_admin_panel_keyboard(),
             parse_mode='Markdown'
         )
     else:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Не удалось создать вакансию. Попробуйте позже.",
             reply_markup=get_admin_panel_keyboard(),
             parse_mode='Markdown'
@@ -412,10 +453,12 @@ async def start_edit_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    vacancy_id = int(query.data.split('_')[2])
+    vacancy_id = callbacks.callback_args(update).id
     context.user_data['editing_vacancy'] = vacancy_id
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         "Введите новое название вакансии:",
         reply_markup=get_cancel_edit_keyboard(vacancy_id),
         parse_mode='Markdown'
@@ -429,10 +472,12 @@ async def start_edit_description(update: Update, context: ContextTypes.DEFAULT_T
     query = update.callback_query
     await query.answer()
     
-    vacancy_id = int(query.data.split('_')[2])
+    vacancy_id = callbacks.callback_args(update).id
     context.user_data['editing_vacancy'] = vacancy_id
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         "Введите новое описание вакансии:",
         reply_markup=get_cancel_edit_keyboard(vacancy_id),
         parse_mode='Markdown'
@@ -455,7 +500,7 @@ async def process_edit_title(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return ConversationHandler.END
     
-    db = Database()
+    db = context.request.db
     if db.update_vacancy(vacancy_id=vacancy_id, title=new_title):
         log_message(
             user.id,
@@ -493,7 +538,7 @@ async def process_edit_description(update: Update, context: ContextTypes.DEFAULT
         )
         return ConversationHandler.END
     
-    db = Database()
+    db = context.request.db
     if db.update_vacancy(vacancy_id=vacancy_id, description=new_description):
         log_message(
             user.id,
@@ -525,7 +570,9 @@ async def cancel_edit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if 'editing_vacancy' in context.user_data:
         del context.user_data['editing_vacancy']
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         "❌ Редактирование отменено",
         reply_markup=get_back_to_edit_keyboard(),
         parse_mode='Markdown'
@@ -542,8 +589,7 @@ async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "back", "Вернулся в главное меню")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями по две в строку
     keyboard = []
@@ -552,7 +598,7 @@ async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 text=vacancy.title,
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -564,92 +610,140 @@ async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append([
         InlineKeyboardButton(
             text="⚙️ Управление",
-            callback_data="admin_panel"
+            callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
         )
     ])
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         messages.BACK_TO_ADMIN_VACANCIES,
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode='Markdown'
     )
 
-@admin_only
-async def process_application_response(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработка ответа на отклик (принятие/отклонение)"""
-    query = update.callback_query
-    await query.answer()
-    
-    # Получаем данные из callback_data: application_[accept/reject]_[id]
-    parts = query.data.split('_')
-    if len(parts) != 3:
-        await query.message.edit_text("Ошибка в данных отклика.")
-        return
-    
-    action = parts[1]
-    application_id = int(parts[2])
-    
-    # Получаем информацию о модераторе
-    moderator = update.effective_user
-    moderator_name = f"@{moderator.username}" if moderator.username else f"ID: {moderator.id}"
-    
-    db = Database()
-    application = db.get_application(application_id)
-    if not application:
-        await query.message.edit_text("Отклик не найден.")
-        return
-    
-    vacancy = db.get_vacancy(application.vacancy_id)
-    if not vacancy:
-        await query.message.edit_text("Вакансия не найдена.")
-        return
-    
-    # Обновляем статус отклика
-    status = 'accepted' if action == 'accept' else 'rejected'
-    feedback = None
-    message_text = None
-    
+async def _decide_application(update: Update, context: ContextTypes.DEFAULT_TYPE, application_id: int, status: str):
+    """Записывает решение по отклику и уведомляет кандидата, возвращает решение или None"""
     if status == 'accepted':
         feedback = "Приглашаем вас на собеседование!"
-        message_text = messages.APPLICATION_ACCEPTED.format(title=vacancy.title)
     else:
         feedback = "Спасибо за интерес к нашей компании."
-        message_text = messages.APPLICATION_REJECTED.format(title=vacancy.title)
     
-    db.update_application_status(application_id, status, feedback)
+    # Решение принимается одной транзакцией и только для откликов на рассмотрении
+    decision = context.request.db.decide_application(application_id, status, update.effective_user.id, feedback)
+    if not decision:
+        return None
+    
+    if status == 'accepted':
+        message_text = messages.APPLICATION_ACCEPTED.format(title=escape_markdown(decision.vacancy_title))
+    else:
+        message_text = messages.APPLICATION_REJECTED.format(title=escape_markdown(decision.vacancy_title))
     
     # Отправляем уведомление пользователю
     try:
         await context.bot.send_message(
-            chat_id=application.user_id,
+            chat_id=decision.user_id,
             text=message_text,
             parse_mode='Markdown'
         )
         log_message(
-            application.user_id,
+            decision.user_id,
             "System",
             "admin",
             f"Отклик {'принят' if status == 'accepted' else 'отклонен'}",
-            f"Вакансия: {vacancy.title}"
+            f"Вакансия: {decision.vacancy_title}"
         )
     except Exception as e:
         logger.error(f"Ошибка при отправке уведомления пользователю: {str(e)}")
     
+    return decision
+
+async def _edit_decision_markup(message, reply_markup):
+    """Обновляет кнопки решения; повторное нажатие может застать их уже обновленными"""
+    try:
+        await message.edit_reply_markup(reply_markup=reply_markup)
+    except BadRequest as e:
+        if 'message is not modified' not in str(e).lower():
+            raise
+    # Клавиатура изменена в обход present - отпечаток устарел
+    render_cache.forget(message)
+
+@admin_only
+async def process_application_response(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработка ответа на отклик (принятие/отклонение)"""
+    query = update.callback_query
+    await query.answer()
+    
+    # Действие и ID отклика уже разобраны маршрутизатором
+    data = callbacks.callback_args(update)
+    status = 'accepted' if data.action == callbacks.APPLICATION_ACCEPT else 'rejected'
+    application_id = data.id
+    
+    # Повторное нажатие (двойной тап или второй модератор) не изменит решение - транзакция вернет None
+    decision = await _decide_application(update, context, application_id, status)
+    if not decision:
+        application = context.request.db.get_application(application_id)
+        if not application:
+            await present(query.message, context, "Отклик не найден.")
+        else:
+            # Решение уже принято другим модератором - убираем кнопки
+            await _edit_decision_markup(query.message, None)
+        return
+    
+    # Получаем информацию о модераторе
+    moderator = update.effective_user
+    moderator_name = f"@{moderator.username}" if moderator.username else f"ID: {moderator.id}"
+    
     # Обновляем сообщение в админском чате
     status_emoji, status_text = messages.APPLICATION_STATUS[status]
     current_time = datetime.now().strftime("%d.%m.%Y %H:%M")
     
-    await query.message.edit_text(
+    await present(
+        query.message,
+        context,
         messages.APPLICATION_RESPONSE.format(
-            original_message=query.message.text,
+            original_message=escape_markdown(query.message.text),
             status_emoji=status_emoji,
             status_text=status_text,
-            moderator=moderator_name,
+            moderator=escape_markdown(moderator_name),
             date=current_time
         ),
         parse_mode='Markdown'
     )
 
+@admin_only
+async def process_digest_response(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработка решения по одному отклику из сводки"""
+    query = update.callback_query
+    
+    data = callbacks.callback_args(update)
+    status = 'accepted' if data.action == callbacks.DIGEST_ACCEPT else 'rejected'
+    application_id = data.id
+    
+    decision = await _decide_application(update, context, application_id, status)
+    if not decision:
+        await query.answer()
+        application = context.request.db.get_application(application_id)
+        if not application or application.status == 'pending':
+            return
+        # Решение уже принято другим модератором - показываем его в сводке
+        status = application.status
+    
+    status_emoji, status_text = messages.APPLICATION_STATUS[status]
+    if decision:
+        await query.answer(f"{status_emoji} {status_text}")
+    
+    # Остальные отклики сводки остаются доступными для решения
+    moderator = update.effective_user
+    moderator_name = f"@{moderator.username}" if moderator.username else str(moderator.id)
+    label = f"{status_emoji} #{application_id} · {status_text}"
+    if decision:
+        label += f" · {moderator_name}"
+    await _edit_decision_markup(
+        query.message,
+        mark_digest_item(query.message.reply_markup, application_id, label)
+    )
+
 @admin_only
 async def delete_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Удаляет вакансию"""
@@ -657,13 +751,15 @@ async def delete_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    vacancy_id = int(query.data.split('_')[2])
+    vacancy_id = callbacks.callback_args(update).id
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    db = context.request.db
+    vacancy = context.request.get_vacancy(vacancy_id)
     
     if not vacancy:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Вакансия не найдена.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
@@ -672,6 +768,7 @@ async def delete_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Удаляем вакансию
     if db.delete_vacancy(vacancy_id):
+        context.request.forget_vacancy(vacancy_id)
         log_message(
             user.id,
             user.username or "Unknown",
@@ -680,14 +777,61 @@ async def delete_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"ID: {vacancy_id}, Название: {vacancy.title}"
         )
         
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             f"✅ Вакансия *{vacancy.title}* успешно удалена.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
         )
     else:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Не удалось удалить вакансию.",
             reply_markup=get_back_to_edit_keyboard(),
             parse_mode='Markdown'
         )
+
+@admin_only
+async def show_db_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /dbstats: запросы к БД с наибольшим суммарным временем"""
+    user = update.effective_user
+    log_message(user.id, user.username or "Unknown", "admin", "Открыл статистику запросов к БД")
+    
+    profiler = database.query_profiler
+    if profiler is None:
+        await update.message.reply_text(messages.DB_STATS_DISABLED, parse_mode='Markdown')
+        return
+    
+    items = ""
+    for method, statement, stats in profiler.top(10):
+        p50, p99 = stats.percentiles()
+        items += messages.DB_STATS_ITEM.format(
+            method=escape_markdown(method),
+            count=stats.count,
+            total=stats.total * 1000,
+            p50=p50 * 1000,
+            p99=p99 * 1000,
+            statement=escape_markdown(statement[:120])
+        )
+    
+    await update.message.reply_text(
+        messages.DB_STATS.format(items=items or "Запросов пока не было."),
+        parse_mode='Markdown'
+    )
+
+@admin_only
+async def show_memory_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /memory: отчет о памяти процесса (также записывается в файл диагностики)"""
+    user = update.effective_user
+    log_message(user.id, user.username or "Unknown", "admin", "Запросил отчет о памяти")
+    
+    report = await context.bot_data['memory_profiler'].write_report()
+    # Отчет может не поместиться в одно сообщение - полный текст остается в файле
+    if len(report) > MEMORY_REPORT_LIMIT:
+        report = report[:MEMORY_REPORT_LIMIT] + "\n…"
+    await update.message.reply_text(
+        messages.MEMORY_REPORT.format(report=report.replace('`', "'")),
+        parse_mode='Markdown'
+    )
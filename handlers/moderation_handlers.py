@@ -0,0 +1,157 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+from keyboards import get_moderation_queue_keyboard, get_moderation_page_keyboard
+from utils.decorators import admin_only
+from utils.logger import log_message
+from utils.outbox import OutgoingMessage
+from utils.presenter import present
+from templates import escape_markdown
+import messages
+import callbacks
+from datetime import datetime
+
+# Количество откликов на одной странице очереди
+PAGE_SIZE = 10
+
+# Ответы кандидатам при массовом решении
+FEEDBACK = {
+    'accepted': "Приглашаем вас на собеседование!",
+    'rejected': "Спасибо за интерес к нашей компании."
+}
+
+def _get_selection(context: ContextTypes.DEFAULT_TYPE) -> set:
+    """Возвращает множество выбранных модератором откликов"""
+    return context.user_data.setdefault('moderation_selection', set())
+
+async def _show_page(update: Update, context: ContextTypes.DEFAULT_TYPE, vacancy_id: int, after_id: int):
+    """Показывает страницу откликов на рассмотрении по вакансии"""
+    query = update.callback_query
+
+    vacancy = context.request.get_vacancy(vacancy_id)
+    # Загружаем на один отклик больше, чтобы узнать, есть ли следующая страница
+    applications = context.request.db.get_pending_applications(vacancy_id, after_id, PAGE_SIZE + 1)
+    next_after_id = applications[PAGE_SIZE - 1].id if len(applications) > PAGE_SIZE else None
+    applications = applications[:PAGE_SIZE]
+
+    if not vacancy or not applications:
+        if after_id:
+            # Страница опустела после решения - возвращаемся в начало очереди вакансии
+            return await _show_page(update, context, vacancy_id, 0)
+        return await _show_queue(update, context)
+
+    selection = _get_selection(context)
+    items = ""
+    for application in applications:
+        candidate = f"@{application.username}" if application.username else f"ID: {application.user_id}"
+        items += messages.MODERATION_ITEM.format(
+            id=application.id,
+            candidate=escape_markdown(candidate),
+            date=datetime.fromisoformat(application.applied_at).strftime("%d.%m.%Y %H:%M"),
+            message=escape_markdown((application.message or "")[:150])
+        )
+
+    await present(
+        query.message,
+        context,
+        messages.MODERATION_PAGE.format(
+            title=escape_markdown(vacancy.title),
+            selected=len(selection),
+            items=items
+        ),
+        reply_markup=get_moderation_page_keyboard(vacancy_id, after_id, applications, selection, next_after_id)
+    )
+
+async def _show_queue(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показывает вакансии с числом откликов на рассмотрении"""
+    pending_counts = context.request.db.get_pending_counts()
+    await present(
+        update.callback_query.message,
+        context,
+        messages.MODERATION_QUEUE if pending_counts else messages.MODERATION_QUEUE_EMPTY,
+        reply_markup=get_moderation_queue_keyboard(pending_counts)
+    )
+
+@admin_only
+async def show_moderation_queue(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показывает очередь откликов на рассмотрении"""
+    query = update.callback_query
+    await query.answer()
+
+    user = update.effective_user
+    log_message(user.id, user.username or "Unknown", "admin", "Открыл очередь откликов")
+
+    # Выбор относится к одной вакансии, при возврате к очереди сбрасываем его
+    _get_selection(context).clear()
+    await _show_queue(update, context)
+
+@admin_only
+async def show_moderation_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показывает страницу очереди по вакансии"""
+    query = update.callback_query
+    await query.answer()
+
+    vacancy_id, after_id = callbacks.callback_args(update).args
+    await _show_page(update, context, vacancy_id, after_id)
+
+@admin_only
+async def toggle_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отмечает отклик или снимает отметку"""
+    query = update.callback_query
+    await query.answer()
+
+    vacancy_id, after_id, application_id = callbacks.callback_args(update).args
+    selection = _get_selection(context)
+    selection.symmetric_difference_update({application_id})
+    await _show_page(update, context, vacancy_id, after_id)
+
+@admin_only
+async def select_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отмечает все отклики на текущей странице"""
+    query = update.callback_query
+    await query.answer()
+
+    vacancy_id, after_id = callbacks.callback_args(update).args
+    applications = context.request.db.get_pending_applications(vacancy_id, after_id, PAGE_SIZE)
+    _get_selection(context).update(application.id for application in applications)
+    await _show_page(update, context, vacancy_id, after_id)
+
+@admin_only
+async def decide_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Принимает или отклоняет все выбранные отклики"""
+    query = update.callback_query
+    data = callbacks.callback_args(update)
+    vacancy_id, after_id = data.args
+    status = 'accepted' if data.action == callbacks.MODERATION_ACCEPT else 'rejected'
+
+    selection = _get_selection(context)
+    if not selection:
+        await query.answer("Сначала выберите отклики")
+        return
+
+    user = update.effective_user
+    # Все решения записываются одной транзакцией
+    decisions = context.request.db.decide_applications(selection, status, user.id, FEEDBACK[status])
+    selection.clear()
+
+    # Уведомления кандидатам отправляются пачкой через общую очередь
+    template = messages.APPLICATION_ACCEPTED if status == 'accepted' else messages.APPLICATION_REJECTED
+    context.bot_data['outbox'].enqueue_many(
+        OutgoingMessage(decision.user_id, template.format(title=escape_markdown(decision.vacancy_title)))
+        for decision in decisions
+    )
+
+    status_emoji, status_text = messages.APPLICATION_STATUS[status]
+    await query.answer(messages.MODERATION_DONE.format(
+        status_emoji=status_emoji,
+        status_text=status_text,
+        count=len(decisions)
+    ))
+    log_message(
+        user.id,
+        user.username or "Unknown",
+        "admin",
+        f"Массовое решение по откликам: {status_text}",
+        f"Откликов: {len(decisions)}"
+    )
+
+    await _show_page(update, context, vacancy_id, after_id)
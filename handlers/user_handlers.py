@@ -1,25 +1,31 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
-from database import Database
 from keyboards import (
     get_vacancies_keyboard, get_vacancy_actions_keyboard,
     get_back_to_list_keyboard, get_main_keyboard,
-    get_back_to_main_keyboard
+    get_back_to_main_keyboard, get_subscription_button,
+    replace_subscription_button, get_profile_keyboard, get_save_profile_keyboard
 )
 import messages
+import callbacks
+from templates import escape_markdown, template_cache, vacancy_state
 from utils.logger import log_message
+from utils.presenter import present, render_cache
+from utils.digest import ApplicationNotice
+from utils.attachments import MAX_ATTACHMENTS, Attachment, attachment_from_message, dump_attachments
 from datetime import datetime
+from typing import List
 
 # Состояния для ConversationHandler
 AWAITING_APPLICATION = 1
+AWAITING_PROFILE = 2
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start для обычных пользователей"""
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "start", "Запустил бота")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями по 2 в строку
     keyboard = []
@@ -29,7 +35,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 f"{status} {vacancy.title}",
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -65,80 +71,76 @@ async def show_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    vacancy_id = int(query.data.split('_')[1])
+    vacancy_id = callbacks.callback_args(update).id
     
     log_message(user.id, user.username or "Unknown", "view", "Просмотрел вакансию", f"ID: {vacancy_id}")
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    vacancy = context.request.get_vacancy(vacancy_id)
     
     if not vacancy:
-        await query.message.edit_text(
+        await present(
+            query.message,
+            context,
             "❌ Вакансия не найдена или была удалена.",
             parse_mode='Markdown'
         )
         return
     
     # Проверяем, может ли пользователь откликнуться
-    can_apply = db.can_apply_to_vacancy(user.id, vacancy_id)
+    can_apply = context.request.can_apply(vacancy_id)
     
     # Создаем клавиатуру
     keyboard = []
     row = []
     
-    # Кнопка "Откликнуться" только если можно
+    # Кнопка "Откликнуться" только если можно; с заполненной анкетой - в одно нажатие
     if can_apply and vacancy.is_active:
-        row.append(
-            InlineKeyboardButton(
-                "💼 Откликнуться",
-                callback_data=f"apply_{vacancy_id}"
+        if context.request.profile:
+            row.append(
+                InlineKeyboardButton(
+                    "⚡ Откликнуться",
+                    callback_data=callbacks.encode(callbacks.QUICK_APPLY, vacancy_id)
+                )
+            )
+        else:
+            row.append(
+                InlineKeyboardButton(
+                    "💼 Откликнуться",
+                    callback_data=callbacks.encode(callbacks.APPLY, vacancy_id)
+                )
             )
-        )
     
     # Кнопка "Назад" всегда добавляется
     row.append(
         InlineKeyboardButton(
             "« Назад к списку",
-            callback_data="back_to_vacancies"
+            callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES)
         )
     )
     
     keyboard.append(row)
     
-    # Формируем статусное сообщение
-    if not vacancy.is_active:
-        status_text = "\n\n❌ *Вакансия закрыта*"
-    elif not can_apply:
-        status_text = "\n\n⏳ *Вы уже откликались на эту вакансию*\nПовторный отклик будет доступен через 24 часа."
-    else:
-        status_text = ""
+    # Текст карточки подготовлен заранее и не содержит ошибок разметки
+    text = template_cache.vacancy_card(vacancy, vacancy_state(vacancy, can_apply))
     
     try:
-        # Если есть изображение, отправляем его с текстом
-        if vacancy.image_id:
-            await query.message.delete()  # Удаляем старое сообщение
-            await context.bot.send_photo(
-                chat_id=query.message.chat_id,
-                photo=vacancy.image_id,
-                caption=vacancy.description + (status_text if status_text else ""),
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
-            )
-        else:
-            # Если изображения нет, просто обновляем текст
-            await query.message.edit_text(
-                vacancy.description + (status_text if status_text else ""),
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
-            )
+        # Показываем вакансию на месте текущего сообщения (с фото, если оно есть)
+        await present(
+            query.message,
+            context,
+            text,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            photo=vacancy.image_id
+        )
     except Exception as e:
         log_message(user.id, user.username or "Unknown", "error", "Ошибка при показе вакансии", str(e))
-        # Если возникла ошибка с форматированием, отправляем без него
-        await query.message.edit_text(
-            vacancy.description.replace('*', '') + 
-            (status_text.replace('*', '') if status_text else ""),
+        # Если не удалось показать карточку (например, изображение недоступно), отправляем текст
+        await present(
+            query.message,
+            context,
+            text,
             reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("« Назад к списку", callback_data="back_to_vacancies")
+                InlineKeyboardButton("« Назад к списку", callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES))
             ]])
         )
 
@@ -148,10 +150,9 @@ async def apply_to_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     
     user = update.effective_user
-    vacancy_id = int(query.data.split('_')[1])
+    vacancy_id = callbacks.callback_args(update).id
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    vacancy = context.request.get_vacancy(vacancy_id)
     
     if not vacancy:
         # Если вакансия не найдена, отправляем новое сообщение
@@ -163,7 +164,7 @@ async def apply_to_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationHandler.END
     
     # Проверяем, может ли пользователь откликнуться
-    if not db.can_apply_to_vacancy(user.id, vacancy_id):
+    if not context.request.can_apply(vacancy_id):
         log_message(user.id, user.username or "Unknown", "error", "Попытка повторного отклика", f"Вакансия: {vacancy.title}")
         # Отправляем новое сообщение вместо редактирования
         await query.message.reply_text(
@@ -175,29 +176,80 @@ async def apply_to_vacancy(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     log_message(user.id, user.username or "Unknown", "start", "Начал отклик", f"Вакансия: {vacancy.title}")
     context.user_data['applying_to_vacancy'] = vacancy_id
-    
-    # Отправляем новое сообщение с инструкциями вместо редактирования
-    if vacancy.image_id:
-        # Если было сообщение с фото, удаляем его и отправляем новое
-        await query.message.delete()
-        await context.bot.send_message(
-            chat_id=query.message.chat_id,
-            text=messages.APPLY_INSTRUCTIONS,
-            reply_markup=get_back_to_list_keyboard(),
-            parse_mode='Markdown'
-        )
-    else:
-        # Если было обычное сообщение, редактируем его
-        await query.message.edit_text(
-            messages.APPLY_INSTRUCTIONS,
-            reply_markup=get_back_to_list_keyboard(),
-            parse_mode='Markdown'
-        )
+    context.user_data.pop('application_attachments', None)
+    
+    # Показываем инструкции на месте карточки вакансии (фото сохраняется в подписи)
+    await present(
+        query.message,
+        context,
+        messages.APPLY_INSTRUCTIONS,
+        reply_markup=get_back_to_list_keyboard(),
+        keep_media=True
+    )
     
     return AWAITING_APPLICATION
 
+async def _submit_application(context: ContextTypes.DEFAULT_TYPE, user, vacancy, application_text: str, attachments: List[Attachment] = ()) -> bool:
+    """Сохраняет отклик и передает его в чат обратной связи, возвращает False при повторном отклике"""
+    attachments = list(attachments)
+    application_id = context.request.db.add_application(
+        user.id, vacancy.id, application_text, user.username, dump_attachments(attachments)
+    )
+    if not application_id:
+        log_message(user.id, user.username or "Unknown", "error", "Ошибка при добавлении отклика", f"Вакансия: {vacancy.title}")
+        return False
+    
+    log_message(user.id, user.username or "Unknown", "success", "Отправил отклик", f"Вакансия: {vacancy.title}")
+    
+    # Отправка в чат обратной связи: сразу или в составе сводки
+    await context.bot_data['feedback_digest'].submit(context.bot, ApplicationNotice(
+        application_id=application_id,
+        title=vacancy.title,
+        username=user.username or "Неизвестный пользователь",
+        user_id=user.id,
+        application_text=application_text,
+        attachments=attachments
+    ))
+    return True
+
 async def process_application(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка данных, отправленных пользователем"""
+    return await _finish_application(update, context, update.message.text)
+
+async def process_application_attachment(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Добавляет к отклику документ или фото (хранится только file_id)"""
+    user = update.effective_user
+    limit_mb = context.bot_data['config'].max_attachment_size_mb
+    attachments = context.user_data.setdefault('application_attachments', [])
+    
+    if len(attachments) >= MAX_ATTACHMENTS:
+        await update.message.reply_text(messages.ATTACHMENT_LIMIT.format(limit=MAX_ATTACHMENTS))
+        return AWAITING_APPLICATION
+    
+    # Тип и размер проверяются по метаданным, файл не скачивается
+    attachment, error = attachment_from_message(update.message, limit_mb * 1024 * 1024)
+    if error == 'too_large':
+        await update.message.reply_text(messages.ATTACHMENT_TOO_LARGE.format(limit=limit_mb))
+        return AWAITING_APPLICATION
+    if error:
+        await update.message.reply_text(messages.ATTACHMENT_UNSUPPORTED)
+        return AWAITING_APPLICATION
+    
+    attachments.append(attachment)
+    log_message(user.id, user.username or "Unknown", "success", "Приложил файл к отклику", attachment.file_name or attachment.kind)
+    
+    # Подпись к файлу считается текстом отклика
+    if update.message.caption:
+        return await _finish_application(update, context, update.message.caption)
+    
+    await update.message.reply_text(
+        messages.ATTACHMENT_ADDED.format(count=len(attachments), limit=MAX_ATTACHMENTS),
+        parse_mode='Markdown'
+    )
+    return AWAITING_APPLICATION
+
+async def _finish_application(update: Update, context: ContextTypes.DEFAULT_TYPE, application_text: str):
+    """Отправляет отклик с текстом и приложенными файлами"""
     user = update.effective_user
     vacancy_id = context.user_data.get('applying_to_vacancy')
     
@@ -210,8 +262,7 @@ async def process_application(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return ConversationHandler.END
     
-    db = Database()
-    vacancy = db.get_vacancy(vacancy_id)
+    vacancy = context.request.get_vacancy(vacancy_id)
     if not vacancy:
         await update.message.reply_text(
             "Вакансия не найдена.",
@@ -221,13 +272,10 @@ async def process_application(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return ConversationHandler.END
     
-    application_text = update.message.text
-    
     # Добавляем отклик в базу данных
     try:
-        application_id = db.add_application(user.id, vacancy_id)
-        if not application_id:
-            log_message(user.id, user.username or "Unknown", "error", "Ошибка при добавлении отклика", f"Вакансия: {vacancy.title}")
+        attachments = context.user_data.get('application_attachments', [])
+        if not await _submit_application(context, user, vacancy, application_text, attachments):
             await update.message.reply_text(
                 messages.ALREADY_APPLIED,
                 reply_markup=get_back_to_list_keyboard(),
@@ -236,33 +284,17 @@ async def process_application(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
             return ConversationHandler.END
         
-        log_message(user.id, user.username or "Unknown", "success", "Отправил отклик", f"Вакансия: {vacancy.title}")
-        
-        # Создаем клавиатуру для админов
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ Принять", callback_data=f"application_accept_{application_id}"),
-                InlineKeyboardButton("❌ Отклонить", callback_data=f"application_reject_{application_id}")
-            ]
-        ]
-        
-        # Отправка данных в чат обратной связи
-        await context.bot.send_message(
-            chat_id=context.bot_data['config'].feedback_chat_id,
-            text=messages.NEW_APPLICATION.format(
-                title=vacancy.title,
-                username=user.username or "Неизвестный пользователь",
-                user_id=user.id,
-                application_text=application_text
-            ),
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown',
-            disable_web_page_preview=True
-        )
+        # Без анкеты предлагаем сохранить отклик как анкету для откликов в одно нажатие
+        reply_text = messages.APPLICATION_SENT
+        reply_markup = get_back_to_list_keyboard()
+        if not context.request.profile:
+            context.user_data['profile_offer'] = application_text
+            reply_text += messages.PROFILE_OFFER
+            reply_markup = get_save_profile_keyboard()
         
         await update.message.reply_text(
-            messages.APPLICATION_SENT,
-            reply_markup=get_back_to_list_keyboard(),
+            reply_text,
+            reply_markup=reply_markup,
             parse_mode='Markdown',
             disable_web_page_preview=True
         )
@@ -277,6 +309,115 @@ async def process_application(update: Update, context: ContextTypes.DEFAULT_TYPE
             disable_web_page_preview=True
         )
         return ConversationHandler.END
+    finally:
+        context.user_data.pop('applying_to_vacancy', None)
+        context.user_data.pop('application_attachments', None)
+
+async def quick_apply(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отклик на вакансию с сохраненной анкетой в одно нажатие"""
+    query = update.callback_query
+    user = update.effective_user
+    vacancy_id = callbacks.callback_args(update).id
+    
+    vacancy = context.request.get_vacancy(vacancy_id)
+    profile = context.request.profile
+    if not vacancy or not profile:
+        await query.answer("Вакансия не найдена." if not vacancy else "Сначала заполните анкету: /profile")
+        return
+    
+    if not context.request.can_apply(vacancy_id):
+        await query.answer()
+        await present(query.message, context, messages.ALREADY_APPLIED, reply_markup=get_back_to_list_keyboard())
+        return
+    
+    await query.answer()
+    try:
+        submitted = await _submit_application(context, user, vacancy, profile)
+    except Exception as e:
+        log_message(user.id, user.username or "Unknown", "error", "Ошибка при обработке отклика", str(e))
+        await present(
+            query.message,
+            context,
+            "Произошла ошибка при обработке отклика. Пожалуйста, попробуйте позже.",
+            reply_markup=get_back_to_list_keyboard()
+        )
+        return
+    
+    await present(
+        query.message,
+        context,
+        messages.APPLICATION_SENT if submitted else messages.ALREADY_APPLIED,
+        reply_markup=get_back_to_list_keyboard()
+    )
+
+async def show_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /profile: показывает анкету кандидата"""
+    user = update.effective_user
+    log_message(user.id, user.username or "Unknown", "view", "Открыл анкету")
+    
+    profile = context.request.profile
+    if profile:
+        text = messages.PROFILE.format(profile=template_cache.profile(user.id, profile))
+    else:
+        text = messages.PROFILE_EMPTY
+    
+    await update.message.reply_text(
+        text,
+        reply_markup=get_profile_keyboard(bool(profile)),
+        parse_mode='Markdown',
+        disable_web_page_preview=True
+    )
+
+async def save_offered_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Сохраняет отклик как анкету по согласию кандидата"""
+    query = update.callback_query
+    await query.answer()
+    user = update.effective_user
+    
+    application_text = context.user_data.pop('profile_offer', None)
+    if application_text and context.request.db.save_profile(user.id, application_text):
+        log_message(user.id, user.username or "Unknown", "success", "Сохранил отклик как анкету")
+        text = messages.PROFILE_CREATED
+    else:
+        text = messages.PROFILE_OFFER_EXPIRED
+    
+    await present(
+        query.message,
+        context,
+        text,
+        reply_markup=get_back_to_list_keyboard()
+    )
+
+async def start_edit_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Начинает заполнение анкеты"""
+    query = update.callback_query
+    await query.answer()
+    
+    await present(
+        query.message,
+        context,
+        messages.APPLY_INSTRUCTIONS,
+        reply_markup=get_back_to_list_keyboard()
+    )
+    return AWAITING_PROFILE
+
+async def process_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Сохраняет анкету кандидата"""
+    user = update.effective_user
+    
+    if context.request.db.save_profile(user.id, update.message.text):
+        log_message(user.id, user.username or "Unknown", "success", "Сохранил анкету")
+        reply_text = messages.PROFILE_SAVED
+    else:
+        reply_text = "❌ Не удалось сохранить анкету. Попробуйте позже."
+    
+    await update.message.reply_text(
+        reply_text,
+        reply_markup=get_back_to_list_keyboard(),
+        parse_mode='Markdown',
+        disable_web_page_preview=True
+    )
+    return ConversationHandler.END
 
 async def back_to_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Возврат к списку вакансий"""
@@ -286,8 +427,7 @@ async def back_to_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "back", "Вернулся к списку вакансий")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями
     keyboard = []
@@ -296,7 +436,7 @@ async def back_to_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 text=vacancy.title,
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -305,37 +445,99 @@ async def back_to_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
             row = []
     
     # Если пользователь админ, добавляем кнопку управления
-    is_admin = db.is_admin(user.id)
+    is_admin = context.request.is_admin
     if is_admin:
         keyboard.append([
             InlineKeyboardButton(
                 text="⚙️ Управление",
-                callback_data="admin_panel"
+                callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
             )
         ])
     
+    keyboard.append([get_subscription_button(context.request.db.is_subscribed(user.id))])
+    
     if not vacancies:
-        await query.message.edit_text(
-            messages.NO_VACANCIES,
+        await present(query.message, context, messages.NO_VACANCIES, reply_markup=InlineKeyboardMarkup(keyboard))
+        return
+    
+    await present(
+        query.message,
+        context,
+        "📋 *Доступные вакансии:*",
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+async def toggle_subscription(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Включает или отключает уведомления о новых вакансиях"""
+    query = update.callback_query
+    user = update.effective_user
+    
+    subscribe = callbacks.callback_args(update).action == callbacks.SUBSCRIBE
+    db = context.request.db
+    if subscribe:
+        db.subscribe(user.id)
+        log_message(user.id, user.username or "Unknown", "success", "Подписался на новые вакансии")
+    else:
+        db.unsubscribe(user.id)
+        log_message(user.id, user.username or "Unknown", "success", "Отписался от новых вакансий")
+    
+    await query.answer(messages.SUBSCRIBED if subscribe else messages.UNSUBSCRIBED)
+    await query.message.edit_reply_markup(
+        reply_markup=replace_subscription_button(query.message.reply_markup, subscribe)
+    )
+    # Клавиатура изменена в обход present - отпечаток устарел
+    render_cache.forget(query.message)
+
+async def manage_keyword_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Команда /alerts: просмотр, настройка и отключение оповещений по ключевым словам"""
+    user = update.effective_user
+    alerts = context.bot_data['keyword_alerts']
+    text = ' '.join(context.args or [])
+    
+    if not text:
+        keywords = alerts.get_keywords(user.id)
+        await update.message.reply_text(
+            messages.KEYWORDS_HELP.format(
+                keywords=escape_markdown(', '.join(keywords)) if keywords else messages.KEYWORDS_NONE
+            ),
             parse_mode='Markdown',
             disable_web_page_preview=True
         )
         return
     
-    await query.message.edit_text(
-        "📋 *Доступные вакансии:*",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode='Markdown',
-        disable_web_page_preview=True
+    keywords = [] if text.lower() in ('off', 'выкл') else alerts.parse_keywords(text)
+    if not alerts.set_keywords(user.id, keywords):
+        await update.message.reply_text("❌ Не удалось сохранить ключевые слова. Попробуйте позже.")
+        return
+    
+    log_message(user.id, user.username or "Unknown", "success", "Настроил оповещения", f"Слова: {', '.join(keywords)}")
+    if keywords:
+        reply = messages.KEYWORDS_SAVED.format(keywords=escape_markdown(', '.join(keywords)))
+    else:
+        reply = messages.KEYWORDS_CLEARED
+    await update.message.reply_text(reply, parse_mode='Markdown')
+
+async def clear_keyword_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отключает оповещения по ключевым словам кнопкой из оповещения"""
+    query = update.callback_query
+    user = update.effective_user
+    
+    context.bot_data['keyword_alerts'].set_keywords(user.id, [])
+    log_message(user.id, user.username or "Unknown", "success", "Отключил оповещения")
+    
+    await query.answer(messages.KEYWORDS_CLEARED)
+    # Оставляем в сообщении только кнопку перехода к вакансии
+    await query.message.edit_reply_markup(
+        reply_markup=InlineKeyboardMarkup(query.message.reply_markup.inline_keyboard[:1])
     )
+    render_cache.forget(query.message)
 
 async def handle_unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик неизвестных сообщений"""
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "unknown", "Отправил неизвестное сообщение", f"Текст: {update.message.text[:50]}")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями
     keyboard = []
@@ -344,7 +546,7 @@ async def handle_unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 text=vacancy.title,
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -353,14 +555,14 @@ async def handle_unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
             row = []
     
     # Проверяем, является ли пользователь администратором
-    is_admin = db.is_admin(user.id)
+    is_admin = context.request.is_admin
     
     # Для админа добавляем кнопку управления
     if is_admin:
         keyboard.append([
             InlineKeyboardButton(
                 text="⚙️ Управление",
-                callback_data="admin_panel"
+                callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
             )
         ])
     
@@ -376,8 +578,7 @@ async def show_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "view", "Открыл список вакансий")
     
-    db = Database()
-    vacancies = db.get_active_vacancies()
+    vacancies = context.request.active_vacancies
     
     # Создаем клавиатуру с вакансиями
     keyboard = []
@@ -386,7 +587,7 @@ async def show_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
         row.append(
             InlineKeyboardButton(
                 text=vacancy.title,
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         )
         
@@ -395,18 +596,21 @@ async def show_vacancies(update: Update, context: ContextTypes.DEFAULT_TYPE):
             row = []
     
     # Если пользователь админ, добавляем кнопку управления
-    is_admin = db.is_admin(user.id)
+    is_admin = context.request.is_admin
     if is_admin:
         keyboard.append([
             InlineKeyboardButton(
                 text="⚙️ Управление",
-                callback_data="admin_panel"
+                callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
             )
         ])
     
+    keyboard.append([get_subscription_button(context.request.db.is_subscribed(user.id))])
+    
     if not vacancies:
         await update.message.reply_text(
             messages.NO_VACANCIES,
+            reply_markup=InlineKeyboardMarkup(keyboard),
             parse_mode='Markdown',
             disable_web_page_preview=True
         )
@@ -425,41 +629,21 @@ async def show_about(update: Update, context: ContextTypes.DEFAULT_TYPE):
     log_message(user.id, user.username or "Unknown", "view", "Открыл информацию о боте")
     
     # Проверяем, является ли пользователь администратором
-    db = Database()
-    is_admin = db.is_admin(user.id)
+    is_admin = context.request.is_admin
     
-    try:
-        # Формируем текст сообщения
-        text = messages.ABOUT_BOT
-        if is_admin:
-            admin_info = """
-
-⚙️ *Панель администратора*
-• Создание вакансий
-• Управление откликами
-• Модерация заявок"""
-            text += admin_info
-        
-        await update.message.reply_text(
-            text,
-            parse_mode='Markdown',
-            disable_web_page_preview=True
-        )
-    except Exception as e:
-        log_message(user.id, user.username or "Unknown", "error", "Ошибка при показе информации о боте", str(e))
-        # Отправляем текст без форматирования
-        text_clean = text.replace('*', '').replace('`', '').replace('_', '')
-        await update.message.reply_text(
-            text_clean,
-            disable_web_page_preview=True
-        )
+    # Текст проверен и закеширован заранее, повторная отправка без разметки не нужна
+    await update.message.reply_text(
+        template_cache.about(is_admin),
+        parse_mode='Markdown',
+        disable_web_page_preview=True
+    )
 
 async def show_applications(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показывает список заявок пользователя"""
     user = update.effective_user
     log_message(user.id, user.username or "Unknown", "view", "Открыл свои заявки")
     
-    db = Database()
+    db = context.request.db
     applications = db.get_user_applications(user.id)
     
     if not applications:
@@ -516,7 +700,9 @@ async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• /start - Начать работу с ботом\n"
         "• /about - Информация о боте\n"
         "• /vacancies - Список вакансий\n"
-        "• /applications - Ваши отклики",
+        "• /applications - Ваши отклики\n"
+        "• /profile - Ваша анкета\n"
+        "• /alerts - Оповещения по ключевым словам",
         parse_mode='Markdown',
         disable_web_page_preview=True
     )
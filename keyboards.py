@@ -1,6 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from typing import List
-from database import Vacancy
+from typing import List, Set, Tuple
+from database import PendingApplication, Vacancy
+import callbacks
 
 def get_main_keyboard() -> ReplyKeyboardMarkup:
     """Создает основную клавиатуру"""
@@ -17,7 +18,7 @@ def get_vacancies_keyboard(vacancies: List[Vacancy]) -> InlineKeyboardMarkup:
         keyboard.append([
             InlineKeyboardButton(
                 text=vacancy.title,
-                callback_data=f"vacancy_{vacancy.id}"
+                callback_data=callbacks.encode(callbacks.VACANCY, vacancy.id)
             )
         ])
     
@@ -25,7 +26,7 @@ def get_vacancies_keyboard(vacancies: List[Vacancy]) -> InlineKeyboardMarkup:
         keyboard.append([
             InlineKeyboardButton(
                 text="Нет доступных вакансий",
-                callback_data="no_vacancies"
+                callback_data=callbacks.encode(callbacks.NO_VACANCIES)
             )
         ])
     
@@ -37,13 +38,13 @@ def get_vacancy_actions_keyboard(vacancy_id: int) -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton(
                 text="Откликнуться",
-                callback_data=f"apply_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.APPLY, vacancy_id)
             )
         ],
         [
             InlineKeyboardButton(
                 text="↩️ К списку вакансий",
-                callback_data="back_to_vacancies"
+                callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES)
             )
         ]
     ]
@@ -54,7 +55,7 @@ def get_back_to_list_keyboard() -> InlineKeyboardMarkup:
     keyboard = [[
         InlineKeyboardButton(
             "« Назад к списку",
-            callback_data="back_to_vacancies"
+            callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES)
         )
     ]]
     return InlineKeyboardMarkup(keyboard)
@@ -65,7 +66,7 @@ def get_admin_keyboard() -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton(
                 text="⚙️ Управление",
-                callback_data="admin_panel"
+                callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
             )
         ]
     ]
@@ -77,19 +78,25 @@ def get_admin_panel_keyboard() -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton(
                 "📝 Добавить вакансию",
-                callback_data="add_vacancy"
+                callback_data=callbacks.encode(callbacks.ADD_VACANCY)
             )
         ],
         [
             InlineKeyboardButton(
                 "📋 Редактировать вакансии",
-                callback_data="edit_vacancies"
+                callback_data=callbacks.encode(callbacks.EDIT_VACANCIES)
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                "📥 Очередь откликов",
+                callback_data=callbacks.encode(callbacks.MODERATION_QUEUE)
             )
         ],
         [
             InlineKeyboardButton(
                 "« Вернуться в меню",
-                callback_data="back_to_main"
+                callback_data=callbacks.encode(callbacks.BACK_TO_MAIN)
             )
         ]
     ]
@@ -100,7 +107,7 @@ def get_back_to_edit_keyboard() -> InlineKeyboardMarkup:
     keyboard = [[
         InlineKeyboardButton(
             "« Назад к списку вакансий",
-            callback_data="edit_vacancies"
+            callback_data=callbacks.encode(callbacks.EDIT_VACANCIES)
         )
     ]]
     return InlineKeyboardMarkup(keyboard)
@@ -111,7 +118,7 @@ def get_back_to_main_keyboard() -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton(
                 text="↩️ В главное меню",
-                callback_data="back_to_main"
+                callback_data=callbacks.encode(callbacks.BACK_TO_MAIN)
             )
         ]
     ]
@@ -123,11 +130,11 @@ def get_edit_vacancy_keyboard(vacancy_id: int) -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton(
                 "✏️ Изменить название",
-                callback_data=f"edit_title_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.EDIT_TITLE, vacancy_id)
             ),
             InlineKeyboardButton(
                 "📝 Изменить описание",
-                callback_data=f"edit_description_{vacancy_id}"
+                callback_data=callbacks.encode(callbacks.EDIT_DESCRIPTION, vacancy_id)
             )
         ]
     ]
@@ -138,7 +145,179 @@ def get_cancel_edit_keyboard(vacancy_id: int):
     keyboard = [[
         InlineKeyboardButton(
             "❌ Отменить",
-            callback_data=f"cancel_edit_{vacancy_id}"
+            callback_data=callbacks.encode(callbacks.CANCEL_EDIT, vacancy_id)
         )
     ]]
     return InlineKeyboardMarkup(keyboard)
+
+def get_moderation_queue_keyboard(pending_counts: List[Tuple[int, str, int]]) -> InlineKeyboardMarkup:
+    """Клавиатура очереди модерации: вакансии с числом откликов на рассмотрении"""
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                f"{title} ({count})",
+                callback_data=callbacks.encode(callbacks.MODERATION_PAGE, vacancy_id, 0)
+            )
+        ]
+        for vacancy_id, title, count in pending_counts
+    ]
+    keyboard.append([
+        InlineKeyboardButton(
+            "« Назад в панель управления",
+            callback_data=callbacks.encode(callbacks.ADMIN_PANEL)
+        )
+    ])
+    return InlineKeyboardMarkup(keyboard)
+
+def get_moderation_page_keyboard(
+    vacancy_id: int,
+    after_id: int,
+    applications: List[PendingApplication],
+    selected: Set[int],
+    next_after_id: int = None
+) -> InlineKeyboardMarkup:
+    """Клавиатура страницы очереди модерации с выбором откликов"""
+    keyboard = []
+    row = []
+    for i, application in enumerate(applications, 1):
+        mark = "☑️" if application.id in selected else "⬜️"
+        row.append(
+            InlineKeyboardButton(
+                f"{mark} #{application.id}",
+                callback_data=callbacks.encode(callbacks.MODERATION_TOGGLE, vacancy_id, after_id, application.id)
+            )
+        )
+        if len(row) == 2 or i == len(applications):
+            keyboard.append(row)
+            row = []
+    
+    keyboard.append([
+        InlineKeyboardButton(
+            "☑️ Выбрать все на странице",
+            callback_data=callbacks.encode(callbacks.MODERATION_SELECT_PAGE, vacancy_id, after_id)
+        )
+    ])
+    keyboard.append([
+        InlineKeyboardButton(
+            f"✅ Принять ({len(selected)})",
+            callback_data=callbacks.encode(callbacks.MODERATION_ACCEPT, vacancy_id, after_id)
+        ),
+        InlineKeyboardButton(
+            f"❌ Отклонить ({len(selected)})",
+            callback_data=callbacks.encode(callbacks.MODERATION_REJECT, vacancy_id, after_id)
+        )
+    ])
+    
+    navigation = []
+    if after_id:
+        navigation.append(
+            InlineKeyboardButton(
+                "« В начало",
+                callback_data=callbacks.encode(callbacks.MODERATION_PAGE, vacancy_id, 0)
+            )
+        )
+    if next_after_id:
+        navigation.append(
+            InlineKeyboardButton(
+                "Далее »",
+                callback_data=callbacks.encode(callbacks.MODERATION_PAGE, vacancy_id, next_after_id)
+            )
+        )
+    if navigation:
+        keyboard.append(navigation)
+    
+    keyboard.append([
+        InlineKeyboardButton(
+            "« К очереди",
+            callback_data=callbacks.encode(callbacks.MODERATION_QUEUE)
+        )
+    ])
+    return InlineKeyboardMarkup(keyboard)
+
+def get_application_response_keyboard(application_id: int) -> InlineKeyboardMarkup:
+    """Создает клавиатуру решения по отклику для чата обратной связи"""
+    keyboard = [
+        [
+            InlineKeyboardButton("✅ Принять", callback_data=callbacks.encode(callbacks.APPLICATION_ACCEPT, application_id)),
+            InlineKeyboardButton("❌ Отклонить", callback_data=callbacks.encode(callbacks.APPLICATION_REJECT, application_id))
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_application_digest_keyboard(application_ids: List[int]) -> InlineKeyboardMarkup:
+    """Создает клавиатуру сводки откликов: по строке кнопок на каждый отклик"""
+    keyboard = []
+    for application_id in application_ids:
+        keyboard.append([
+            InlineKeyboardButton(
+                f"✅ #{application_id}",
+                callback_data=callbacks.encode(callbacks.DIGEST_ACCEPT, application_id)
+            ),
+            InlineKeyboardButton(
+                f"❌ #{application_id}",
+                callback_data=callbacks.encode(callbacks.DIGEST_REJECT, application_id)
+            )
+        ])
+    return InlineKeyboardMarkup(keyboard)
+
+def mark_digest_item(markup: InlineKeyboardMarkup, application_id: int, label: str) -> InlineKeyboardMarkup:
+    """Заменяет кнопки отклика в сводке на информационную кнопку с решением"""
+    keyboard = []
+    for row in markup.inline_keyboard:
+        data = callbacks.decode(row[0].callback_data) if row and isinstance(row[0].callback_data, str) else None
+        if data and data.args and data.id == application_id:
+            row = [InlineKeyboardButton(label, callback_data=callbacks.encode(callbacks.DIGEST_DONE, application_id))]
+        keyboard.append(list(row))
+    return InlineKeyboardMarkup(keyboard)
+
+def get_subscription_button(subscribed: bool) -> InlineKeyboardButton:
+    """Создает кнопку подписки на новые вакансии"""
+    if subscribed:
+        return InlineKeyboardButton("🔕 Отписаться от новых вакансий", callback_data=callbacks.encode(callbacks.UNSUBSCRIBE))
+    return InlineKeyboardButton("🔔 Сообщать о новых вакансиях", callback_data=callbacks.encode(callbacks.SUBSCRIBE))
+
+def replace_subscription_button(markup: InlineKeyboardMarkup, subscribed: bool) -> InlineKeyboardMarkup:
+    """Заменяет кнопку подписки в клавиатуре сообщения после ее переключения"""
+    keyboard = []
+    for row in markup.inline_keyboard:
+        new_row = []
+        for button in row:
+            data = callbacks.decode(button.callback_data) if isinstance(button.callback_data, str) else None
+            if data and data.action in (callbacks.SUBSCRIBE, callbacks.UNSUBSCRIBE):
+                button = get_subscription_button(subscribed)
+            new_row.append(button)
+        keyboard.append(new_row)
+    return InlineKeyboardMarkup(keyboard)
+
+def get_announcement_keyboard(vacancy_id: int) -> InlineKeyboardMarkup:
+    """Создает клавиатуру уведомления о новой вакансии"""
+    keyboard = [
+        [InlineKeyboardButton("📄 Подробнее", callback_data=callbacks.encode(callbacks.VACANCY, vacancy_id))],
+        [get_subscription_button(True)]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_keyword_alert_keyboard(vacancy_id: int) -> InlineKeyboardMarkup:
+    """Создает клавиатуру оповещения по ключевым словам"""
+    keyboard = [
+        [InlineKeyboardButton("📄 Подробнее", callback_data=callbacks.encode(callbacks.VACANCY, vacancy_id))],
+        [InlineKeyboardButton("🔕 Отключить оповещения", callback_data=callbacks.encode(callbacks.KEYWORDS_CLEAR))]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_save_profile_keyboard() -> InlineKeyboardMarkup:
+    """Создает клавиатуру с предложением сохранить отклик как анкету"""
+    keyboard = [
+        [InlineKeyboardButton("💾 Сохранить как анкету", callback_data=callbacks.encode(callbacks.SAVE_PROFILE))],
+        [InlineKeyboardButton("📋 К вакансиям", callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES))]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_profile_keyboard(has_profile: bool) -> InlineKeyboardMarkup:
+    """Создает клавиатуру анкеты кандидата"""
+    text = "✏️ Изменить анкету" if has_profile else "📝 Заполнить анкету"
+    keyboard = [
+        [InlineKeyboardButton(text, callback_data=callbacks.encode(callbacks.EDIT_PROFILE))],
+        [InlineKeyboardButton("📋 К вакансиям", callback_data=callbacks.encode(callbacks.BACK_TO_VACANCIES))]
+    ]
+    return InlineKeyboardMarkup(keyboard)
@@ -1,14 +1,29 @@
 from telegram import Update
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ConversationHandler, ContextTypes
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, TypeHandler, filters, ConversationHandler, ContextTypes
 from telegram.error import TelegramError
 import logging
-from config import load_config
-from handlers import user_handlers, admin_handlers
-from database import Database
-from utils.logger import logger, log_message
-from utils.rate_limiter import RateLimiter
+from config import Config, load_config
+from handlers import user_handlers, admin_handlers, moderation_handlers
+from utils.logger import configure_log_format, configure_log_rotation, logger, log_message
+from utils.rate_limiter import RateLimiter, UserState
+from utils.persistence import SQLitePersistence
+from utils.sessions import SessionCollector
+from utils.request_context import BotContext
+from utils.outbox import Outbox, OutgoingMessage
+from utils.digest import FeedbackDigest
+from utils.broadcast import Broadcaster
+from utils.alerts import KeywordAlerts
+from utils.metrics import CountingRequest, MetricsServer, instrument_application, metrics
+from utils.presenter import render_cache
+from utils.loop_monitor import LoopMonitor, enable_asyncio_debug
+from utils.update_recorder import UpdateRecorder
+from utils.memory import MemoryProfiler
+from templates import template_cache
+from database import Application as ApplicationRecord, PendingApplication, Vacancy, enable_query_profiling
 from datetime import datetime
+from functools import partial
 from keyboards import get_main_keyboard
+import callbacks
 
 # Создаем глобальный rate limiter
 rate_limiter = RateLimiter(
@@ -52,15 +67,111 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     else:
         logger.error(f"Произошла ошибка: {str(context.error)}")
 
-def main():
-    # Загрузка конфигурации
-    config = load_config()
+def build_application(config: Config, base_url: str = None) -> Application:
+    """Создает приложение со всеми обработчиками (base_url - адрес Bot API, если не стандартный)"""
+    # Профилирование запросов к БД (включается до первого обращения к базе)
+    if config.query_profiling:
+        profiler = enable_query_profiling(config.slow_query_ms)
+        metrics.collector(profiler.prometheus_lines)
+    
+    # Хранилище состояний диалогов, чтобы незавершенные отклики переживали перезапуск
+    persistence = SQLitePersistence(update_interval=config.persistence_flush_interval)
+    
+    # Очередь исходящих уведомлений с ограничением скорости
+    outbox = Outbox(messages_per_second=config.outbox_rate)
+    
+    # Рассылка о новых вакансиях
+    broadcaster = Broadcaster(outbox, batch_size=config.broadcast_batch_size)
+    
+    # Оповещения о вакансиях по ключевым словам
+    keyword_alerts = KeywordAlerts(outbox)
+    
+    async def on_blocked(chat_id: int):
+        await broadcaster.forget_blocked(chat_id)
+        keyword_alerts.forget_user(chat_id)
+    
+    outbox.on_blocked = on_blocked
+    
+    # Локальный HTTP-сервер метрик в формате Prometheus (METRICS_PORT=0 - отключен)
+    metrics_server = MetricsServer(port=config.metrics_port) if config.metrics_port else None
+    # Обновления, потратившие больше вызовов Bot API, пишутся в лог с трассой вызовов
+    metrics.api_call_budget = config.api_call_budget
+    
+    # Измерение задержки событийного цикла и поиск блокирующих вызовов
+    loop_monitor = LoopMonitor(threshold=config.loop_lag_threshold_ms / 1000) if config.loop_monitor else None
+    if loop_monitor:
+        metrics.collector(loop_monitor.prometheus_lines)
+    
+    # Запись входящих обновлений для нагрузочных прогонов (UPDATE_RECORDING)
+    recorder = UpdateRecorder(config.update_record_dir, config.update_record_salt) if config.update_recording else None
+    
+    async def post_init(application: Application):
+        if recorder:
+            await recorder.start(application)
+        if config.asyncio_debug:
+            enable_asyncio_debug(config.loop_lag_threshold_ms)
+        if loop_monitor:
+            await loop_monitor.start(application)
+        await outbox.start(application)
+        await broadcaster.start(application)
+        if metrics_server:
+            await metrics_server.start(application)
+    
+    async def post_stop(application: Application):
+        # Сводка и очередь уведомлений дописываются, пока бот еще может отправлять сообщения
+        await feedback_digest.stop(application)
+        await broadcaster.stop(application)
+        await outbox.stop(application)
+    
+    async def post_shutdown(application: Application):
+        if metrics_server:
+            await metrics_server.stop(application)
+        if loop_monitor:
+            await loop_monitor.stop(application)
+        if recorder:
+            await recorder.stop(application)
+    
+    # Сводка новых откликов для чата обратной связи
+    feedback_digest = FeedbackDigest(
+        chat_id=config.feedback_chat_id,
+        interval=config.feedback_digest_interval,
+        max_items=config.feedback_digest_max_items,
+        threshold=config.feedback_digest_threshold
+    )
     
     # Создание приложения
-    application = Application.builder().token(config.token).build()
+    builder = (
+        Application.builder()
+        .token(config.token)
+        .request(CountingRequest(connection_pool_size=256))
+        .persistence(persistence)
+        .context_types(ContextTypes(context=BotContext))
+        .concurrent_updates(config.concurrent_updates)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
     
     # Сохранение конфигурации в bot_data для доступа из хэндлеров
     application.bot_data['config'] = config
+    application.bot_data['outbox'] = outbox
+    application.bot_data['feedback_digest'] = feedback_digest
+    application.bot_data['broadcaster'] = broadcaster
+    application.bot_data['keyword_alerts'] = keyword_alerts
+    
+    # Сборщик устаревших пользовательских состояний
+    session_collector = SessionCollector(
+        idle_ttl_seconds=config.session_idle_ttl,
+        max_sessions=config.max_sessions
+    )
+    application.bot_data['session_collector'] = session_collector
+    application.add_handler(TypeHandler(Update, session_collector.touch), group=-1)
+    
+    # Обработчик истечения таймаута диалога
+    timeout_handlers = [TypeHandler(Update, session_collector.clear_conversation_state)]
     
     # Отключаем все предупреждения
     logging.getLogger('telegram').setLevel(logging.ERROR)
@@ -71,13 +182,17 @@ def main():
     application.add_handler(CommandHandler("about", user_handlers.show_about))
     application.add_handler(CommandHandler("vacancies", user_handlers.show_vacancies))
     application.add_handler(CommandHandler("applications", user_handlers.show_applications))
+    application.add_handler(CommandHandler("alerts", user_handlers.manage_keyword_alerts))
+    application.add_handler(CommandHandler("profile", user_handlers.show_profile))
+    application.add_handler(CommandHandler("dbstats", admin_handlers.show_db_stats))
+    application.add_handler(CommandHandler("memory", admin_handlers.show_memory_report))
     
     # Обработчик добавления вакансии для админов
     add_vacancy_conv = ConversationHandler(
         entry_points=[
             CallbackQueryHandler(
                 admin_handlers.start_add_vacancy,
-                pattern=r'^add_vacancy$'
+                pattern=callbacks.action_filter(callbacks.ADD_VACANCY)
             )
         ],
         states={
@@ -100,18 +215,22 @@ def main():
                 ),
                 CallbackQueryHandler(
                     admin_handlers.skip_image,
-                    pattern=r'^skip_image$'
+                    pattern=callbacks.action_filter(callbacks.SKIP_IMAGE)
                 )
-            ]
+            ],
+            ConversationHandler.TIMEOUT: timeout_handlers
         },
         fallbacks=[
             CallbackQueryHandler(
                 admin_handlers.show_admin_panel,
-                pattern=r'^admin_panel$'
+                pattern=callbacks.action_filter(callbacks.ADMIN_PANEL)
             )
         ],
         per_chat=True,
-        per_user=True
+        per_user=True,
+        name='add_vacancy',
+        persistent=True,
+        conversation_timeout=config.conversation_timeout
     )
     
     # Обработчик редактирования вакансий
@@ -119,11 +238,11 @@ def main():
         entry_points=[
             CallbackQueryHandler(
                 admin_handlers.start_edit_title,
-                pattern=r'^edit_title_\d+$'
+                pattern=callbacks.action_filter(callbacks.EDIT_TITLE)
             ),
             CallbackQueryHandler(
                 admin_handlers.start_edit_description,
-                pattern=r'^edit_description_\d+$'
+                pattern=callbacks.action_filter(callbacks.EDIT_DESCRIPTION)
             )
         ],
         states={
@@ -138,20 +257,24 @@ def main():
                     filters.TEXT & ~filters.COMMAND,
                     admin_handlers.process_edit_description
                 )
-            ]
+            ],
+            ConversationHandler.TIMEOUT: timeout_handlers
         },
         fallbacks=[
             CallbackQueryHandler(
                 admin_handlers.cancel_edit,
-                pattern=r'^cancel_edit_\d+$'
+                pattern=callbacks.action_filter(callbacks.CANCEL_EDIT)
             ),
             CallbackQueryHandler(
                 admin_handlers.edit_vacancy,
-                pattern=r'^edit_vacancy_\d+$'
+                pattern=callbacks.action_filter(callbacks.EDIT_VACANCY)
             )
         ],
         per_chat=True,
-        per_user=True
+        per_user=True,
+        name='edit_vacancy',
+        persistent=True,
+        conversation_timeout=config.conversation_timeout
     )
     
     # Обработчик отклика на вакансию
@@ -159,7 +282,7 @@ def main():
         entry_points=[
             CallbackQueryHandler(
                 user_handlers.apply_to_vacancy,
-                pattern=r'^apply_\d+$'
+                pattern=callbacks.action_filter(callbacks.APPLY)
             )
         ],
         states={
@@ -167,23 +290,63 @@ def main():
                 MessageHandler(
                     filters.TEXT & ~filters.COMMAND,
                     user_handlers.process_application
+                ),
+                MessageHandler(
+                    filters.Document.ALL | filters.PHOTO,
+                    user_handlers.process_application_attachment
+                )
+            ],
+            ConversationHandler.TIMEOUT: timeout_handlers
+        },
+        fallbacks=[
+            CallbackQueryHandler(
+                user_handlers.back_to_vacancies,
+                pattern=callbacks.action_filter(callbacks.BACK_TO_VACANCIES)
+            )
+        ],
+        per_chat=True,
+        per_user=True,
+        name='apply_vacancy',
+        persistent=True,
+        conversation_timeout=config.conversation_timeout
+    )
+    
+    # Обработчик заполнения анкеты кандидата
+    profile_conv = ConversationHandler(
+        entry_points=[
+            CallbackQueryHandler(
+                user_handlers.start_edit_profile,
+                pattern=callbacks.action_filter(callbacks.EDIT_PROFILE)
+            )
+        ],
+        states={
+            user_handlers.AWAITING_PROFILE: [
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    user_handlers.process_profile
                 )
-            ]
+            ],
+            ConversationHandler.TIMEOUT: timeout_handlers
         },
         fallbacks=[
             CallbackQueryHandler(
                 user_handlers.back_to_vacancies,
-                pattern=r'^back_to_vacancies$'
+                pattern=callbacks.action_filter(callbacks.BACK_TO_VACANCIES)
             )
         ],
         per_chat=True,
-        per_user=True
+        per_user=True,
+        name='edit_profile',
+        persistent=True,
+        conversation_timeout=config.conversation_timeout
     )
     
     # Регистрация обработчиков диалогов (должны быть перед общими обработчиками)
     application.add_handler(add_vacancy_conv)
     application.add_handler(apply_vacancy_conv)
+    application.add_handler(profile_conv)
     application.add_handler(edit_vacancy_conv)
+    session_collector.track_conversations(add_vacancy_conv, apply_vacancy_conv, profile_conv, edit_vacancy_conv)
     
     # Регистрация обработчиков текстовых команд меню
     for pattern, handler in [
@@ -193,48 +356,40 @@ def main():
     ]:
         application.add_handler(MessageHandler(
             filters.Regex(pattern),
-            lambda u, c, h=handler: message_handler_with_spam_protection(u, c, h)
+            partial(message_handler_with_spam_protection, handler=handler)
         ))
     
-    # Обработчики callback кнопок для админа
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.show_admin_panel,
-        pattern=r'^admin_panel$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.show_vacancies_for_edit,
-        pattern=r'^edit_vacancies$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.back_to_main,
-        pattern=r'^back_to_main$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.edit_vacancy,
-        pattern=r'^edit_vacancy_\d+$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.toggle_vacancy_status,
-        pattern=r'^toggle_status_\d+$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.delete_vacancy,
-        pattern=r'^delete_vacancy_\d+$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        admin_handlers.process_application_response,
-        pattern=r'^application_(accept|reject)_\d+$'
-    ))
+    # Обработчики callback кнопок: один маршрутизатор вместо цепочки regex-обработчиков
+    router = callbacks.CallbackRouter()
     
-    # Обработчики callback кнопок для пользователя
-    application.add_handler(CallbackQueryHandler(
-        user_handlers.show_vacancy,
-        pattern=r'^vacancy_\d+$'
-    ))
-    application.add_handler(CallbackQueryHandler(
-        user_handlers.back_to_vacancies,
-        pattern=r'^back_to_vacancies$'
-    ))
+    # Для админа
+    router.add(callbacks.ADMIN_PANEL, admin_handlers.show_admin_panel)
+    router.add(callbacks.EDIT_VACANCIES, admin_handlers.show_vacancies_for_edit)
+    router.add(callbacks.BACK_TO_MAIN, admin_handlers.back_to_main)
+    router.add(callbacks.EDIT_VACANCY, admin_handlers.edit_vacancy)
+    router.add(callbacks.TOGGLE_STATUS, admin_handlers.toggle_vacancy_status)
+    router.add(callbacks.DELETE_VACANCY, admin_handlers.delete_vacancy)
+    router.add(callbacks.APPLICATION_ACCEPT, admin_handlers.process_application_response)
+    router.add(callbacks.APPLICATION_REJECT, admin_handlers.process_application_response)
+    router.add(callbacks.DIGEST_ACCEPT, admin_handlers.process_digest_response)
+    router.add(callbacks.DIGEST_REJECT, admin_handlers.process_digest_response)
+    router.add(callbacks.MODERATION_QUEUE, moderation_handlers.show_moderation_queue)
+    router.add(callbacks.MODERATION_PAGE, moderation_handlers.show_moderation_page)
+    router.add(callbacks.MODERATION_TOGGLE, moderation_handlers.toggle_selection)
+    router.add(callbacks.MODERATION_SELECT_PAGE, moderation_handlers.select_page)
+    router.add(callbacks.MODERATION_ACCEPT, moderation_handlers.decide_selected)
+    router.add(callbacks.MODERATION_REJECT, moderation_handlers.decide_selected)
+    
+    # Для пользователя
+    router.add(callbacks.VACANCY, user_handlers.show_vacancy)
+    router.add(callbacks.BACK_TO_VACANCIES, user_handlers.back_to_vacancies)
+    router.add(callbacks.QUICK_APPLY, user_handlers.quick_apply)
+    router.add(callbacks.SAVE_PROFILE, user_handlers.save_offered_profile)
+    router.add(callbacks.SUBSCRIBE, user_handlers.toggle_subscription)
+    router.add(callbacks.UNSUBSCRIBE, user_handlers.toggle_subscription)
+    router.add(callbacks.KEYWORDS_CLEAR, user_handlers.clear_keyword_alerts)
+    
+    application.add_handler(CallbackQueryHandler(router.dispatch))
     
     # Обработчик неизвестных команд (должен быть после всех команд)
     application.add_handler(MessageHandler(
@@ -245,12 +400,76 @@ def main():
     # Обработчик неизвестных сообщений (должен быть последним)
     application.add_handler(MessageHandler(
         filters.TEXT & ~filters.COMMAND,
-        lambda u, c: message_handler_with_spam_protection(u, c, user_handlers.handle_text)
+        partial(message_handler_with_spam_protection, handler=user_handlers.handle_text)
     ))
     
     # Добавляем обработчик ошибок
     application.add_error_handler(error_handler)
     
+    # Запись обновлений выполняется раньше всех обработчиков
+    if recorder:
+        application.add_handler(TypeHandler(Update, recorder.record), group=-2)
+    
+    # Замер времени всех обработчиков (после регистрации всех обработчиков)
+    instrument_application(application)
+    metrics.gauge('bot_outbox_pending', 'Messages waiting in the outbox', lambda: outbox.pending)
+    metrics.gauge('bot_outbox_sent_total', 'Messages sent by the outbox', lambda: outbox.sent)
+    metrics.gauge('bot_outbox_failed_total', 'Messages the outbox failed to send', lambda: outbox.failed)
+    metrics.gauge('bot_outbox_blocked_total', 'Recipients who blocked the bot', lambda: outbox.blocked)
+    metrics.gauge('bot_live_sessions', 'Users with non-empty user_data', lambda: session_collector.live_sessions)
+    metrics.gauge('bot_render_skipped_edits_total', 'Message edits skipped as unchanged', lambda: render_cache.saved_calls)
+    metrics.gauge('bot_feedback_messages_total', 'Messages sent to the feedback chat', lambda: feedback_digest.messages_sent)
+    
+    # Диагностика памяти: объекты бота и крупные контейнеры процесса
+    memory_profiler = MemoryProfiler(tracemalloc_frames=config.tracemalloc_frames)
+    memory_profiler.count_types(UserState, Vacancy, ApplicationRecord, PendingApplication, OutgoingMessage)
+    memory_profiler.track('rate_limiter.user_states', lambda: rate_limiter.user_states)
+    memory_profiler.track('rate_limiter.user_last_messages', lambda: rate_limiter.user_last_messages)
+    memory_profiler.track('user_data', lambda: application.user_data)
+    memory_profiler.track('chat_data', lambda: application.chat_data)
+    memory_profiler.track('session_collector.last_activity', lambda: session_collector.last_activity)
+    memory_profiler.track('render_cache', lambda: render_cache.fingerprints)
+    memory_profiler.track('template_cache.vacancy_cards', lambda: template_cache.vacancy_cards)
+    memory_profiler.track('template_cache.profiles', lambda: template_cache.profiles)
+    memory_profiler.track('keyword_alerts.postings', lambda: keyword_alerts.index.postings)
+    memory_profiler.track('logger.handlers', lambda: logger.handlers)
+    application.bot_data['memory_profiler'] = memory_profiler
+    
+    # Периодическая очистка неактивных сессий (требуется JobQueue)
+    if application.job_queue:
+        application.job_queue.run_repeating(
+            session_collector.sweep_job,
+            interval=config.session_sweep_interval,
+            first=config.session_sweep_interval
+        )
+        if feedback_digest.enabled:
+            application.job_queue.run_repeating(
+                feedback_digest.flush_job,
+                interval=config.feedback_digest_interval,
+                first=config.feedback_digest_interval
+            )
+        if config.memory_report_interval:
+            application.job_queue.run_repeating(
+                memory_profiler.report_job,
+                interval=config.memory_report_interval,
+                first=config.memory_report_interval
+            )
+    else:
+        logger.warning("JobQueue недоступна: установите python-telegram-bot[job-queue] для очистки сессий, тайм-аута диалогов, сводки откликов и отчетов о памяти")
+        # Без периодической отправки сводки отклики могли бы задерживаться
+        feedback_digest.interval = 0
+    
+    return application
+
+def main():
+    # Загрузка конфигурации
+    config = load_config()
+    configure_log_rotation(
+        config.log_max_size_mb, config.log_retention_days, config.log_max_total_mb, config.log_compression
+    )
+    configure_log_format(config.log_format)
+    application = build_application(config)
+    
     logger.info(str({
         'type': 'start',
         'user': 'System',
@@ -262,10 +481,7 @@ def main():
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start с проверкой на администратора"""
-    user_id = update.effective_user.id
-    db = Database()
-    
-    if db.is_admin(user_id):
+    if context.request.is_admin:
         return await admin_handlers.admin_start(update, context)
     return await user_handlers.start(update, context)
 
@@ -24,9 +24,41 @@ NO_VACANCIES = """
 😔 *В данный момент нет открытых вакансий*
 
 Но не расстраивайтесь! Мы постоянно развиваемся и регулярно открываем новые позиции.
-Подпишитесь на наш канал @wave_project, чтобы узнавать о новых вакансиях первыми!
+Включите уведомления кнопкой ниже или подпишитесь на наш канал @wave\_project, чтобы узнавать о новых вакансиях первыми!
 """
 
+# Подписка на новые вакансии
+SUBSCRIBED = "🔔 Вы будете получать уведомления о новых вакансиях"
+UNSUBSCRIBED = "🔕 Уведомления о новых вакансиях отключены"
+
+NEW_VACANCY_ANNOUNCEMENT = """
+🆕 *Открыта новая вакансия:* {title}
+
+Нажмите «Подробнее», чтобы посмотреть описание и откликнуться.
+"""
+
+# Оповещения по ключевым словам
+KEYWORD_ALERT = """
+🔎 *Новая вакансия по вашему запросу:* {title}
+
+Совпадения: {keywords}
+"""
+
+KEYWORDS_HELP = """
+🔎 *Оповещения по ключевым словам*
+
+Бот пришлет сообщение, когда откроется вакансия, в названии или описании которой есть ваши слова.
+
+Текущие слова: {keywords}
+
+• `/alerts маппер, 3ds max` - задать слова через запятую
+• `/alerts off` - отключить оповещения
+"""
+
+KEYWORDS_SAVED = "✅ Оповещения включены. Ключевые слова: {keywords}"
+KEYWORDS_CLEARED = "🔕 Оповещения по ключевым словам отключены"
+KEYWORDS_NONE = "не заданы"
+
 # Сообщения для просмотра и отклика на вакансии
 VACANCY_DETAILS = """
 📋 *{title}*
@@ -49,8 +81,19 @@ APPLY_INSTRUCTIONS = """
 5. Удобное время для связи
 
 Отправьте всю информацию *одним сообщением*.
+Портфолио или резюме можно приложить файлом или фото до отправки текста.
+"""
+
+ATTACHMENT_ADDED = """
+📎 *Файл добавлен* ({count} из {limit})
+
+Отправьте текст отклика одним сообщением или приложите еще файлы.
 """
 
+ATTACHMENT_UNSUPPORTED = "⚠️ Этот тип файла не поддерживается. Приложите PDF, документ, архив или изображение."
+ATTACHMENT_TOO_LARGE = "⚠️ Файл слишком большой. Максимальный размер - {limit} МБ."
+ATTACHMENT_LIMIT = "⚠️ К отклику можно приложить не более {limit} файлов. Отправьте текст отклика."
+
 APPLICATION_SENT = """
 ✅ *Спасибо за ваш отклик!*
 
@@ -67,6 +110,57 @@ ALREADY_APPLIED = """
 Пожалуйста, дождитесь ответа от HR-менеджера.
 """
 
+# Анкета кандидата
+PROFILE_OFFER = """
+💾 Сохранить этот отклик как анкету? Тогда на другие вакансии можно будет откликаться одним нажатием.
+"""
+
+PROFILE_CREATED = """
+💾 *Анкета сохранена*: на другие вакансии теперь можно откликнуться одним нажатием.
+Посмотреть или изменить анкету: /profile
+"""
+
+PROFILE_OFFER_EXPIRED = """
+Предложение устарело. Заполнить анкету можно командой /profile
+"""
+
+PROFILE = """
+👤 *Ваша анкета*
+
+{profile}
+
+Анкета отправляется при отклике кнопкой «⚡ Откликнуться».
+"""
+
+PROFILE_EMPTY = """
+👤 *Анкета не заполнена*
+
+Заполните анкету один раз, и откликаться на вакансии можно будет одним нажатием.
+"""
+
+PROFILE_SAVED = "✅ *Анкета сохранена*"
+
+# Статистика запросов к БД для администраторов
+DB_STATS = """
+🐢 *Самые затратные запросы к БД*
+
+{items}"""
+
+DB_STATS_ITEM = """*{method}* · {count} раз · всего {total:.0f} мс
+p50 {p50:.1f} мс · p99 {p99:.1f} мс
+`{statement}`
+
+"""
+
+DB_STATS_DISABLED = "Профилирование запросов отключено. Включите его переменной окружения `QUERY_PROFILING=true`."
+
+MEMORY_REPORT = """
+🧠 *Память процесса*
+
+```
+{report}
+```"""
+
 # Сообщения для администраторов
 ADMIN_START = """
 ⚙️ *Панель администратора Wave Work*
@@ -85,6 +179,7 @@ ADMIN_PANEL = """
 Выберите действие:
 • 📝 Добавить новую вакансию
 • 📋 Редактировать существующие
+• 📥 Модерировать отклики
 • 📊 Просмотреть статистику
 """
 
@@ -171,6 +266,10 @@ BACK_TO_ADMIN_VACANCIES = """
 Выберите вакансию или действие 👇
 """
 
+# Статусы в карточке вакансии
+VACANCY_CLOSED_STATUS = "\n\n❌ *Вакансия закрыта*"
+VACANCY_APPLIED_STATUS = "\n\n⏳ *Вы уже откликались на эту вакансию*\nПовторный отклик будет доступен через 24 часа."
+
 # Информация о боте
 ABOUT_BOT = """
 *Wave Work - Бот Вакансий*
@@ -195,6 +294,13 @@ Wave Project - игровой сервер GTA 5 в тематике Deathmatch.
 • Telegram: @wavegta5
 """
 
+ABOUT_BOT_ADMIN = """
+
+⚙️ *Панель администратора*
+• Создание вакансий
+• Управление откликами
+• Модерация заявок"""
+
 # Сообщения для админов
 NEW_APPLICATION = """
 📋 *Новый отклик на вакансию*
@@ -207,6 +313,22 @@ NEW_APPLICATION = """
 {application_text}
 """
 
+# Сводка новых откликов для чата обратной связи
+APPLICATION_DIGEST = """
+📋 *Новые отклики: {count}*
+
+{items}"""
+
+APPLICATION_DIGEST_ITEM = """*#{id}* · {title}{attachments}
+👤 @{username} (`{user_id}`)
+{application_text}
+
+"""
+
+APPLICATION_DIGEST_ATTACHMENTS = " · 📎 {count}"
+
+APPLICATION_ATTACHMENTS = "\n📎 *Вложений:* {count} (отправлены ответом на это сообщение)\n"
+
 APPLICATION_RESPONSE = """
 {original_message}
 
@@ -219,6 +341,33 @@ APPLICATION_RESPONSE = """
 🕒 {date}
 """
 
+# Очередь модерации
+MODERATION_QUEUE = """
+📥 *Очередь откликов*
+
+Отклики на рассмотрении по вакансиям.
+Выберите вакансию, чтобы принять или отклонить отклики пачкой 👇
+"""
+
+MODERATION_QUEUE_EMPTY = """
+📥 *Очередь откликов пуста*
+
+Все отклики рассмотрены ✨
+"""
+
+MODERATION_PAGE = """
+📥 *{title}*
+Выбрано откликов: {selected}
+
+{items}"""
+
+MODERATION_ITEM = """`#{id}` {candidate} · {date}
+{message}
+
+"""
+
+MODERATION_DONE = "{status_emoji} {status_text}: {count}"
+
 # Сообщения для заявок
 NO_APPLICATIONS = """
 📋 *У вас пока нет откликов на вакансии*
@@ -0,0 +1,148 @@
+"""Подготовка и кеширование текстов сообщений с разметкой Markdown"""
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Tuple
+
+import messages
+
+if TYPE_CHECKING:
+    from database import Vacancy
+
+# Символы разметки Telegram Markdown (legacy)
+MARKDOWN_SPECIAL = '_*`['
+
+_LINK_RE = re.compile(r'\[[^\]\n]+\]\([^)\s]+\)')
+
+# Состояния карточки вакансии
+VACANCY_OPEN = 'open'
+VACANCY_CLOSED = 'closed'
+VACANCY_APPLIED = 'applied'
+
+_VACANCY_STATUS_TEXT = {
+    VACANCY_OPEN: '',
+    VACANCY_CLOSED: messages.VACANCY_CLOSED_STATUS,
+    VACANCY_APPLIED: messages.VACANCY_APPLIED_STATUS
+}
+
+
+def escape_markdown(text: str) -> str:
+    """Экранирует все символы разметки, чтобы текст отображался как есть"""
+    return re.sub(r'([_*`\[])', r'\\\1', text)
+
+
+def sanitize_markdown(text: str) -> str:
+    """
+    Приводит текст к корректной разметке Markdown.
+
+    Парные сущности (*жирный*, _курсив_, `код`, ```блок```, [ссылка](url))
+    сохраняются, а символы разметки без пары экранируются, поэтому Telegram
+    никогда не отклонит сообщение из-за ошибки разбора сущностей.
+    """
+    result = []
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char == '\\' and i + 1 < length and text[i + 1] in MARKDOWN_SPECIAL:
+            result.append(text[i:i + 2])
+            i += 2
+            continue
+        if text.startswith('```', i):
+            end = text.find('```', i + 3)
+            if end != -1:
+                result.append(text[i:end + 3])
+                i = end + 3
+                continue
+        if char in '*_`':
+            end = text.find(char, i + 1)
+            if end > i + 1:
+                result.append(text[i:end + 1])
+                i = end + 1
+                continue
+            result.append('\\' + char)
+            i += 1
+            continue
+        if char == '[':
+            match = _LINK_RE.match(text, i)
+            if match:
+                result.append(match.group(0))
+                i = match.end()
+                continue
+            result.append('\\[')
+            i += 1
+            continue
+        result.append(char)
+        i += 1
+    return ''.join(result)
+
+
+def is_valid_markdown(text: str) -> bool:
+    """Проверяет, что разметка текста не требует исправлений"""
+    return sanitize_markdown(text) == text
+
+
+class TemplateCache:
+    """Кеш готовых текстов сообщений"""
+
+    def __init__(self, max_profiles: int = 10000):
+        # (vacancy_id, состояние) -> (исходное описание, готовый текст)
+        self.vacancy_cards: Dict[Tuple[int, str], Tuple[str, str]] = {}
+        self.static: Dict[str, str] = {}
+        # LRU анкет из candidate_profiles: user_id -> (исходный текст анкеты, экранированный текст)
+        self.max_profiles = max_profiles
+        self.profiles: OrderedDict[int, Tuple[str, str]] = OrderedDict()
+
+    def vacancy_card(self, vacancy: 'Vacancy', state: str) -> str:
+        """Возвращает текст карточки вакансии для указанного состояния"""
+        key = (vacancy.id, state)
+        cached = self.vacancy_cards.get(key)
+        if cached is not None and cached[0] == vacancy.description:
+            return cached[1]
+        text = sanitize_markdown(vacancy.description) + _VACANCY_STATUS_TEXT[state]
+        self.vacancy_cards[key] = (vacancy.description, text)
+        return text
+
+    def about(self, is_admin: bool) -> str:
+        """Возвращает текст раздела "О боте" """
+        key = 'about_admin' if is_admin else 'about'
+        text = self.static.get(key)
+        if text is None:
+            text = messages.ABOUT_BOT + (messages.ABOUT_BOT_ADMIN if is_admin else '')
+            text = sanitize_markdown(text)
+            self.static[key] = text
+        return text
+
+    def profile(self, user_id: int, text: str) -> str:
+        """Возвращает текст сохраненной анкеты кандидата, готовый для вставки в сообщение"""
+        cached = self.profiles.get(user_id)
+        if cached is not None and cached[0] == text:
+            self.profiles.move_to_end(user_id)
+            return cached[1]
+        rendered = escape_markdown(text)
+        self.profiles[user_id] = (text, rendered)
+        self.profiles.move_to_end(user_id)
+        while len(self.profiles) > self.max_profiles:
+            self.profiles.popitem(last=False)
+        return rendered
+
+    def invalidate_profile(self, user_id: int):
+        """Удаляет из кеша анкету кандидата"""
+        self.profiles.pop(user_id, None)
+
+    def invalidate_vacancy(self, vacancy_id: int):
+        """Удаляет из кеша все тексты вакансии"""
+        for key in [k for k in self.vacancy_cards if k[0] == vacancy_id]:
+            del self.vacancy_cards[key]
+
+
+def vacancy_state(vacancy: 'Vacancy', can_apply: bool) -> str:
+    """Определяет состояние карточки вакансии для пользователя"""
+    if not vacancy.is_active:
+        return VACANCY_CLOSED
+    if not can_apply:
+        return VACANCY_APPLIED
+    return VACANCY_OPEN
+
+
+# Общий кеш текстов для всех обработчиков
+template_cache = TemplateCache()
@@ -0,0 +1,88 @@
+from typing import List, Optional
+
+from database import Database, Vacancy
+from keyboards import get_keyword_alert_keyboard
+from templates import escape_markdown
+from utils.dedupe import RecentKeys
+from utils.keyword_index import KeywordIndex, normalize_keyword
+from utils.logger import logger
+from utils.outbox import OutgoingMessage, Outbox
+import messages
+
+# Ограничения на ключевые слова одного пользователя
+MAX_KEYWORDS = 10
+MAX_KEYWORD_LENGTH = 50
+
+
+class KeywordAlerts:
+    """Оповещения о вакансиях, в которых встречаются ключевые слова пользователя"""
+
+    def __init__(self, outbox: Outbox, db_path: str = "bot_database.db"):
+        self.outbox = outbox
+        self.db = Database(db_path)
+        self.index = KeywordIndex()
+        # Повторная публикация той же вакансии в течение суток не вызывает оповещений
+        self.recent_vacancies = RecentKeys(ttl_seconds=24 * 60 * 60)
+        for user_id, term in self.db.get_all_keyword_alerts():
+            self.index.add(user_id, term)
+
+    @staticmethod
+    def parse_keywords(text: str) -> List[str]:
+        """Разбирает список ключевых слов, разделенных запятыми"""
+        keywords = []
+        for keyword in text.split(','):
+            term = normalize_keyword(keyword[:MAX_KEYWORD_LENGTH])
+            if term and term not in keywords:
+                keywords.append(term)
+        return keywords[:MAX_KEYWORDS]
+
+    def get_keywords(self, user_id: int) -> List[str]:
+        """Возвращает ключевые слова пользователя"""
+        return sorted(self.index.user_terms.get(user_id, ()))
+
+    def set_keywords(self, user_id: int, keywords: List[str]) -> bool:
+        """Сохраняет ключевые слова пользователя и обновляет индекс"""
+        if not self.db.set_keyword_alerts(user_id, keywords):
+            return False
+        self.index.set_user_terms(user_id, keywords)
+        return True
+
+    def forget_user(self, user_id: int):
+        """Удаляет ключевые слова пользователя, заблокировавшего бота"""
+        if user_id in self.index.user_terms:
+            self.set_keywords(user_id, [])
+
+    def notify(self, vacancy: Optional[Vacancy], skip_subscribers: bool = False) -> int:
+        """Ставит в очередь оповещения о вакансии, возвращает число получателей"""
+        if not vacancy or not vacancy.is_active or self.recent_vacancies.seen(vacancy.id):
+            return 0
+
+        matches = self.index.match(f"{vacancy.title}\n{vacancy.description}")
+        if not matches:
+            return 0
+
+        recipients = list(matches)
+        if skip_subscribers:
+            # Подписчики на все вакансии уже получают общую рассылку
+            recipients = self.db.get_unsubscribed(recipients)
+
+        title = escape_markdown(vacancy.title)
+        reply_markup = get_keyword_alert_keyboard(vacancy.id)
+        self.outbox.enqueue_many(
+            OutgoingMessage(
+                user_id,
+                messages.KEYWORD_ALERT.format(
+                    title=title,
+                    keywords=escape_markdown(', '.join(matches[user_id]))
+                ),
+                reply_markup=reply_markup
+            )
+            for user_id in recipients
+        )
+        logger.info(str({
+            'type': 'success',
+            'user': 'System',
+            'action': 'Оповещения по ключевым словам',
+            'details': f"Вакансия: {vacancy.title}, получателей: {len(recipients)}"
+        }))
+        return len(recipients)
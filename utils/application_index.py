@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, Tuple
+from time import time
+
+
+def pack_key(user_id: int, vacancy_id: int) -> int:
+    """Упаковывает пару (user_id, vacancy_id) в одно целое число"""
+    return (user_id << 32) | (vacancy_id & 0xFFFFFFFF)
+
+
+class ApplicationIndex:
+    """Индекс недавних откликов в памяти процесса"""
+
+    def __init__(self, cooldown_seconds: int = 24 * 60 * 60):
+        self.cooldown_seconds = cooldown_seconds
+        self.applied_at: Dict[int, float] = {}  # packed key -> время отклика (unix)
+        self.loaded = False
+        self._last_purge = time()
+
+    def load(self, rows: Iterable[Tuple[int, int, float]]):
+        """Заполняет индекс строками (user_id, vacancy_id, applied_at)"""
+        self.applied_at.clear()
+        for user_id, vacancy_id, applied_at in rows:
+            self.applied_at[pack_key(user_id, vacancy_id)] = float(applied_at)
+        self.loaded = True
+
+    def add(self, user_id: int, vacancy_id: int, applied_at: float = None):
+        """Запоминает новый отклик"""
+        now = time()
+        self.applied_at[pack_key(user_id, vacancy_id)] = applied_at if applied_at is not None else now
+        # Чистим устаревшие записи не чаще одного раза за период ожидания
+        if now - self._last_purge > self.cooldown_seconds:
+            self.purge_expired(now)
+
+    def applied_recently(self, user_id: int, vacancy_id: int) -> bool:
+        """Проверяет, был ли отклик в течение периода ожидания"""
+        applied_at = self.applied_at.get(pack_key(user_id, vacancy_id))
+        if applied_at is None:
+            return False
+        return time() - applied_at < self.cooldown_seconds
+
+    def discard_vacancy(self, vacancy_id: int):
+        """Удаляет из индекса все отклики на вакансию"""
+        vacancy_id &= 0xFFFFFFFF
+        for key in [k for k in self.applied_at if k & 0xFFFFFFFF == vacancy_id]:
+            del self.applied_at[key]
+
+    def purge_expired(self, now: float = None):
+        """Удаляет записи, у которых истек период ожидания"""
+        now = now if now is not None else time()
+        border = now - self.cooldown_seconds
+        for key in [k for k, t in self.applied_at.items() if t <= border]:
+            del self.applied_at[key]
+        self._last_purge = now
+
+    def __len__(self) -> int:
+        return len(self.applied_at)
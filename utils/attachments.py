@@ -0,0 +1,73 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+from telegram import Bot, Message
+
+# Сколько файлов можно приложить к одному отклику
+MAX_ATTACHMENTS = 5
+
+# Допустимые типы документов (изображения разрешены все)
+ALLOWED_MIME_TYPES = {
+    'application/pdf',
+    'application/zip',
+    'application/x-zip-compressed',
+    'application/vnd.rar',
+    'application/x-rar-compressed',
+    'application/x-7z-compressed',
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.oasis.opendocument.text',
+    'text/plain'
+}
+
+
+@dataclass
+class Attachment:
+    """Файл, приложенный к отклику. Хранится только file_id, сам файл бот не скачивает"""
+    kind: str  # document, photo
+    file_id: str
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+
+
+def attachment_from_message(message: Message, max_size: int) -> Tuple[Optional[Attachment], Optional[str]]:
+    """Извлекает вложение из сообщения, проверяя тип и размер по метаданным"""
+    if message.document:
+        document = message.document
+        mime_type = document.mime_type or ''
+        if not mime_type.startswith('image/') and mime_type not in ALLOWED_MIME_TYPES:
+            return None, "unsupported"
+        attachment = Attachment('document', document.file_id, document.file_name, document.file_size)
+    elif message.photo:
+        # Самый крупный из вариантов фото
+        photo = message.photo[-1]
+        attachment = Attachment('photo', photo.file_id, None, photo.file_size)
+    else:
+        return None, "unsupported"
+
+    if attachment.file_size and attachment.file_size > max_size:
+        return None, "too_large"
+    return attachment, None
+
+
+def dump_attachments(attachments: List[Attachment]) -> Optional[str]:
+    """Сериализует вложения для хранения в БД"""
+    return json.dumps([asdict(attachment) for attachment in attachments]) if attachments else None
+
+
+async def send_attachment(bot: Bot, chat_id: int, attachment: Attachment, caption: str, reply_to_message_id: int = None) -> Message:
+    """Пересылает вложение по file_id без повторной загрузки"""
+    if attachment.kind == 'photo':
+        return await bot.send_photo(
+            chat_id=chat_id,
+            photo=attachment.file_id,
+            caption=caption,
+            reply_to_message_id=reply_to_message_id
+        )
+    return await bot.send_document(
+        chat_id=chat_id,
+        document=attachment.file_id,
+        caption=caption,
+        reply_to_message_id=reply_to_message_id
+    )
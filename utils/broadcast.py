@@ -0,0 +1,105 @@
+import asyncio
+from typing import Dict, Optional
+
+from telegram.ext import Application
+
+from database import Broadcast, Database
+from keyboards import get_announcement_keyboard
+from templates import escape_markdown
+from utils.logger import logger
+from utils.outbox import OutgoingMessage, Outbox
+import messages
+
+
+class Broadcaster:
+    """
+    Рассылка карточек новых вакансий подписчикам.
+
+    Подписчики перебираются пачками по возрастанию user_id, после каждой
+    пачки позиция сохраняется в таблице broadcasts, поэтому после падения
+    рассылка продолжается с места остановки. Сообщения отправляются через
+    общую очередь Outbox и не превышают глобальный лимит Telegram.
+    """
+
+    def __init__(self, outbox: Outbox, db_path: str = "bot_database.db", batch_size: int = 100):
+        self.outbox = outbox
+        self.db = Database(db_path)
+        self.batch_size = batch_size
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+    async def start(self, application: Application):
+        """Продолжает прерванные рассылки (используется в post_init)"""
+        for broadcast in self.db.get_running_broadcasts():
+            logger.info(f"Продолжение рассылки {broadcast.id} с подписчика {broadcast.cursor}")
+            self._spawn(broadcast)
+
+    async def stop(self, application: Application = None):
+        """Останавливает рассылки, прогресс остается в БД (используется в post_stop)"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+
+    def announce(self, vacancy_id: int) -> Optional[Broadcast]:
+        """Запускает рассылку о новой вакансии"""
+        broadcast = self.db.create_broadcast(vacancy_id)
+        if broadcast:
+            self._spawn(broadcast)
+        return broadcast
+
+    async def forget_blocked(self, chat_id: int):
+        """Отписывает пользователя, заблокировавшего бота (обработчик Outbox.on_blocked)"""
+        self.db.unsubscribe(chat_id)
+
+    def _spawn(self, broadcast: Broadcast):
+        """Запускает задачу рассылки"""
+        task = asyncio.create_task(self._run(broadcast))
+        self.tasks[broadcast.id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(broadcast.id, None))
+
+    def _cancel(self, broadcast: Broadcast):
+        """Отменяет рассылку закрытой или удаленной вакансии"""
+        broadcast.status = 'cancelled'
+        self.db.save_broadcast(broadcast)
+        logger.info(f"Рассылка {broadcast.id} отменена: вакансия закрыта или удалена")
+
+    async def _run(self, broadcast: Broadcast):
+        """Отправляет рассылку пачками, сохраняя прогресс и проверяя вакансию перед каждой"""
+        try:
+            while True:
+                # Вакансию могут закрыть или удалить, пока идет рассылка
+                vacancy = self.db.get_vacancy(broadcast.vacancy_id)
+                if not vacancy or not vacancy.is_active:
+                    self._cancel(broadcast)
+                    return
+                text = messages.NEW_VACANCY_ANNOUNCEMENT.format(title=escape_markdown(vacancy.title))
+                reply_markup = get_announcement_keyboard(vacancy.id)
+
+                subscribers = self.db.get_subscribers(broadcast.cursor, self.batch_size)
+                if not subscribers:
+                    break
+
+                results = await self.outbox.deliver_many([
+                    OutgoingMessage(user_id, text, reply_markup=reply_markup)
+                    for user_id in subscribers
+                ])
+                delivered = sum(results)
+                broadcast.sent += delivered
+                broadcast.failed += len(results) - delivered
+                broadcast.cursor = subscribers[-1]
+                self.db.save_broadcast(broadcast)
+
+            broadcast.status = 'done'
+            self.db.save_broadcast(broadcast)
+            logger.info(str({
+                'type': 'success',
+                'user': 'System',
+                'action': 'Рассылка завершена',
+                'details': f"Вакансия: {vacancy.title}, доставлено: {broadcast.sent}, не доставлено: {broadcast.failed}"
+            }))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Рассылка остается незавершенной и продолжится после перезапуска
+            logger.error(f"Ошибка рассылки {broadcast.id}: {str(e)}")
@@ -2,7 +2,6 @@ from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 import logging
-from database import Database
 from utils.logger import log_message
 
 logger = logging.getLogger(__name__)
@@ -14,10 +13,13 @@ def admin_only(func):
         user_id = update.effective_user.id
         username = update.effective_user.username or "Неизвестный пользователь"
         
-        db = Database()
-        if not db.is_admin(user_id):
+        # Результат проверки сохраняется в контексте обновления и переиспользуется обработчиком
+        if not context.request.is_admin:
             log_message(user_id, username, "error", "Попытка доступа к админке", "Доступ запрещен")
-            await update.message.reply_text("Извините, у вас нет доступа к этой команде.")
+            if update.callback_query:
+                await update.callback_query.answer("Извините, у вас нет доступа к этой команде.", show_alert=True)
+            else:
+                await update.message.reply_text("Извините, у вас нет доступа к этой команде.")
             return
         
         return await func(update, context, *args, **kwargs)
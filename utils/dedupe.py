@@ -0,0 +1,27 @@
+from collections import OrderedDict
+from time import time
+from typing import Hashable
+
+
+class RecentKeys:
+    """Кратковременная память о недавно обработанных ключах"""
+
+    def __init__(self, ttl_seconds: float = 30, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.keys: OrderedDict[Hashable, float] = OrderedDict()
+
+    def seen(self, key: Hashable) -> bool:
+        """Возвращает True, если ключ уже встречался, иначе запоминает его"""
+        now = time()
+        # Ключи добавляются по порядку, поэтому устаревшие находятся в начале
+        while self.keys:
+            oldest_key, added_at = next(iter(self.keys.items()))
+            if now - added_at < self.ttl_seconds and len(self.keys) < self.max_size:
+                break
+            self.keys.popitem(last=False)
+
+        if key in self.keys:
+            return True
+        self.keys[key] = now
+        return False
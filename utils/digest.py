@@ -0,0 +1,181 @@
+from collections import deque
+from dataclasses import dataclass, field
+from time import time
+from typing import Deque, List
+
+from telegram import Bot
+from telegram.ext import Application, ContextTypes
+
+from keyboards import get_application_digest_keyboard, get_application_response_keyboard
+from templates import escape_markdown
+from utils.attachments import Attachment, send_attachment
+from utils.logger import logger
+import messages
+
+# Ограничение Telegram на длину текста сообщения
+MESSAGE_LIMIT = 4096
+
+# Сколько символов сообщения кандидата показывать в сводке
+ITEM_PREVIEW_LENGTH = 300
+
+
+@dataclass
+class ApplicationNotice:
+    """Данные нового отклика для чата обратной связи"""
+    application_id: int
+    title: str
+    username: str
+    user_id: int
+    application_text: str
+    attachments: List[Attachment] = field(default_factory=list)
+
+
+class FeedbackDigest:
+    """
+    Отправка новых откликов в чат обратной связи.
+
+    При небольшом потоке каждый отклик отправляется сразу отдельным сообщением.
+    Если за интервал сводки приходит больше threshold откликов, они копятся
+    и отправляются одним сообщением раз в interval секунд или по max_items штук.
+    """
+
+    def __init__(self, chat_id: int, interval: float = 0, max_items: int = 8, threshold: int = 3):
+        self.chat_id = chat_id
+        self.interval = interval
+        self.max_items = max_items
+        self.threshold = threshold
+        self.buffer: List[ApplicationNotice] = []
+        self.arrivals: Deque[float] = deque()
+        self.messages_sent = 0
+        self.notices_sent = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Включен ли режим сводки"""
+        return self.interval > 0
+
+    def _is_busy(self) -> bool:
+        """Проверяет, превышен ли порог откликов за последний интервал"""
+        now = time()
+        self.arrivals.append(now)
+        while self.arrivals and now - self.arrivals[0] > self.interval:
+            self.arrivals.popleft()
+        return len(self.arrivals) > self.threshold
+
+    async def submit(self, bot: Bot, notice: ApplicationNotice):
+        """Отправляет отклик сразу или откладывает его до ближайшей сводки"""
+        if not self.enabled or (not self._is_busy() and not self.buffer):
+            await self._send_single(bot, notice)
+            return
+
+        self.buffer.append(notice)
+        if len(self.buffer) >= self.max_items:
+            await self.flush(bot)
+
+    async def flush(self, bot: Bot):
+        """Отправляет накопленные отклики"""
+        # Забираем буфер до отправки, чтобы новые отклики попали в следующую сводку
+        notices, self.buffer = self.buffer, []
+        for chunk in self._chunks(notices):
+            try:
+                if len(chunk) == 1:
+                    await self._send_single(bot, chunk[0])
+                else:
+                    await self._send_digest(bot, chunk)
+            except Exception as e:
+                # Отклики остаются в очереди модерации, поэтому только логируем
+                logger.error(f"Ошибка при отправке сводки откликов: {str(e)}")
+
+    async def flush_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Периодическая отправка сводки для JobQueue"""
+        if self.buffer:
+            await self.flush(context.bot)
+
+    async def stop(self, application: Application):
+        """Отправляет оставшиеся отклики при остановке (используется как post_stop)"""
+        if self.buffer:
+            await self.flush(application.bot)
+
+    def _render_item(self, notice: ApplicationNotice) -> str:
+        """Формирует строку отклика для сводки"""
+        text = notice.application_text
+        if len(text) > ITEM_PREVIEW_LENGTH:
+            text = text[:ITEM_PREVIEW_LENGTH] + "…"
+        return messages.APPLICATION_DIGEST_ITEM.format(
+            id=notice.application_id,
+            title=escape_markdown(notice.title),
+            username=escape_markdown(notice.username),
+            user_id=notice.user_id,
+            application_text=escape_markdown(text),
+            attachments=messages.APPLICATION_DIGEST_ATTACHMENTS.format(count=len(notice.attachments)) if notice.attachments else ""
+        )
+
+    def _chunks(self, notices: List[ApplicationNotice]) -> List[List[ApplicationNotice]]:
+        """Делит отклики на сводки, укладывающиеся в лимит длины сообщения"""
+        header_length = len(messages.APPLICATION_DIGEST.format(count=len(notices), items=""))
+        chunks = []
+        current, length = [], header_length
+        for notice in notices:
+            item_length = len(self._render_item(notice))
+            if current and length + item_length > MESSAGE_LIMIT:
+                chunks.append(current)
+                current, length = [], header_length
+            current.append(notice)
+            length += item_length
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _send_attachments(self, bot: Bot, notice: ApplicationNotice, reply_to_message_id: int):
+        """Отправляет вложения отклика ответом на сообщение с откликом"""
+        for attachment in notice.attachments:
+            try:
+                await send_attachment(
+                    bot,
+                    self.chat_id,
+                    attachment,
+                    caption=f"📎 Отклик #{notice.application_id}",
+                    reply_to_message_id=reply_to_message_id
+                )
+                self.messages_sent += 1
+            except Exception as e:
+                # Отклик уже доставлен, ошибка вложения не должна его отменять
+                logger.error(f"Ошибка при отправке вложения к отклику {notice.application_id}: {str(e)}")
+
+    async def _send_single(self, bot: Bot, notice: ApplicationNotice):
+        """Отправляет отклик отдельным сообщением"""
+        text = messages.NEW_APPLICATION.format(
+            title=escape_markdown(notice.title),
+            username=escape_markdown(notice.username),
+            user_id=notice.user_id,
+            application_text=escape_markdown(notice.application_text)
+        )
+        if notice.attachments:
+            text += messages.APPLICATION_ATTACHMENTS.format(count=len(notice.attachments))
+        message = await bot.send_message(
+            chat_id=self.chat_id,
+            text=text,
+            reply_markup=get_application_response_keyboard(notice.application_id),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+        self.messages_sent += 1
+        self.notices_sent += 1
+        await self._send_attachments(bot, notice, message.message_id)
+
+    async def _send_digest(self, bot: Bot, notices: List[ApplicationNotice]):
+        """Отправляет несколько откликов одним сообщением"""
+        message = await bot.send_message(
+            chat_id=self.chat_id,
+            text=messages.APPLICATION_DIGEST.format(
+                count=len(notices),
+                items="".join(self._render_item(notice) for notice in notices)
+            ),
+            reply_markup=get_application_digest_keyboard([notice.application_id for notice in notices]),
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+        self.messages_sent += 1
+        self.notices_sent += len(notices)
+        for notice in notices:
+            await self._send_attachments(bot, notice, message.message_id)
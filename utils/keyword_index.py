@@ -0,0 +1,103 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+# Слова из букв и цифр: "3ds", "max", "маппер"
+_TOKEN_RE = re.compile(r'[0-9a-zа-я]+')
+
+# Окончания, отбрасываемые у русских слов, чтобы "маппера" совпадало с "маппер"
+_ENDINGS = sorted((
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ов', 'ев', 'ей', 'ам', 'ям', 'ах', 'ях', 'ом', 'ем', 'ой', 'ый', 'ий',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ую', 'юю',
+    'а', 'я', 'ы', 'и', 'у', 'ю', 'е', 'о', 'ь'
+), key=len, reverse=True)
+_MIN_STEM_LENGTH = 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на слова в нижнем регистре"""
+    return _TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Приводит ключевое слово или фразу к виду, в котором она хранится в БД"""
+    return ' '.join(tokenize(keyword))
+
+
+def stem(token: str) -> str:
+    """Отбрасывает падежное окончание русского слова"""
+    for ending in _ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= _MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+class KeywordIndex:
+    """
+    Инвертированный индекс подписок на ключевые слова.
+
+    Для каждого термина хранятся его подписчики, поэтому поиск совпадений
+    для вакансии зависит от числа слов в ней, а не от числа подписок.
+    Фразы из нескольких слов дополнительно индексируются по первому слову.
+    """
+
+    def __init__(self):
+        # Ключ термина (основы слов) -> {user_id: термин в том виде, как его ввел пользователь}
+        self.postings: Dict[str, Dict[int, str]] = {}
+        self.phrases: Dict[str, Set[str]] = {}
+        self.user_terms: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.user_terms)
+
+    @staticmethod
+    def _key(term: str) -> str:
+        """Ключ термина в индексе"""
+        return ' '.join(stem(token) for token in term.split(' '))
+
+    def add(self, user_id: int, term: str):
+        """Добавляет подписку пользователя на термин"""
+        key = self._key(term)
+        self.postings.setdefault(key, {})[user_id] = term
+        self.user_terms.setdefault(user_id, set()).add(term)
+        first, _, rest = key.partition(' ')
+        if rest:
+            self.phrases.setdefault(first, set()).add(key)
+
+    def remove_user(self, user_id: int):
+        """Удаляет все подписки пользователя"""
+        for term in self.user_terms.pop(user_id, ()):
+            key = self._key(term)
+            subscribers = self.postings.get(key)
+            if subscribers is None:
+                continue
+            subscribers.pop(user_id, None)
+            if subscribers:
+                continue
+            del self.postings[key]
+            first, _, rest = key.partition(' ')
+            if rest:
+                phrases = self.phrases[first]
+                phrases.discard(key)
+                if not phrases:
+                    del self.phrases[first]
+
+    def set_user_terms(self, user_id: int, terms: Iterable[str]):
+        """Заменяет подписки пользователя"""
+        self.remove_user(user_id)
+        for term in terms:
+            self.add(user_id, term)
+
+    def match(self, text: str) -> Dict[int, List[str]]:
+        """Возвращает подписчиков, чьи термины встречаются в тексте, и сами термины"""
+        stems = {stem(token) for token in tokenize(text)}
+        matches: Dict[int, List[str]] = {}
+        for token in stems:
+            keys = [token] if token in self.postings else []
+            for phrase in self.phrases.get(token, ()):
+                if all(word in stems for word in phrase.split(' ')):
+                    keys.append(phrase)
+            for key in keys:
+                for user_id, term in self.postings[key].items():
+                    matches.setdefault(user_id, []).append(term)
+        return matches
@@ -0,0 +1,319 @@
+"""
+Поиск по журналам бота с индексом.
+
+Читает файлы logs/bot_ГГГГММДД[.N].log, в том числе сжатые ротацией
+(.gz, .zst), в текстовом формате и в JSON Lines (LOG_FORMAT=json).
+Несжатые файлы читаются через mmap, сжатые - потоком. Рядом с журналами
+ведется индекс logs/log_index.db (SQLite): время, уровень, тип действия,
+user_id и смещение каждой записи. Перед запросом индекс дополняется
+новыми записями, поэтому запрос читает с диска только найденные записи.
+
+Запуск: python -m utils.log_search --user 5535130491 --date yesterday
+        python -m utils.log_search --type error --since "2024-05-01 10:00"
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd необязателен
+    zstandard = None
+
+INDEX_NAME = 'log_index.db'
+
+# Записей в одной транзакции индексации
+BATCH_SIZE = 10_000
+
+# Начало записи текстового формата: время и уровень
+_TEXT_RECORD_RE = re.compile(rb'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) \| (\w+) \| ')
+_TEXT_TYPE_RE = re.compile(rb"^\{'type': '(\w+)'")
+_TEXT_USER_RE = re.compile(rb"\(ID: (-?\d+)\)['\"], 'action'")
+_JSON_RECORD_PREFIX = b'{"time": "'
+
+# Запись индекса: смещение, длина, время, уровень, тип, user_id
+Entry = Tuple[int, int, str, str, Optional[str], Optional[int]]
+
+
+def log_files(directory: str, prefix: str = 'bot') -> List[str]:
+    """Файлы журнала бота в каталоге"""
+    pattern = re.compile(rf'^{re.escape(prefix)}_\d{{8}}(\.\d+)?\.log(\.gz|\.zst)?$')
+    return sorted(name for name in os.listdir(directory) if pattern.match(name))
+
+
+def open_compressed(path: str) -> BinaryIO:
+    """Открывает сжатый журнал для потокового чтения"""
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"Для чтения {path} нужен пакет zstandard")
+        return zstandard.open(path, 'rb')
+    return gzip.open(path, 'rb')
+
+
+def iter_lines(path: str, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Строки файла с их смещениями (для сжатых - в распакованных данных)"""
+    if path.endswith('.log'):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= start:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                position = start
+                size = len(data)
+                while position < size:
+                    end = data.find(b'\n', position)
+                    if end == -1:
+                        # Незавершенная строка допишется позже
+                        return
+                    yield position, data[position:end]
+                    position = end + 1
+    else:
+        with open_compressed(path) as f:
+            position = 0
+            for line in f:
+                if position >= start and line.endswith(b'\n'):
+                    yield position, line[:-1]
+                position += len(line)
+
+
+def parse_record(line: bytes) -> Optional[Tuple[str, str, Optional[str], Optional[int]]]:
+    """Время, уровень, тип действия и user_id начала записи; None - строка продолжает предыдущую запись"""
+    if line.startswith(_JSON_RECORD_PREFIX):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        user_id = data.get('user_id')
+        return data['time'], data['level'], data.get('type'), user_id if isinstance(user_id, int) else None
+    match = _TEXT_RECORD_RE.match(line)
+    if not match:
+        return None
+    message = line[match.end():]
+    action_type = _TEXT_TYPE_RE.match(message)
+    user_id = _TEXT_USER_RE.search(message)
+    return (
+        match.group(1).decode(),
+        match.group(2).decode(),
+        action_type.group(1).decode() if action_type else None,
+        int(user_id.group(1)) if user_id else None
+    )
+
+
+def scan(path: str, start: int = 0) -> Iterator[Entry]:
+    """Записи файла начиная со смещения start; многострочные записи (трассировки) объединяются"""
+    current = None
+    end = start
+    for offset, line in iter_lines(path, start):
+        record = parse_record(line)
+        if record is not None:
+            if current is not None:
+                yield (current[0], offset - current[0]) + current[1]
+            current = (offset, record)
+        end = offset + len(line) + 1
+    if current is not None:
+        yield (current[0], end - current[0]) + current[1]
+
+
+class LogIndex:
+    """Индекс записей журналов каталога в SQLite"""
+
+    def __init__(self, directory: str = 'logs', prefix: str = 'bot'):
+        self.directory = directory
+        self.prefix = prefix
+        self.conn = sqlite3.connect(os.path.join(directory, INDEX_NAME))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                indexed INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                file_id INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                time TEXT NOT NULL,
+                level TEXT NOT NULL,
+                type TEXT,
+                user_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_user ON events(user_id, time);
+            CREATE INDEX IF NOT EXISTS idx_events_type ON events(type, time);
+            CREATE INDEX IF NOT EXISTS idx_events_time ON events(time);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _forget(self, file_id: int):
+        self.conn.execute("DELETE FROM events WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def update(self, rebuild: bool = False) -> int:
+        """Дополняет индекс новыми записями; возвращает число добавленных записей"""
+        if rebuild:
+            self.conn.execute("DELETE FROM events")
+            self.conn.execute("DELETE FROM files")
+        names = log_files(self.directory, self.prefix)
+        known = {row[1]: row for row in self.conn.execute("SELECT id, name, inode, size, indexed FROM files")}
+
+        # Файлы, удаленные или переименованные ротацией
+        for name in set(known) - set(names):
+            self._forget(known[name][0])
+
+        added = 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            start = 0
+            file_id = None
+            if name in known:
+                file_id, _, inode, size, indexed = known[name]
+                if inode == stat.st_ino and size == stat.st_size:
+                    continue
+                if inode == stat.st_ino and size < stat.st_size and name.endswith('.log'):
+                    # Текущий файл дописан: индексируется только хвост
+                    start = indexed
+                else:
+                    self._forget(file_id)
+                    file_id = None
+            if file_id is None:
+                file_id = self.conn.execute(
+                    "INSERT INTO files (name, inode, size, indexed) VALUES (?, ?, 0, 0)", (name, stat.st_ino)
+                ).lastrowid
+
+            indexed = start
+            batch = []
+            for entry in scan(path, start):
+                batch.append((file_id,) + entry)
+                indexed = entry[0] + entry[1]
+                if len(batch) >= BATCH_SIZE:
+                    self._insert(batch)
+                    added += len(batch)
+                    batch = []
+            self._insert(batch)
+            added += len(batch)
+            self.conn.execute(
+                "UPDATE files SET size = ?, indexed = ? WHERE id = ?", (stat.st_size, indexed, file_id)
+            )
+            self.conn.commit()
+        self.conn.commit()
+        return added
+
+    def _insert(self, batch: List[tuple]):
+        self.conn.executemany(
+            "INSERT INTO events (file_id, offset, length, time, level, type, user_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+
+    def search(self, user_id: int = None, types: List[str] = None, level: str = None,
+               since: str = None, until: str = None, limit: int = None) -> List[Tuple[str, int, int]]:
+        """Файл, смещение и длина подходящих записей в порядке времени"""
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("e.user_id = ?")
+            params.append(user_id)
+        if types:
+            conditions.append(f"e.type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        if level:
+            conditions.append("e.level = ?")
+            params.append(level.upper())
+        if since:
+            conditions.append("e.time >= ?")
+            params.append(since)
+        if until:
+            conditions.append("e.time < ?")
+            params.append(until)
+        query = "SELECT f.name, e.offset, e.length FROM events e JOIN files f ON f.id = e.file_id"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY e.time, f.name, e.offset"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return self.conn.execute(query, params).fetchall()
+
+    def read(self, matches: List[Tuple[str, int, int]]) -> Iterator[bytes]:
+        """Читает найденные записи; каждый файл открывается один раз"""
+        by_file = {}
+        for position, (name, offset, length) in enumerate(matches):
+            by_file.setdefault(name, []).append((offset, length, position))
+        records: List[Optional[bytes]] = [None] * len(matches)
+        for name, entries in by_file.items():
+            path = os.path.join(self.directory, name)
+            if name.endswith('.log'):
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for offset, length, position in entries:
+                        records[position] = data[offset:offset + length]
+            else:
+                # Сжатый файл распаковывается потоком до последней нужной записи
+                with open_compressed(path) as f:
+                    for offset, length, position in sorted(entries):
+                        f.seek(offset)
+                        records[position] = f.read(length)
+        return (record for record in records if record is not None)
+
+
+def parse_time(value: str) -> str:
+    """Время в формате журнала из ГГГГ-ММ-ДД[ ЧЧ:ММ[:СС]]"""
+    for pattern in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, pattern).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Неверное время: {value}")
+
+
+def day_range(value: str) -> Tuple[str, str]:
+    """Границы дня: today, yesterday или ГГГГ-ММ-ДД"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if value == 'today':
+        day = today
+    elif value == 'yesterday':
+        day = today - timedelta(days=1)
+    else:
+        day = datetime.strptime(parse_time(value), '%Y-%m-%d %H:%M:%S').replace(hour=0, minute=0, second=0)
+    return day.strftime('%Y-%m-%d %H:%M:%S'), (day + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск по журналам бота")
+    parser.add_argument('--dir', default='logs', help='каталог журналов')
+    parser.add_argument('--user', type=int, help='ID пользователя')
+    parser.add_argument('--type', action='append', help='тип действия (start, view, apply, admin, error, ...); можно повторять')
+    parser.add_argument('--level', help='уровень записи (INFO, WARNING, ERROR)')
+    parser.add_argument('--date', help='день: today, yesterday или ГГГГ-ММ-ДД')
+    parser.add_argument('--since', type=parse_time, help='начало интервала: ГГГГ-ММ-ДД[ ЧЧ:ММ[:СС]]')
+    parser.add_argument('--until', type=parse_time, help='конец интервала (не включая)')
+    parser.add_argument('--limit', type=int, help='не больше N записей')
+    parser.add_argument('--rebuild', action='store_true', help='перестроить индекс заново')
+    parser.add_argument('--no-update', action='store_true', help='не дополнять индекс перед поиском')
+    args = parser.parse_args()
+
+    since, until = args.since, args.until
+    if args.date:
+        since, until = day_range(args.date)
+
+    index = LogIndex(args.dir)
+    try:
+        if not args.no_update:
+            added = index.update(rebuild=args.rebuild)
+            if added:
+                print(f"Проиндексировано записей: {added}", file=sys.stderr)
+        matches = index.search(args.user, args.type, args.level, since, until, args.limit)
+        for record in index.read(matches):
+            print(record.decode('utf-8', errors='replace').rstrip('\n'))
+        print(f"Найдено записей: {len(matches)}", file=sys.stderr)
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,23 @@
+import gzip
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import BaseRotatingHandler
 import os
-from datetime import datetime
+import queue
+import re
+import shutil
+import sys
+import threading
+from datetime import datetime, timedelta
+from time import time
+from typing import List, Optional
 from colorama import init, Fore, Style
 
+try:
+    import zstandard
+except ImportError:  # zstd необязателен, по умолчанию используется gzip
+    zstandard = None
+
 # Инициализация colorama для Windows
 init()
 
@@ -67,6 +81,215 @@ class ColoredFormatter(logging.Formatter):
         except:
             return super().format(record)
 
+class JsonFormatter(logging.Formatter):
+    """Форматтер файла журнала в JSON Lines: события log_message записываются полями"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname
+        }
+        event = getattr(record, 'event', None)
+        if event is not None:
+            data.update(event)
+        else:
+            data['message'] = record.getMessage()
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class LogCompressor:
+    """
+    Фоновый поток сжатия ротированных журналов и очистки по сроку хранения
+    и суммарному размеру. Запись в журнал его не ждет.
+
+    Поток запускается методом start после загрузки настроек; до этого файлы
+    только накапливаются в очереди, и импорт логгера ничего не сжимает и не удаляет.
+    """
+
+    def __init__(self, directory: str, prefix: str, compression: str = 'gzip', retention_days: float = 0, max_total_bytes: int = 0):
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self.active_path: Optional[str] = None
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='log-compressor', daemon=True)
+
+    def start(self):
+        """Запускает поток обслуживания с первым проходом: несжатые файлы прошлых запусков и очистка"""
+        if self._thread.is_alive():
+            self.submit(None)
+            return
+        for path in self.files():
+            if path.endswith('.log'):
+                self.submit(path)
+        self.submit(None)
+        self._thread.start()
+
+    def submit(self, path: Optional[str]):
+        """Ставит файл в очередь на сжатие (None - только очистка)"""
+        self._queue.put(path)
+
+    def stop(self, timeout: float = 30):
+        """Дожидается обработки очереди"""
+        if self._thread.is_alive():
+            self._queue.put(False)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is False:
+                break
+            try:
+                if path:
+                    self._compress(path)
+                self._apply_retention()
+            except Exception as e:
+                # Ошибки обслуживания журналов не должны мешать работе бота
+                sys.stderr.write(f"Ошибка обслуживания журналов: {e}\n")
+
+    def _compress(self, path: str):
+        """Сжимает файл и удаляет исходный"""
+        if not os.path.exists(path) or self.compression == 'none':
+            return
+        if self.compression == 'zstd' and zstandard is not None:
+            target = path + '.zst'
+            with open(path, 'rb') as source, open(target + '.tmp', 'wb') as destination:
+                zstandard.ZstdCompressor().copy_stream(source, destination)
+        else:
+            target = path + '.gz'
+            with open(path, 'rb') as source, gzip.open(target + '.tmp', 'wb') as destination:
+                shutil.copyfileobj(source, destination)
+        # Сжатый файл сохраняет время изменения исходного для политики хранения
+        stat = os.stat(path)
+        os.utime(target + '.tmp', (stat.st_atime, stat.st_mtime))
+        os.replace(target + '.tmp', target)
+        os.remove(path)
+
+    def files(self) -> List[str]:
+        """Файлы журнала (кроме текущего), от старых к новым"""
+        pattern = re.compile(rf'^{re.escape(self.prefix)}_\d{{8}}(\.\d+)?\.log(\.gz|\.zst)?$')
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if pattern.match(name)
+        ]
+        paths = [path for path in paths if os.path.abspath(path) != self.active_path]
+        return sorted(paths, key=os.path.getmtime)
+
+    def _apply_retention(self):
+        """Удаляет журналы старше срока хранения и самые старые при превышении суммарного размера"""
+        files = self.files()
+        if self.retention_days:
+            border = time() - self.retention_days * 24 * 60 * 60
+            for path in [path for path in files if os.path.getmtime(path) < border]:
+                os.remove(path)
+                files.remove(path)
+        if self.max_total_bytes:
+            active_size = os.path.getsize(self.active_path) if self.active_path and os.path.exists(self.active_path) else 0
+            total = active_size + sum(os.path.getsize(path) for path in files)
+            while files and total > self.max_total_bytes:
+                path = files.pop(0)
+                total -= os.path.getsize(path)
+                os.remove(path)
+
+
+class DailyRotatingFileHandler(BaseRotatingHandler):
+    """
+    Журнал в файлах logs/<prefix>_ГГГГММДД.log с ротацией по дате и размеру.
+
+    В полночь начинается файл нового дня; при превышении max_bytes текущий
+    файл переименовывается в <prefix>_ГГГГММДД.N.log. Закрытые файлы сжимаются
+    и удаляются по сроку хранения в фоновом потоке LogCompressor.
+    """
+
+    def __init__(self, directory: str = 'logs', prefix: str = 'bot', max_bytes: int = 5242880, compressor: LogCompressor = None, encoding: str = 'utf-8'):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.compressor = compressor or LogCompressor(directory, prefix)
+        self._start_day(time())
+        super().__init__(self._path(self._date), 'a', encoding=encoding, delay=False)
+        self.compressor.active_path = self.baseFilename
+
+    def _path(self, date: str, part: int = 0) -> str:
+        name = f'{self.prefix}_{date}.{part}.log' if part else f'{self.prefix}_{date}.log'
+        return os.path.join(self.directory, name)
+
+    def _start_day(self, now: float):
+        """Запоминает текущий день и время следующей полуночи"""
+        today = datetime.fromtimestamp(now)
+        self._date = today.strftime('%Y%m%d')
+        midnight = datetime.combine(today.date() + timedelta(days=1), datetime.min.time())
+        self._next_midnight = midnight.timestamp()
+        # Номер следующей части файла дня продолжает уже существующие части
+        parts = [0]
+        pattern = re.compile(rf'^{re.escape(self.prefix)}_{self._date}\.(\d+)\.log')
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                parts.append(int(match.group(1)))
+        self._part = max(parts)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if record.created >= self._next_midnight:
+            return True
+        if self.max_bytes and self.stream is not None:
+            message = f"{self.format(record)}\n"
+            return self.stream.tell() + len(message.encode(self.encoding or 'utf-8')) > self.max_bytes
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time()
+        if now >= self._next_midnight:
+            # Файл прошедшего дня уже назван по своей дате
+            rotated = self.baseFilename
+            self._start_day(now)
+        else:
+            self._part += 1
+            rotated = self._path(self._date, self._part)
+            os.replace(self.baseFilename, rotated)
+        self.baseFilename = os.path.abspath(self._path(self._date))
+        self.compressor.active_path = self.baseFilename
+        self.stream = self._open()
+        self.compressor.submit(rotated)
+
+    def close(self):
+        super().close()
+        self.compressor.stop()
+
+
+def configure_log_rotation(max_size_mb: float, retention_days: float, max_total_mb: float, compression: str):
+    """Применяет настройки ротации к файловому журналу бота (после загрузки конфигурации)"""
+    if compression == 'zstd' and zstandard is None:
+        logger.warning("Пакет zstandard не установлен: журналы будут сжиматься gzip")
+    for handler in logger.handlers:
+        if isinstance(handler, DailyRotatingFileHandler):
+            handler.max_bytes = int(max_size_mb * 1024 * 1024)
+            handler.compressor.compression = compression
+            handler.compressor.retention_days = retention_days
+            handler.compressor.max_total_bytes = int(max_total_mb * 1024 * 1024)
+            handler.compressor.start()
+
+
+def configure_log_format(log_format: str):
+    """Выбирает формат файла журнала: text или json (JSON Lines)"""
+    if log_format == 'json':
+        formatter = JsonFormatter(datefmt='%Y-%m-%d %H:%M:%S')
+    else:
+        formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    for handler in logger.handlers:
+        if isinstance(handler, DailyRotatingFileHandler):
+            handler.setFormatter(formatter)
+
+
 def setup_logger():
     """Настройка логгера"""
     # Создаем директорию для логов
@@ -86,13 +309,8 @@ def setup_logger():
     # Форматтер для консоли (с цветами)
     console_formatter = ColoredFormatter('%(message)s')
 
-    # Хендлер для файла
-    file_handler = RotatingFileHandler(
-        f'logs/bot_{datetime.now().strftime("%Y%m%d")}.log',
-        maxBytes=5242880,  # 5MB
-        backupCount=5,
-        encoding='utf-8'
-    )
+    # Хендлер для файла: новый файл каждый день и при превышении 5MB
+    file_handler = DailyRotatingFileHandler('logs', 'bot', max_bytes=5242880)
     file_handler.setFormatter(file_formatter)
     file_handler.setLevel(logging.INFO)
 
@@ -132,4 +350,12 @@ def log_message(user_id: int, username: str, action_type: str, action: str, deta
         'action': action,
         'details': details
     }
-    logger.info(str(message))
+    # Поля события для JSON-формата файла журнала
+    event = {
+        'type': action_type,
+        'user_id': user_id,
+        'username': username,
+        'action': action,
+        'details': details
+    }
+    logger.info(str(message), extra={'event': event})
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from collections import deque
+from time import monotonic
+from typing import Deque, Dict, List, Optional
+
+from telegram.ext import Application
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+# Сколько последних измерений задержки хранить для процентилей
+SAMPLE_SIZE = 1000
+
+
+class LoopMonitor:
+    """
+    Монитор задержки событийного цикла.
+
+    Фоновая задача просыпается каждые interval секунд и измеряет, насколько
+    позже запланированного она получила управление. Отдельный поток следит
+    за отметкой времени этой задачи: если цикл не отвечает дольше threshold,
+    поток записывает в лог стек главного потока и имя текущего обработчика.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.max_lag = 0.0
+        self.stalls: Dict[str, int] = {}
+        self._heartbeat = monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self, application: Application = None):
+        """Запускает измерения (используется в post_init)"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self, application: Application = None):
+        """Останавливает измерения (используется в post_shutdown)"""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self):
+        """Измеряет задержку пробуждения задачи относительно расписания"""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self._heartbeat = monotonic()
+
+    def _watch(self):
+        """Поток-наблюдатель: фиксирует стек, когда цикл не отвечает"""
+        reported = False
+        while not self._stopped.wait(self.threshold / 2):
+            stalled_for = monotonic() - self._heartbeat - self.interval
+            if stalled_for < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            # О каждой остановке цикла сообщаем один раз
+            reported = True
+            route = metrics.current_route or 'unknown'
+            self.stalls[route] = self.stalls.get(route, 0) + 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else ''
+            logger.warning(
+                f"Событийный цикл заблокирован более {stalled_for * 1000:.0f} мс, обработчик: {route}\n{stack}"
+            )
+
+    def percentiles(self) -> Dict[str, float]:
+        """Возвращает p50, p99 и максимум задержки цикла"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {'0.5': 0.0, '0.99': 0.0, 'max': self.max_lag}
+        return {
+            '0.5': samples[int(0.5 * (len(samples) - 1))],
+            '0.99': samples[int(0.99 * (len(samples) - 1))],
+            'max': self.max_lag
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        """Задержка цикла и число блокировок в текстовом формате Prometheus"""
+        lines = [
+            '# HELP bot_event_loop_lag_seconds Event loop scheduling lag',
+            '# TYPE bot_event_loop_lag_seconds gauge'
+        ]
+        for quantile, value in self.percentiles().items():
+            lines.append(f'bot_event_loop_lag_seconds{{quantile="{quantile}"}} {value:.6f}')
+        lines.append('# HELP bot_event_loop_stalls_total Event loop stalls by handler')
+        lines.append('# TYPE bot_event_loop_stalls_total counter')
+        for route, count in sorted(self.stalls.items()):
+            lines.append(f'bot_event_loop_stalls_total{{route="{route}"}} {count}')
+        return lines
+
+
+def enable_asyncio_debug(slow_callback_ms: float):
+    """Включает отладочный режим asyncio с журналом медленных обратных вызовов"""
+    loop = asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = slow_callback_ms / 1000
+    # Сообщения asyncio попадают в те же файлы и консоль, что и журнал бота
+    asyncio_logger = logging.getLogger('asyncio')
+    asyncio_logger.setLevel(logging.WARNING)
+    for handler in logger.handlers:
+        if handler not in asyncio_logger.handlers:
+            asyncio_logger.addHandler(handler)
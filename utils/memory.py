@@ -0,0 +1,199 @@
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from collections.abc import Mapping
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telegram.ext import ContextTypes
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Сколько объектов обходить при оценке размера одного контейнера
+DEEP_SIZE_LIMIT = 200_000
+
+
+def deep_size(obj: Any, limit: int = DEEP_SIZE_LIMIT) -> Tuple[int, bool]:
+    """Оценивает размер контейнера вместе с содержимым; второй элемент - обход прерван по лимиту"""
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        if len(seen) >= limit:
+            return size, True
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, Mapping):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+        elif hasattr(item, '__slots__'):
+            stack.extend(getattr(item, slot) for slot in item.__slots__ if hasattr(item, slot))
+    return size, False
+
+
+def format_bytes(size: float) -> str:
+    """Размер в удобных единицах"""
+    for unit in ('Б', 'КБ', 'МБ'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
+
+
+def process_memory() -> Tuple[Optional[int], Optional[int]]:
+    """Текущий и пиковый RSS процесса в байтах (если доступны)"""
+    current = None
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    current = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+    if current and peak:
+        # ru_maxrss обновляется с задержкой и может отставать от текущего значения
+        peak = max(peak, current)
+    return current, peak
+
+
+class MemoryProfiler:
+    """
+    Диагностика роста памяти.
+
+    Отчет содержит RSS процесса, разницу снимков tracemalloc с прошлого отчета
+    (если трассировка включена), число живых объектов отслеживаемых типов и
+    размеры крупных контейнеров процесса. Отчеты пишутся в отдельный файл
+    с ротацией.
+    """
+
+    def __init__(self, path: str = 'logs/memory.log', tracemalloc_frames: int = 0, top: int = 10):
+        self.top = top
+        self.types: Tuple[type, ...] = ()
+        self.containers: List[Tuple[str, Callable[[], Any]]] = []
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        # Отчеты не строятся параллельно: каждый сравнивается с предыдущим снимком
+        self._lock = asyncio.Lock()
+        if tracemalloc_frames and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+
+        self.log = logging.getLogger('vacancy_bot.memory')
+        self.log.setLevel(logging.INFO)
+        # Отчеты не дублируются в основной журнал и консоль
+        self.log.propagate = False
+        if not self.log.handlers:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=5242880, backupCount=3, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s\n%(message)s\n', datefmt='%Y-%m-%d %H:%M:%S'))
+            self.log.addHandler(handler)
+
+    def count_types(self, *types: type):
+        """Добавляет типы, живые экземпляры которых считаются в отчете"""
+        self.types += types
+
+    def track(self, name: str, getter: Callable[[], Any]):
+        """Регистрирует контейнер, размер которого выводится в отчете"""
+        self.containers.append((name, getter))
+
+    def census(self, objects: List[Any] = None) -> Counter:
+        """Число живых объектов отслеживаемых типов"""
+        counts = Counter({cls.__name__: 0 for cls in self.types})
+        for obj in objects if objects is not None else gc.get_objects():
+            if isinstance(obj, self.types):
+                counts[type(obj).__name__] += 1
+        return counts
+
+    def _tracemalloc_lines(self) -> List[str]:
+        """Разница снимков tracemalloc с прошлого отчета"""
+        if not tracemalloc.is_tracing():
+            return ["tracemalloc выключен (TRACEMALLOC_FRAMES=0)"]
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"tracemalloc: {format_bytes(current)} (пик {format_bytes(peak)})"]
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        if self._snapshot is None:
+            lines.append("Крупнейшие места выделения:")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                lines.append(f"  {format_bytes(stat.size)} ({stat.count}) {stat.traceback}")
+        else:
+            lines.append("Рост с прошлого отчета:")
+            for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self.top]:
+                lines.append(
+                    f"  {'+' if stat.size_diff >= 0 else '-'}{format_bytes(abs(stat.size_diff))} "
+                    f"({stat.count_diff:+d}) {stat.traceback}"
+                )
+        self._snapshot = snapshot
+        return lines
+
+    def _container_lines(self, containers: List[Tuple[str, Any]]) -> List[str]:
+        """Размеры отслеживаемых контейнеров"""
+        lines = ["Контейнеры:"]
+        for name, container in containers:
+            if isinstance(container, Exception):
+                lines.append(f"  {name}: ошибка ({container})")
+                continue
+            try:
+                size, truncated = deep_size(container)
+                lines.append(f"  {name}: {len(container)} эл., {'≥' if truncated else ''}{format_bytes(size)}")
+            except Exception as e:
+                lines.append(f"  {name}: ошибка ({e})")
+        return lines
+
+    async def report(self) -> str:
+        """
+        Формирует отчет о памяти и запоминает снимок для следующего сравнения.
+
+        На событийном цикле выполняется только подсчет объектов; снимок
+        tracemalloc с разницей и обход контейнеров идут в отдельном потоке,
+        чтобы диагностика не задерживала обработку обновлений.
+        """
+        async with self._lock:
+            current, peak = process_memory()
+            objects = gc.get_objects()
+            lines = [
+                f"RSS: {format_bytes(current) if current else '?'} (пик {format_bytes(peak) if peak else '?'}), "
+                f"объектов под GC: {len(objects)}"
+            ]
+            if self.types:
+                lines.append("Объекты:")
+                for name, number in self.census(objects).most_common():
+                    lines.append(f"  {name}: {number}")
+            del objects
+
+            lines.extend(await asyncio.to_thread(self._tracemalloc_lines))
+
+            containers = []
+            for name, getter in self.containers:
+                try:
+                    containers.append((name, getter()))
+                except Exception as e:
+                    containers.append((name, e))
+            lines.extend(await asyncio.to_thread(self._container_lines, containers))
+            return '\n'.join(lines)
+
+    async def write_report(self) -> str:
+        """Формирует отчет и записывает его в файл диагностики"""
+        text = await self.report()
+        self.log.info(text)
+        return text
+
+    async def report_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Периодический отчет для JobQueue"""
+        await self.write_report()
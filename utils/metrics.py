@@ -0,0 +1,323 @@
+import asyncio
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import partial, wraps
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from telegram.ext import Application, BaseHandler, ConversationHandler
+from telegram.request import HTTPXRequest
+
+from callbacks import CallbackRouter
+from utils.logger import logger
+
+# Границы корзин гистограммы задержки, сек
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Границы корзин гистограммы числа вызовов Bot API за обновление
+CALLS_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами в формате Prometheus"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Добавляет наблюдение"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class ApiCall:
+    """Один запрос к Bot API"""
+
+    __slots__ = ('method', 'seconds', 'status', 'retry')
+
+    def __init__(self, method: str, seconds: float, status: str, retry: bool):
+        self.method = method
+        self.seconds = seconds
+        self.status = status
+        self.retry = retry
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.seconds * 1000:.0f}мс {self.status}" + (" (повтор)" if self.retry else "")
+
+
+class CallStats:
+    """Обращения к внешним системам за время обработки обновления одним обработчиком"""
+
+    __slots__ = ('update_id', 'calls', 'failed_methods')
+
+    def __init__(self, update_id: Optional[int] = None):
+        self.update_id = update_id
+        self.calls: List[ApiCall] = []
+        self.failed_methods: Set[str] = set()
+
+    @property
+    def api_calls(self) -> int:
+        return len(self.calls)
+
+    def record(self, method: str, seconds: float, status: str) -> ApiCall:
+        """Учитывает запрос; повтором считается вызов метода после его неудачи"""
+        call = ApiCall(method, seconds, status, method in self.failed_methods)
+        if status != '200':
+            self.failed_methods.add(method)
+        self.calls.append(call)
+        return call
+
+
+# Счетчики текущего обработчика; задаются оберткой timed()
+current_call_stats: ContextVar[Optional[CallStats]] = ContextVar('current_call_stats', default=None)
+
+
+class MetricsRegistry:
+    """Метрики обработчиков и показатели компонентов бота"""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.db_queries: Dict[str, int] = {}
+        self.api_calls: Dict[str, int] = {}
+        self.api_requests: Dict[str, int] = {}
+        self.api_latency: Dict[str, Histogram] = {}
+        self.api_statuses: Dict[Tuple[str, str], int] = {}
+        self.api_retries: Dict[str, int] = {}
+        self.calls_per_update: Dict[str, Histogram] = {}
+        # Вызовов Bot API на одно обновление, после которых трасса пишется в лог (0 - отключено)
+        self.api_call_budget = 0
+        self.gauges: List[Tuple[str, str, Callable[[], float]]] = []
+        self.collectors: List[Callable[[], List[str]]] = []
+        # Обработчик, выполняемый в данный момент (читается монитором событийного цикла)
+        self.current_route: Optional[str] = None
+
+    def gauge(self, name: str, help_text: str, getter: Callable[[], float]):
+        """Регистрирует показатель, значение которого читается при каждом запросе метрик"""
+        self.gauges.append((name, help_text, getter))
+
+    def collector(self, collect: Callable[[], List[str]]):
+        """Регистрирует источник готовых строк метрик (например, статистики запросов к БД)"""
+        self.collectors.append(collect)
+
+    def observe(self, route: str, seconds: float, db_queries: int, stats: CallStats, failed: bool):
+        """Записывает результат обработки обновления"""
+        _histogram(self.latency, route).observe(seconds)
+        _histogram(self.calls_per_update, route, CALLS_BUCKETS).observe(stats.api_calls)
+        self.db_queries[route] = self.db_queries.get(route, 0) + db_queries
+        self.api_calls[route] = self.api_calls.get(route, 0) + stats.api_calls
+        if failed:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        if self.api_call_budget and stats.api_calls > self.api_call_budget:
+            logger.warning(
+                f"Обновление {stats.update_id}, обработчик {route}: {stats.api_calls} вызовов Bot API "
+                f"(бюджет {self.api_call_budget}): " + ", ".join(str(call) for call in stats.calls)
+            )
+
+    def observe_api_request(self, method: str, seconds: float, status: str, retry: bool):
+        """Учитывает запрос к Bot API"""
+        self.api_requests[method] = self.api_requests.get(method, 0) + 1
+        _histogram(self.api_latency, method).observe(seconds)
+        key = (method, status)
+        self.api_statuses[key] = self.api_statuses.get(key, 0) + 1
+        if retry:
+            self.api_retries[method] = self.api_retries.get(method, 0) + 1
+
+    def render(self) -> str:
+        """Формирует метрики в текстовом формате Prometheus"""
+        lines = []
+        for name, help_text, histograms, label in (
+            ('bot_handler_duration_seconds', 'Handler latency', self.latency, 'route'),
+            ('bot_handler_api_calls_per_update', 'Bot API calls per handled update', self.calls_per_update, 'route'),
+            ('bot_api_request_duration_seconds', 'Bot API request latency by method', self.api_latency, 'method')
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, histogram in sorted(histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+
+        for name, help_text, values, label in (
+            ('bot_handler_errors_total', 'Handler errors', self.errors, 'route'),
+            ('bot_handler_db_queries_total', 'Database calls made by handlers', self.db_queries, 'route'),
+            ('bot_handler_api_calls_total', 'Bot API calls made by handlers', self.api_calls, 'route'),
+            ('bot_api_requests_total', 'Bot API requests by method', self.api_requests, 'method'),
+            ('bot_api_retries_total', 'Bot API requests repeated after a failure', self.api_retries, 'method')
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for key, value in sorted(values.items()):
+                lines.append(f'{name}{{{label}="{key}"}} {value}')
+
+        lines.append('# HELP bot_api_responses_total Bot API responses by method and status')
+        lines.append('# TYPE bot_api_responses_total counter')
+        for (method, status), value in sorted(self.api_statuses.items()):
+            lines.append(f'bot_api_responses_total{{method="{method}",status="{status}"}} {value}')
+
+        for name, help_text, getter in self.gauges:
+            try:
+                value = getter()
+            except Exception:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+
+        for collect in self.collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram(histograms: Dict[str, Histogram], key: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    """Возвращает гистограмму по ключу, создавая ее при первом обращении"""
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram(buckets)
+    return histogram
+
+
+# Общий реестр метрик процесса
+metrics = MetricsRegistry()
+
+
+def route_name(callback: Callable) -> str:
+    """Имя маршрута для метрик по функции-обработчику"""
+    if isinstance(callback, partial):
+        callback = callback.keywords.get('handler', callback.func)
+    return getattr(callback, '__name__', repr(callback))
+
+
+def timed(route: str, callback: Callable) -> Callable:
+    """Оборачивает обработчик измерением времени, ошибок и числа обращений к БД и Bot API"""
+    @wraps(callback)
+    async def wrapped(update, context, *args, **kwargs):
+        stats = CallStats(getattr(update, 'update_id', None))
+        token = current_call_stats.set(stats)
+        previous_route, metrics.current_route = metrics.current_route, route
+        queries_before = context.request.queries if hasattr(context, 'request') else 0
+        started = perf_counter()
+        failed = False
+        try:
+            return await callback(update, context, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            queries = context.request.queries - queries_before if hasattr(context, 'request') else 0
+            metrics.observe(route, perf_counter() - started, queries, stats, failed)
+            current_call_stats.reset(token)
+            metrics.current_route = previous_route
+    wrapped.timed = True
+    return wrapped
+
+
+def _instrument_handler(handler: BaseHandler):
+    """Оборачивает обработчик и вложенные обработчики диалога"""
+    if isinstance(handler, ConversationHandler):
+        nested = list(handler.entry_points) + list(handler.fallbacks)
+        for state_handlers in handler.states.values():
+            nested.extend(state_handlers)
+        for nested_handler in nested:
+            _instrument_handler(nested_handler)
+        return
+
+    callback = handler.callback
+    # Маршрутизатор кнопок измеряется по отдельным маршрутам
+    router = getattr(callback, '__self__', None)
+    if isinstance(router, CallbackRouter):
+        for action, route_callback in router.routes.items():
+            if not getattr(route_callback, 'timed', False):
+                router.routes[action] = timed(route_name(route_callback), route_callback)
+        return
+    # Один обработчик может быть зарегистрирован в нескольких диалогах
+    if not getattr(callback, 'timed', False):
+        handler.callback = timed(route_name(callback), callback)
+
+
+def instrument_application(application: Application):
+    """Добавляет замер времени ко всем зарегистрированным обработчикам"""
+    for group_handlers in application.handlers.values():
+        for handler in group_handlers:
+            _instrument_handler(handler)
+
+
+class CountingRequest(HTTPXRequest):
+    """
+    Слой запросов к Bot API, трассирующий вызовы.
+
+    Каждый вызов (метод, время, статус, повтор) учитывается в метриках
+    и приписывается обновлению и обработчику, в контексте которого он сделан.
+    """
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        status = 'error'
+        started = perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+            status = str(code)
+            return code, payload
+        finally:
+            seconds = perf_counter() - started
+            stats = current_call_stats.get()
+            if stats is not None:
+                retry = stats.record(api_method, seconds, status).retry
+            else:
+                retry = False
+            metrics.observe_api_request(api_method, seconds, status, retry)
+
+
+class MetricsServer:
+    """Локальный HTTP-сервер, отдающий метрики по адресу /metrics"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9100):
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, application: Application = None):
+        """Запускает сервер (используется в post_init)"""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Метрики доступны по адресу http://{self.host}:{self.port}/metrics")
+
+    async def stop(self, application: Application = None):
+        """Останавливает сервер (используется в post_shutdown)"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Отвечает на один HTTP-запрос"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Заголовки запроса не нужны, но их нужно дочитать
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', metrics.render().encode()
+            else:
+                status, body = '404 Not Found', b'not found\n'
+            writer.write(
+                f'HTTP/1.1 {status}\r\n'
+                f'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'Connection: close\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
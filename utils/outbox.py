@@ -0,0 +1,158 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+
+from telegram import InlineKeyboardMarkup
+from telegram.error import Forbidden, RetryAfter, TelegramError
+from telegram.ext import Application
+
+from utils.logger import logger
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение в очереди на отправку"""
+    chat_id: int
+    text: str
+    parse_mode: Optional[str] = 'Markdown'
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+    # Результат отправки для тех, кто ждет доставки (например, рассылок)
+    result: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений с ограничением скорости отправки.
+
+    Все массовые уведомления (решения по откликам, рассылки) проходят
+    через одну очередь, поэтому бот не превышает глобальный лимит Telegram.
+    Отправки начинаются не чаще messages_per_second в секунду и выполняются
+    параллельно (не больше max_in_flight одновременно), поэтому скорость
+    не зависит от времени ответа Telegram. При остановке очередь дописывается.
+    """
+
+    def __init__(self, messages_per_second: float = 25, max_in_flight: int = 32, drain_timeout: float = 60):
+        self.interval = 1 / messages_per_second
+        self.drain_timeout = drain_timeout
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.on_blocked: Optional[Callable[[int], Awaitable[None]]] = None
+        self.sent = 0
+        self.failed = 0
+        self.blocked = 0
+        self._application: Optional[Application] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._sending: Set[asyncio.Task] = set()
+        # Время, до которого Telegram попросил не отправлять сообщения (RetryAfter)
+        self._paused_until = 0.0
+
+    async def start(self, application: Application):
+        """Запускает отправку (используется в post_init приложения)"""
+        self._application = application
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, application: Application = None):
+        """Дописывает очередь и останавливает отправку (используется в post_stop, пока бот еще доступен)"""
+        if self._task and not self.queue.empty():
+            logger.info(f"Отправка оставшихся сообщений из очереди: {self.queue.qsize()}")
+            try:
+                await asyncio.wait_for(self.queue.join(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        if not self.queue.empty():
+            logger.warning(f"Не отправлено сообщений из очереди: {self.queue.qsize()}")
+
+    def enqueue(self, chat_id: int, text: str, parse_mode: Optional[str] = 'Markdown', reply_markup: InlineKeyboardMarkup = None):
+        """Добавляет сообщение в очередь"""
+        self.queue.put_nowait(OutgoingMessage(chat_id, text, parse_mode, reply_markup))
+
+    def enqueue_many(self, items: Iterable[OutgoingMessage]):
+        """Добавляет в очередь пачку сообщений"""
+        for item in items:
+            self.queue.put_nowait(item)
+
+    async def deliver_many(self, items: List[OutgoingMessage]) -> List[bool]:
+        """Добавляет пачку сообщений в очередь и ждет их отправки"""
+        loop = asyncio.get_running_loop()
+        for item in items:
+            item.result = loop.create_future()
+            self.queue.put_nowait(item)
+        return list(await asyncio.gather(*(item.result for item in items)))
+
+    @property
+    def pending(self) -> int:
+        """Количество сообщений, ожидающих отправки"""
+        return self.queue.qsize()
+
+    async def send(self, item: OutgoingMessage) -> bool:
+        """Отправляет одно сообщение, повторяя попытку при превышении лимита"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self._application.bot.send_message(
+                    chat_id=item.chat_id,
+                    text=item.text,
+                    parse_mode=item.parse_mode,
+                    reply_markup=item.reply_markup,
+                    disable_web_page_preview=True
+                )
+                self.sent += 1
+                return True
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                # Пауза действует на всю очередь, а не только на это сообщение
+                self._paused_until = max(self._paused_until, loop.time() + retry_after)
+                await asyncio.sleep(retry_after)
+            except Forbidden:
+                # Пользователь заблокировал бота
+                self.blocked += 1
+                if self.on_blocked:
+                    await self.on_blocked(item.chat_id)
+                return False
+            except TelegramError as e:
+                self.failed += 1
+                logger.error(f"Ошибка при отправке сообщения {item.chat_id}: {str(e)}")
+                return False
+
+    async def _deliver(self, item: OutgoingMessage):
+        """Отправляет сообщение и сообщает результат ожидающим"""
+        delivered = False
+        try:
+            delivered = await self.send(item)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Ошибка при отправке сообщения {item.chat_id}: {str(e)}")
+        finally:
+            if item.result is not None and not item.result.done():
+                item.result.set_result(delivered)
+            self._in_flight.release()
+            self.queue.task_done()
+
+    async def _run(self):
+        """Начинает отправки с интервалом не меньше interval (по времени начала)"""
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        while True:
+            item = await self.queue.get()
+            if item.result is not None and item.result.done():
+                # Ожидавший отправки отменен (например, остановлена рассылка)
+                self.queue.task_done()
+                continue
+            next_start = max(next_start, loop.time(), self._paused_until)
+            delay = next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_start += self.interval
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._deliver(item))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
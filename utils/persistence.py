@@ -0,0 +1,221 @@
+import asyncio
+import json
+import pickle
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from utils.logger import logger
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Хранилище состояний диалогов и user_data/chat_data в SQLite.
+
+    В отличие от PicklePersistence, файл не перезаписывается целиком:
+    изменения копятся в памяти по ключам и записываются одной транзакцией
+    (executemany с upsert) после каждого цикла сохранения Application.
+    """
+
+    def __init__(self, db_path: str = "bot_database.db", update_interval: float = 60):
+        super().__init__(
+            # bot_data хранит конфигурацию и кеши процесса - их не сохраняем
+            store_data=PersistenceInput(bot_data=False, callback_data=False),
+            update_interval=update_interval
+        )
+        self.db_path = db_path
+        # Отложенные изменения: ключ -> сериализованное значение (None - удалить)
+        self._pending_user_data: Dict[int, Optional[bytes]] = {}
+        self._pending_chat_data: Dict[int, Optional[bytes]] = {}
+        self._pending_conversations: Dict[Tuple[str, str], Optional[str]] = {}
+        # Последние записанные значения, чтобы не писать неизменившиеся ключи
+        self._written_user_data: Dict[int, bytes] = {}
+        self._written_chat_data: Dict[int, bytes] = {}
+        self._write_scheduled = False
+        self._create_tables()
+
+    @contextmanager
+    def get_connection(self):
+        """Безопасное получение соединения с базой данных"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _create_tables(self):
+        """Создание таблиц для хранения состояний"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS persistence_user_data (
+                    user_id INTEGER PRIMARY KEY,
+                    data BLOB NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS persistence_chat_data (
+                    chat_id INTEGER PRIMARY KEY,
+                    data BLOB NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS persistence_conversations (
+                    name TEXT NOT NULL,
+                    conversation_key TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (name, conversation_key)
+                )
+            """)
+            conn.commit()
+
+    def _load_data(self, table: str, column: str, written: Dict[int, bytes]) -> Dict[int, Dict[Any, Any]]:
+        """Загружает все записи user_data или chat_data"""
+        result = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {column}, data FROM {table}")
+            for key, data in cursor.fetchall():
+                try:
+                    result[key] = pickle.loads(data)
+                    written[key] = data
+                except Exception as e:
+                    logger.error(f"Не удалось загрузить {table} для {key}: {str(e)}")
+        return result
+
+    def _schedule_write(self):
+        """Планирует запись накопленных изменений одной транзакцией"""
+        if self._write_scheduled:
+            return
+        self._write_scheduled = True
+        try:
+            # Application вызывает update_* пачкой через asyncio.gather,
+            # поэтому запись выполняется после того, как все они отработают
+            asyncio.get_running_loop().call_soon(self._write_pending)
+        except RuntimeError:
+            self._write_pending()
+
+    def _queue_data(self, pending: Dict[int, Optional[bytes]], written: Dict[int, bytes], key: int, data: Dict[Any, Any]):
+        """Добавляет значение в очередь записи, если оно изменилось"""
+        serialized = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        if written.get(key) == serialized:
+            pending.pop(key, None)
+            return
+        pending[key] = serialized
+        self._schedule_write()
+
+    def _write_pending(self):
+        """Записывает накопленные изменения в базу данных"""
+        self._write_scheduled = False
+        if not (self._pending_user_data or self._pending_chat_data or self._pending_conversations):
+            return
+
+        user_data, self._pending_user_data = self._pending_user_data, {}
+        chat_data, self._pending_chat_data = self._pending_chat_data, {}
+        conversations, self._pending_conversations = self._pending_conversations, {}
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                for table, column, pending in (
+                    ("persistence_user_data", "user_id", user_data),
+                    ("persistence_chat_data", "chat_id", chat_data)
+                ):
+                    cursor.executemany(
+                        f"INSERT INTO {table} ({column}, data) VALUES (?, ?) "
+                        f"ON CONFLICT({column}) DO UPDATE SET data = excluded.data",
+                        [(key, data) for key, data in pending.items() if data is not None]
+                    )
+                    cursor.executemany(
+                        f"DELETE FROM {table} WHERE {column} = ?",
+                        [(key,) for key, data in pending.items() if data is None]
+                    )
+                cursor.executemany(
+                    "INSERT INTO persistence_conversations (name, conversation_key, state) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name, conversation_key) DO UPDATE SET state = excluded.state",
+                    [(name, key, state) for (name, key), state in conversations.items() if state is not None]
+                )
+                cursor.executemany(
+                    "DELETE FROM persistence_conversations WHERE name = ? AND conversation_key = ?",
+                    [(name, key) for (name, key), state in conversations.items() if state is None]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при сохранении состояний: {str(e)}")
+            # Возвращаем изменения в очередь, более новые значения имеют приоритет
+            self._pending_user_data = {**user_data, **self._pending_user_data}
+            self._pending_chat_data = {**chat_data, **self._pending_chat_data}
+            self._pending_conversations = {**conversations, **self._pending_conversations}
+            return
+
+        for pending, written in ((user_data, self._written_user_data), (chat_data, self._written_chat_data)):
+            for key, data in pending.items():
+                if data is None:
+                    written.pop(key, None)
+                else:
+                    written[key] = data
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        return self._load_data("persistence_user_data", "user_id", self._written_user_data)
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return self._load_data("persistence_chat_data", "chat_id", self._written_chat_data)
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def get_callback_data(self) -> Optional[Any]:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[Tuple, object]:
+        """Загружает состояния диалогов для ConversationHandler с указанным именем"""
+        result = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT conversation_key, state FROM persistence_conversations WHERE name = ?",
+                (name,)
+            )
+            for key, state in cursor.fetchall():
+                result[tuple(json.loads(key))] = json.loads(state)
+        return result
+
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]) -> None:
+        serialized_state = json.dumps(new_state) if new_state is not None else None
+        self._pending_conversations[(name, json.dumps(list(key)))] = serialized_state
+        self._schedule_write()
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        self._queue_data(self._pending_user_data, self._written_user_data, user_id, data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        self._queue_data(self._pending_chat_data, self._written_chat_data, chat_id, data)
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending_user_data[user_id] = None
+        self._schedule_write()
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._pending_chat_data[chat_id] = None
+        self._schedule_write()
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Записывает все накопленные изменения при остановке бота"""
+        self._write_pending()
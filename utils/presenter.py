@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from telegram import InlineKeyboardMarkup, InputMediaPhoto, Message
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+# Максимальная длина подписи к фото в Telegram
+CAPTION_LIMIT = 1024
+
+
+class RenderCache:
+    """LRU-кеш отпечатков последнего отображенного содержимого сообщений"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.fingerprints: OrderedDict[Tuple[int, int], int] = OrderedDict()
+        self.saved_calls = 0
+
+    @staticmethod
+    def fingerprint(
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup],
+        photo: Optional[str],
+        parse_mode: Optional[str]
+    ) -> int:
+        """Вычисляет отпечаток текста, клавиатуры и медиа сообщения"""
+        markup = reply_markup.to_json() if reply_markup else None
+        return hash((text, markup, photo, parse_mode))
+
+    def is_unchanged(self, message: Message, fingerprint: int) -> bool:
+        """Проверяет, совпадает ли содержимое с уже отображенным"""
+        key = (message.chat_id, message.message_id)
+        if self.fingerprints.get(key) != fingerprint:
+            return False
+        self.fingerprints.move_to_end(key)
+        self.saved_calls += 1
+        return True
+
+    def remember(self, message: Message, fingerprint: int):
+        """Запоминает отпечаток отображенного сообщения"""
+        key = (message.chat_id, message.message_id)
+        self.fingerprints[key] = fingerprint
+        self.fingerprints.move_to_end(key)
+        while len(self.fingerprints) > self.max_size:
+            self.fingerprints.popitem(last=False)
+
+    def forget(self, message: Message):
+        """Удаляет отпечаток удаленного сообщения"""
+        self.fingerprints.pop((message.chat_id, message.message_id), None)
+
+
+# Общий кеш отпечатков для всех обработчиков
+render_cache = RenderCache()
+
+
+def is_media_message(message: Message) -> bool:
+    """Проверяет, является ли сообщение медиа-сообщением (фото, видео, документ)"""
+    return bool(message.photo or message.video or message.document or message.animation)
+
+
+async def present(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    photo: Optional[str] = None,
+    keep_media: bool = False,
+    parse_mode: Optional[str] = 'Markdown'
+) -> Message:
+    """
+    Показывает экран на месте текущего сообщения бота.
+
+    Выбирает единственный подходящий вызов Bot API:
+    - текст -> текст: edit_message_text
+    - фото -> фото: edit_message_media
+    - фото -> текст при keep_media: edit_message_caption (фото остается)
+    Если сменить тип сообщения редактированием нельзя (текст -> фото,
+    фото -> текст), отправляется новое сообщение, а старое удаляется
+    только после успешной отправки.
+
+    Повторное отображение того же содержимого пропускается без обращения
+    к Telegram (см. RenderCache).
+    """
+    if photo and len(text) > CAPTION_LIMIT:
+        # Текст не помещается в подпись - показываем его без фото
+        photo = None
+        keep_media = False
+
+    fingerprint = RenderCache.fingerprint(text, reply_markup, photo, parse_mode)
+    if render_cache.is_unchanged(message, fingerprint):
+        return message
+
+    try:
+        result = await _render(message, context, text, reply_markup, photo, keep_media, parse_mode)
+    except BadRequest as e:
+        # Содержимое совпало с уже отображенным (например, после перезапуска бота)
+        if 'message is not modified' not in str(e).lower():
+            raise
+        result = message
+
+    if isinstance(result, Message):
+        if result is not message:
+            render_cache.forget(message)
+        render_cache.remember(result, fingerprint)
+    return result
+
+
+async def _render(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup],
+    photo: Optional[str],
+    keep_media: bool,
+    parse_mode: Optional[str]
+) -> Message:
+    """Выполняет единственный вызов Bot API для отображения экрана"""
+    current_is_media = is_media_message(message)
+
+    if photo:
+        if current_is_media:
+            return await message.edit_media(
+                media=InputMediaPhoto(media=photo, caption=text, parse_mode=parse_mode),
+                reply_markup=reply_markup
+            )
+        sent = await context.bot.send_photo(
+            chat_id=message.chat_id,
+            photo=photo,
+            caption=text,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode
+        )
+        await message.delete()
+        return sent
+
+    if not current_is_media:
+        return await message.edit_text(
+            text,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode,
+            disable_web_page_preview=True
+        )
+
+    if keep_media and len(text) <= CAPTION_LIMIT:
+        return await message.edit_caption(
+            caption=text,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode
+        )
+
+    sent = await context.bot.send_message(
+        chat_id=message.chat_id,
+        text=text,
+        reply_markup=reply_markup,
+        parse_mode=parse_mode,
+        disable_web_page_preview=True
+    )
+    await message.delete()
+    return sent
@@ -0,0 +1,146 @@
+import re
+import sqlite3
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+# Сколько последних измерений хранить для расчета процентилей
+SAMPLE_SIZE = 1000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Список параметров IN (?, ?, ...) переменной длины
+_IN_LIST_RE = re.compile(r'\bIN \(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Приводит текст запроса к одной строке для группировки; списки IN (?, ?, ...) любой длины сворачиваются в IN (?…)"""
+    return _IN_LIST_RE.sub('IN (?…)', _WHITESPACE_RE.sub(' ', sql).strip())
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Возвращает процентиль отсортированной выборки"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class QueryStats:
+    """Статистика одного запроса одного метода Database"""
+
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentiles(self) -> Tuple[float, float]:
+        """Возвращает p50 и p99 по последним измерениям"""
+        samples = sorted(self.samples)
+        return _percentile(samples, 0.5), _percentile(samples, 0.99)
+
+
+class QueryProfiler:
+    """Замер времени запросов Database и журнал медленных запросов с планом выполнения"""
+
+    def __init__(self, slow_query_ms: float = 50):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.stats: Dict[Tuple[str, str], QueryStats] = {}
+        # План выполнения логируется для каждого медленного запроса один раз
+        self.explained: Dict[str, str] = {}
+
+    def record(self, connection: sqlite3.Connection, method: str, sql: str, params, seconds: float):
+        """Учитывает выполненный запрос"""
+        statement = normalize_sql(sql)
+        key = (method, statement)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = QueryStats()
+        stats.add(seconds)
+
+        if seconds >= self.slow_query_seconds:
+            plan = self._explain(connection, statement, sql, params)
+            logger.warning(
+                f"Медленный запрос {method}: {seconds * 1000:.1f} мс | {statement}"
+                + (f" | План: {plan}" if plan else "")
+            )
+
+    def _explain(self, connection: sqlite3.Connection, statement: str, sql: str, params) -> Optional[str]:
+        """Возвращает EXPLAIN QUERY PLAN исходного запроса; план кэшируется по нормализованному тексту"""
+        if statement in self.explained:
+            return self.explained[statement]
+        plan = None
+        if params is not None and statement.split(' ', 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+            try:
+                # Обычный курсор, чтобы сам EXPLAIN не попал в статистику
+                rows = sqlite3.Cursor(connection).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                plan = '; '.join(row[-1] for row in rows)
+            except sqlite3.Error:
+                plan = None
+        self.explained[statement] = plan
+        return plan
+
+    def top(self, limit: int = 10) -> List[Tuple[str, str, QueryStats]]:
+        """Запросы с наибольшим суммарным временем"""
+        ranked = sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)
+        return [(method, statement, stats) for (method, statement), stats in ranked[:limit]]
+
+    def prometheus_lines(self) -> List[str]:
+        """Статистика запросов в текстовом формате Prometheus"""
+        lines = [
+            '# HELP bot_db_query_duration_seconds Database query latency by Database method',
+            '# TYPE bot_db_query_duration_seconds summary'
+        ]
+        totals: Dict[str, QueryStats] = {}
+        for (method, _), stats in self.stats.items():
+            merged = totals.setdefault(method, QueryStats())
+            merged.count += stats.count
+            merged.total += stats.total
+            merged.samples.extend(stats.samples)
+        for method, stats in sorted(totals.items()):
+            p50, p99 = stats.percentiles()
+            lines.append(f'bot_db_query_duration_seconds{{method="{method}",quantile="0.5"}} {p50:.6f}')
+            lines.append(f'bot_db_query_duration_seconds{{method="{method}",quantile="0.99"}} {p99:.6f}')
+            lines.append(f'bot_db_query_duration_seconds_sum{{method="{method}"}} {stats.total:.6f}')
+            lines.append(f'bot_db_query_duration_seconds_count{{method="{method}"}} {stats.count}')
+        return lines
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Курсор, измеряющий время выполнения запросов"""
+
+    def execute(self, sql, parameters=()):
+        started = perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            connection = self.connection
+            connection.profiler.record(connection, connection.method, sql, parameters, perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            connection = self.connection
+            connection.profiler.record(connection, connection.method, sql, None, perf_counter() - started)
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Соединение, выдающее курсоры с замером времени"""
+
+    profiler: QueryProfiler
+    method: str
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional
+
+from telegram.ext import Application, CallbackContext, ExtBot
+
+from database import Database, Vacancy
+
+
+class _CountingDatabase:
+    """Обертка над Database, считающая обращения к базе данных"""
+
+    def __init__(self, db: Database):
+        self._db = db
+        self.queries = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.queries += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class RequestContext:
+    """
+    Данные, относящиеся к одному обновлению.
+
+    Каждый факт (права администратора, вакансия, возможность отклика)
+    загружается из базы не более одного раза за обработку обновления.
+    """
+
+    def __init__(self, user_id: Optional[int]):
+        self.user_id = user_id
+        self._db: Optional[_CountingDatabase] = None
+        self._is_admin: Optional[bool] = None
+        self._vacancies: Dict[int, Optional[Vacancy]] = {}
+        self._can_apply: Dict[int, bool] = {}
+        self._active_vacancies: Optional[List[Vacancy]] = None
+        self._profile_loaded = False
+        self._profile: Optional[str] = None
+
+    @property
+    def db(self) -> Database:
+        """Экземпляр Database, общий для всех обработчиков обновления"""
+        if self._db is None:
+            self._db = _CountingDatabase(Database())
+        return self._db
+
+    @property
+    def queries(self) -> int:
+        """Количество обращений к базе данных за время обработки обновления"""
+        return self._db.queries if self._db else 0
+
+    @property
+    def is_admin(self) -> bool:
+        """Является ли пользователь администратором"""
+        if self._is_admin is None:
+            self._is_admin = self.user_id is not None and self.db.is_admin(self.user_id)
+        return self._is_admin
+
+    @property
+    def active_vacancies(self) -> List[Vacancy]:
+        """Список активных вакансий"""
+        if self._active_vacancies is None:
+            self._active_vacancies = self.db.get_active_vacancies()
+        return self._active_vacancies
+
+    @property
+    def profile(self) -> Optional[str]:
+        """Анкета кандидата, если она заполнена"""
+        if not self._profile_loaded:
+            self._profile = self.db.get_profile(self.user_id) if self.user_id is not None else None
+            self._profile_loaded = True
+        return self._profile
+
+    def get_vacancy(self, vacancy_id: int) -> Optional[Vacancy]:
+        """Возвращает вакансию по ID"""
+        if vacancy_id not in self._vacancies:
+            self._vacancies[vacancy_id] = self.db.get_vacancy(vacancy_id)
+        return self._vacancies[vacancy_id]
+
+    def can_apply(self, vacancy_id: int) -> bool:
+        """Может ли пользователь откликнуться на вакансию"""
+        if vacancy_id not in self._can_apply:
+            self._can_apply[vacancy_id] = self.db.can_apply_to_vacancy(self.user_id, vacancy_id)
+        return self._can_apply[vacancy_id]
+
+    def forget_vacancy(self, vacancy_id: int):
+        """Сбрасывает сохраненные данные вакансии после ее изменения"""
+        self._vacancies.pop(vacancy_id, None)
+        self._can_apply.pop(vacancy_id, None)
+        self._active_vacancies = None
+
+
+class BotContext(CallbackContext[ExtBot, dict, dict, dict]):
+    """Контекст обработчиков с данными текущего обновления (context.request)"""
+
+    def __init__(self, application: Application, chat_id: int = None, user_id: int = None):
+        super().__init__(application=application, chat_id=chat_id, user_id=user_id)
+        self._request_user_id = user_id
+        self._request: Optional[RequestContext] = None
+
+    @property
+    def request(self) -> RequestContext:
+        """Данные текущего обновления, загружаемые по требованию"""
+        if self._request is None:
+            self._request = RequestContext(self._request_user_id)
+        return self._request
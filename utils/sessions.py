@@ -0,0 +1,161 @@
+import pickle
+from time import time
+from typing import Dict, List, Tuple
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes, ConversationHandler
+
+from utils.logger import logger
+
+# Ключи user_data, которые нужны только во время незавершенного диалога
+TRANSIENT_KEYS = (
+    'applying_to_vacancy',
+    'application_attachments',
+    'new_vacancy_title',
+    'new_vacancy_description',
+    'editing_vacancy',
+    'moderation_selection',
+    # Текст отклика, предложенный для сохранения анкетой, истекает вместе с сессией
+    'profile_offer'
+)
+
+
+def _estimate_size(data: dict) -> int:
+    """Оценивает размер данных пользователя в байтах"""
+    try:
+        return len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class SessionCollector:
+    """Сборщик устаревших пользовательских состояний в context.user_data"""
+
+    def __init__(self, idle_ttl_seconds: int = 3600, max_sessions: int = 10000):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.last_activity: Dict[int, float] = {}
+        # Сохраняемые диалоги, которые завершаются вместе с очисткой данных пользователя
+        self.conversations: List[ConversationHandler] = []
+        self.live_sessions = 0
+        self.expired_sessions = 0
+        self.bytes_reclaimed = 0
+
+    def track_conversations(self, *handlers: ConversationHandler):
+        """Регистрирует диалоги, состояние которых сбрасывается при очистке сессии"""
+        self.conversations.extend(handlers)
+
+    def _end_conversations(self, user_id: int) -> bool:
+        """
+        Завершает диалоги пользователя.
+
+        После перезапуска PTB не восстанавливает conversation_timeout, поэтому
+        без этого сохраненное состояние пережило бы очистку данных диалога, и
+        следующее сообщение пользователя попало бы в обработчик шага диалога.
+        Удаление ключа из словаря диалогов записывается в хранилище как None.
+        Возвращает True, если был завершен хотя бы один диалог.
+        """
+        ended = False
+        for handler in self.conversations:
+            # Публичного способа завершить чужой диалог у ConversationHandler нет
+            conversations = handler._conversations
+            for key in [key for key in conversations if key and key[-1] == user_id]:
+                del conversations[key]
+                ended = True
+        return ended
+
+    async def touch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Запоминает время последней активности пользователя"""
+        if update.effective_user:
+            self.last_activity[update.effective_user.id] = time()
+
+    async def clear_conversation_state(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Очищает данные диалога, завершенного по таймауту"""
+        if context.user_data is not None:
+            for key in TRANSIENT_KEYS:
+                context.user_data.pop(key, None)
+
+    def _expire_user(self, application: Application, user_id: int) -> Tuple[int, bool]:
+        """Удаляет временные данные пользователя; возвращает освобожденный объем и признак очистки"""
+        user_data = application.user_data.get(user_id)
+        if user_data is None:
+            self.last_activity.pop(user_id, None)
+            return 0, self._end_conversations(user_id)
+        # Незавершенный диалог без временных данных (например, ввод анкеты) тоже завершается
+        ended = self._end_conversations(user_id)
+        if not ended and not any(key in user_data for key in TRANSIENT_KEYS):
+            # Временных данных нет (например, уже очищены прошлым проходом) - считать нечего
+            return 0, False
+
+        size_before = _estimate_size(dict(user_data))
+        for key in TRANSIENT_KEYS:
+            user_data.pop(key, None)
+
+        if not user_data:
+            self._drop_user(application, user_id)
+            return size_before, True
+
+        application.mark_data_for_update_persistence(user_ids=user_id)
+        return size_before - _estimate_size(dict(user_data)), True
+
+    def _drop_user(self, application: Application, user_id: int) -> int:
+        """Удаляет все данные пользователя и возвращает их объем"""
+        size = _estimate_size(dict(application.user_data.get(user_id) or {}))
+        application.drop_user_data(user_id)
+        self._end_conversations(user_id)
+        self.last_activity.pop(user_id, None)
+        return size
+
+    def sweep(self, application: Application) -> int:
+        """Удаляет состояния неактивных пользователей, возвращает освобожденный объем"""
+        now = time()
+        border = now - self.idle_ttl_seconds
+        reclaimed = 0
+        expired = set()
+
+        # Пользователи без данных о последней активности (например, загруженные
+        # из хранилища после перезапуска) считаются активными с текущего момента;
+        # частично очищенные пользователи остаются в last_activity и повторно не добавляются
+        for user_id in application.user_data:
+            self.last_activity.setdefault(user_id, now)
+
+        for user_id, last_seen in list(self.last_activity.items()):
+            if last_seen <= border:
+                size, cleared = self._expire_user(application, user_id)
+                reclaimed += size
+                if cleared:
+                    expired.add(user_id)
+
+        # Ограничиваем число хранимых сессий, вытесняя самые давние целиком
+        overflow = len(application.user_data) - self.max_sessions
+        if overflow > 0:
+            oldest = sorted(application.user_data, key=lambda user_id: self.last_activity.get(user_id, now))[:overflow]
+            for user_id in oldest:
+                reclaimed += self._drop_user(application, user_id)
+                expired.add(user_id)
+
+        self.live_sessions = sum(1 for data in application.user_data.values() if data)
+        self.expired_sessions += len(expired)
+        self.bytes_reclaimed += reclaimed
+
+        if expired:
+            logger.info(str({
+                'type': 'success',
+                'user': 'System',
+                'action': 'Очищены неактивные сессии',
+                'details': f"Сессий: {len(expired)}, освобождено: {reclaimed} байт, активных: {self.live_sessions}"
+            }))
+        return reclaimed
+
+    async def sweep_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Периодическая задача очистки для JobQueue"""
+        self.sweep(context.application)
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает метрики сборщика"""
+        return {
+            'live_sessions': self.live_sessions,
+            'tracked_users': len(self.last_activity),
+            'expired_sessions': self.expired_sessions,
+            'bytes_reclaimed': self.bytes_reclaimed
+        }
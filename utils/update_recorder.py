@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+from time import time
+from typing import Any, Dict, Optional
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+
+from utils.logger import logger
+
+# Тексты кнопок основного меню: без них запись не пройдет по тем же обработчикам
+MENU_TEXTS = {"📋 Вакансии", "📝 Мои заявки", "ℹ️ О боте"}
+
+# Поля с идентификаторами пользователей и чатов
+ID_FIELDS = {'from', 'chat', 'sender_chat', 'forward_from', 'forward_from_chat', 'user'}
+
+# Поля со свободным текстом
+TEXT_FIELDS = {'text', 'caption', 'first_name', 'last_name', 'username', 'title', 'file_name', 'query', 'bio'}
+
+# Идентификаторы файлов: вместе с токеном бота по ним можно скачать вложения (резюме)
+FILE_ID_FIELDS = {'file_id', 'file_unique_id'}
+
+# Поля с персональными данными, которые не записываются вовсе
+DROPPED_FIELDS = {'contact', 'location', 'venue', 'invoice', 'successful_payment', 'passport_data'}
+
+_WORD_CHAR_RE = re.compile(r'\w')
+
+
+def filler(text: str) -> str:
+    """Заменяет буквы и цифры на x, сохраняя длину, пробелы и пунктуацию"""
+    return _WORD_CHAR_RE.sub('x', text)
+
+
+class UpdateRecorder:
+    """
+    Запись входящих обновлений для нагрузочных прогонов.
+
+    Обновления пишутся в logs/updates/updates_YYYYMMDD.jsonl.gz строками
+    {"t": время получения, "update": обновление}. Идентификаторы пользователей
+    и чатов, а также file_id вложений заменяются псевдонимами (HMAC с солью), свободный текст - заполнителем
+    той же длины; команды, тексты кнопок меню и callback_data сохраняются.
+    Анонимизация и сжатие выполняются в отдельном потоке.
+    """
+
+    def __init__(self, directory: str = 'logs/updates', salt: str = ''):
+        self.directory = directory
+        self.salt = salt.encode() if salt else os.urandom(16)
+        self.recorded = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._file = None
+        self._file_date: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self, application: Application = None):
+        """Запускает поток записи (используется в post_init)"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write, name='update-recorder', daemon=True)
+        self._thread.start()
+
+    async def stop(self, application: Application = None):
+        """Дописывает очередь и закрывает файл (используется в post_shutdown)"""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        logger.info(f"Записано обновлений: {self.recorded}")
+
+    async def record(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Ставит обновление в очередь записи (TypeHandler в группе до всех обработчиков)"""
+        self._queue.put((time(), update.to_dict()))
+
+    def pseudonym(self, value: int) -> int:
+        """Стабильный в пределах соли псевдоним идентификатора (знак сохраняется для групп)"""
+        digest = hmac.new(self.salt, str(abs(value)).encode(), hashlib.sha256).digest()
+        pseudonym = int.from_bytes(digest[:5], 'big') + 1
+        return -pseudonym if value < 0 else pseudonym
+
+    def file_pseudonym(self, file_id: str) -> str:
+        """Псевдоним file_id: по нему нельзя скачать файл, но одинаковые файлы остаются одинаковыми"""
+        return hmac.new(self.salt, file_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def anonymize(self, data: Any, key: str = '') -> Any:
+        """Возвращает копию данных обновления без персональных данных"""
+        if isinstance(data, dict):
+            result = {}
+            for field, value in data.items():
+                if field in DROPPED_FIELDS:
+                    continue
+                if field in ID_FIELDS and isinstance(value, dict):
+                    value = dict(value)
+                    if isinstance(value.get('id'), int):
+                        value['id'] = self.pseudonym(value['id'])
+                elif field == 'user_id' and isinstance(value, int):
+                    value = self.pseudonym(value)
+                elif field in FILE_ID_FIELDS and isinstance(value, str):
+                    value = self.file_pseudonym(value)
+                result[field] = self.anonymize(value, field)
+            return result
+        if isinstance(data, list):
+            return [self.anonymize(item, key) for item in data]
+        if isinstance(data, str) and key in TEXT_FIELDS:
+            return self._anonymize_text(data, key)
+        return data
+
+    @staticmethod
+    def _anonymize_text(text: str, key: str) -> str:
+        """Скрывает свободный текст, оставляя команды и кнопки меню"""
+        if key == 'text':
+            if text in MENU_TEXTS:
+                return text
+            if text.startswith('/'):
+                command, separator, arguments = text.partition(' ')
+                return command + separator + filler(arguments)
+        return filler(text)
+
+    def _open(self):
+        """Открывает файл текущего дня"""
+        date = datetime.now().strftime('%Y%m%d')
+        if self._file is None or date != self._file_date:
+            if self._file is not None:
+                self._file.close()
+            path = os.path.join(self.directory, f'updates_{date}.jsonl.gz')
+            # Каждый запуск добавляет отдельный gzip-фрагмент, gzip читает их подряд
+            self._file = gzip.open(path, 'at', encoding='utf-8')
+            self._file_date = date
+        return self._file
+
+    def _write(self):
+        """Поток записи: анонимизирует и сжимает обновления из очереди"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            arrived, data = item
+            try:
+                record: Dict[str, Any] = {'t': round(arrived, 3), 'update': self.anonymize(data)}
+                self._open().write(json.dumps(record, ensure_ascii=False) + '\n')
+                self.recorded += 1
+            except Exception as e:
+                logger.error(f"Ошибка при записи обновления: {str(e)}")
+        if self._file is not None:
+            self._file.close()
+            self._file = None